@@ -2,6 +2,7 @@
 
 SONIC_BGPCFGD = sonic_bgpcfgd-1.0-py3-none-any.whl
 $(SONIC_BGPCFGD)_SRC_PATH = $(SRC_PATH)/sonic-bgpcfgd
+$(SONIC_BGPCFGD)_DEPENDS += $(SONIC_PY_COMMON_PY3)
 # These dependencies are only needed because they are dependencies
 # of sonic-config-engine and bgpcfgd explicitly calls sonic-cfggen
 # as part of its unit tests.
@@ -1,11 +1,22 @@
+import time
+
+
 class ConfigMgr(object):
     """ The class represents frr configuration """
-    def __init__(self, frr):
+    def __init__(self, frr, commit_delay=0):
+        """
+        Constructor
+        :param frr: FRR proxy object
+        :param commit_delay: number of seconds to coalesce pending changes before they are written to FRR.
+                             0 means every commit() writes the changes immediately
+        """
         self.frr = frr
+        self.commit_delay = commit_delay
         self.current_config = None
         self.current_config_raw = None
         self.changes = ""
         self.peer_groups_to_restart = []
+        self.pending_since = None
 
     def reset(self):
         """ Reset stored config """
@@ -13,9 +24,15 @@ class ConfigMgr(object):
         self.current_config_raw = None
         self.changes = ""
         self.peer_groups_to_restart = []
+        self.pending_since = None
 
     def update(self):
-        """ Read current config from FRR """
+        """
+        Read current config from FRR.
+        With commit_delay set, the pending changes are written first, so the readers see them in the config
+        """
+        if self.commit_delay > 0:
+            self.commit(force=True)
         self.current_config = None
         self.current_config_raw = None
         out = self.frr.get_config()
@@ -33,6 +50,7 @@ class ConfigMgr(object):
         Prepare new changes for FRR. The changes should be committed by self.commit()
         :param cmdlist: configuration change for FRR. Type: List of Strings
         """
+        self.mark_pending()
         self.changes += "\n".join(cmdlist) + "\n"
 
     def push(self, cmd):
@@ -40,9 +58,15 @@ class ConfigMgr(object):
         Prepare new changes for FRR. The changes should be committed by self.commit()
         :param cmd: configuration change for FRR. Type: String
         """
+        self.mark_pending()
         self.changes += cmd + "\n"
         return True
 
+    def mark_pending(self):
+        """ Remember when the oldest uncommitted change was pushed """
+        if self.pending_since is None:
+            self.pending_since = time.time()
+
     def restart_peer_groups(self, peer_groups):
         """
         Schedule peer_groups for restart on commit
@@ -50,14 +74,20 @@ class ConfigMgr(object):
         """
         self.peer_groups_to_restart.extend(peer_groups)
 
-    def commit(self):
+    def commit(self, force=False):
         """
         Write configuration change to FRR.
-        :return: True if change was applied successfully, False otherwise
+        With commit_delay set, the changes are kept until the oldest of them is commit_delay seconds old,
+        so a burst of updates is written by one vtysh call
+        :param force: write the changes even if the commit_delay hasn't passed yet
+        :return: True if change was applied successfully or postponed, False otherwise
         """
-        if self.changes.strip() == "":
+        if self.changes.strip() == "" and not self.peer_groups_to_restart:
+            return True
+        if not force and self.commit_delay > 0 and self.pending_since is not None \
+                and time.time() - self.pending_since < self.commit_delay:
             return True
-        rc_write = self.frr.write(self.changes)
+        rc_write = self.frr.write(self.changes) if self.changes.strip() != "" else True
         rc_restart = self.frr.restart_peer_groups(self.peer_groups_to_restart)
         self.reset()
         return rc_write and rc_restart
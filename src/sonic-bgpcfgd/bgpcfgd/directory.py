@@ -1,4 +1,5 @@
-from collections import defaultdict
+import contextlib
+from collections import defaultdict, OrderedDict
 
 from .log import log_err
 
@@ -9,6 +10,8 @@ class Directory(object):
     def __init__(self):
         self.data = defaultdict(dict)  # storage. A key is a slot name, a value is a dictionary with data
         self.notify = defaultdict(lambda: defaultdict(list))  # registered callbacks: slot -> path -> handlers[]
+        self.notify_index = defaultdict(lambda: defaultdict(list))  # slot -> first key of the path -> paths[]
+        self.deferred = None  # handlers to run at the end of the current batch(). None outside of a batch
 
     @staticmethod
     def get_slot_name(db, table):
@@ -62,7 +65,9 @@ class Directory(object):
 
     def put(self, db, table, key, value):
         """
-        Put information into the storage. Notify handlers which are dependant to the information
+        Put information into the storage. Notify handlers which are dependant to the information.
+        Only handlers of the paths under the key are considered, and they are notified
+        only when the path appeared or its value was changed by this put
         :param db: db name
         :param table: table name
         :param key: key to change
@@ -70,12 +75,62 @@ class Directory(object):
         :return:
         """
         slot = self.get_slot_name(db, table)
+        new_slot = slot not in self.data
+        old_found = key in self.data[slot]
+        old_value = self.data[slot].get(key)
         self.data[slot][key] = value
-        if slot in self.notify:
-            for path in self.notify[slot].keys():
-                if self.path_exist(db, table, path):
-                    for handler in self.notify[slot][path]:
-                        handler()
+        if slot not in self.notify_index:
+            return
+        changed = new_slot or not old_found or old_value != value
+        handlers = OrderedDict()
+        for path in self.notify_index[slot].get('', []):
+            if changed:
+                handlers.update((handler, None) for handler in self.notify[slot][path])
+        for path in self.notify_index[slot].get(key, []):
+            found, path_value = self.value_traverse(value, path)
+            if not found:
+                continue
+            if old_found:
+                old_path_found, old_path_value = self.value_traverse(old_value, path)
+                if old_path_found and old_path_value == path_value:
+                    continue
+            handlers.update((handler, None) for handler in self.notify[slot][path])
+        for handler in handlers:
+            if self.deferred is not None:
+                self.deferred[handler] = None
+            else:
+                handler()
+
+    @staticmethod
+    def value_traverse(value, path):
+        """
+        Traverse the rest of the path inside of a value stored under the first key of the path
+        :param value: stored value
+        :param path: storage path as a string where each internal key is separated by '/'
+        :return: a pair: True if the path was found, object if it was found
+        """
+        for p in path.split("/")[1:]:
+            if not isinstance(value, dict) or p not in value:
+                return False, None
+            value = value[p]
+        return True, value
+
+    @contextlib.contextmanager
+    def batch(self):
+        """
+        Defer notifications until the end of the block.
+        Every handler notified inside of the block runs once, when the block is finished
+        """
+        if self.deferred is not None:  # already inside of a batch
+            yield
+            return
+        self.deferred = OrderedDict()
+        try:
+            yield
+        finally:
+            deferred, self.deferred = self.deferred, None
+        for handler in deferred:
+            handler()
 
     def get(self, db, table, key):
         """
@@ -156,4 +211,6 @@ class Directory(object):
         """
         for db, table, path in deps:
             slot = self.get_slot_name(db, table)
+            if path not in self.notify[slot]:
+                self.notify_index[slot][path.split("/")[0]].append(path)
             self.notify[slot][path].append(handler)
\ No newline at end of file
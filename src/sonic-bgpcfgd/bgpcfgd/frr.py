@@ -1,5 +1,6 @@
 import os
 import datetime
+import socket
 import time
 import tempfile
 
@@ -8,6 +9,99 @@ from .vars import g_debug
 from .utils import run_command
 
 
+class VtySession(object):
+    """
+    Persistent connection to the vty socket of a FRR daemon.
+    Every command costs one round trip on the socket instead of a vtysh process
+    """
+    SOCKET_PATH = "/run/frr/%s.vty"
+    TIMEOUT = 120  # seconds
+    READ_SIZE = 16384
+
+    def __init__(self, daemon="bgpd", socket_path=None):
+        """
+        Constructor
+        :param daemon: name of the FRR daemon to connect to
+        :param socket_path: path to the vty socket. Default is /run/frr/<daemon>.vty
+        """
+        self.daemon = daemon
+        self.socket_path = socket_path if socket_path is not None else self.SOCKET_PATH % daemon
+        self.sock = None
+
+    def connect(self):
+        """
+        Connect to the daemon and enter the enable node
+        :return: True if the session is ready for commands, False otherwise
+        """
+        if self.sock is not None:
+            return True
+        if not os.path.exists(self.socket_path):
+            return False
+        sock = socket.socket(socket.AF_UNIX, socket.SOCK_STREAM)
+        sock.settimeout(self.TIMEOUT)
+        try:
+            sock.connect(self.socket_path)
+        except socket.error as exc:
+            log_warn("Can't connect to %s vty socket '%s': %s" % (self.daemon, self.socket_path, str(exc)))
+            sock.close()
+            return False
+        self.sock = sock
+        ret_code, out = self.run("enable")
+        if ret_code != 0:
+            log_warn("Can't enter enable node on %s vty: rc=%s out='%s'" % (self.daemon, str(ret_code), out))
+            self.close()
+            return False
+        return True
+
+    def close(self):
+        """ Close the connection. The next connect() opens a new one """
+        if self.sock is not None:
+            self.sock.close()
+            self.sock = None
+
+    def run(self, command):
+        """
+        Execute one command on the daemon
+        :param command: vty command. Type: String
+        :return: Tuple: integer return code of the command or None if the session is broken, output as a string
+        """
+        if self.sock is None:
+            return None, ""
+        try:
+            self.sock.sendall(command.encode() + b'\0')
+            reply = b''
+            # the daemon terminates every reply with three zero bytes and the return code
+            while len(reply) < 4 or reply[-4:-1] != b'\0\0\0':
+                data = self.sock.recv(self.READ_SIZE)
+                if not data:
+                    raise socket.error("connection closed by %s" % self.daemon)
+                reply += data
+        except socket.error as exc:
+            log_err("vty session to %s is broken on command '%s': %s" % (self.daemon, command, str(exc)))
+            self.close()
+            return None, ""
+        return reply[-1], reply[:-4].decode(errors='replace')
+
+
+g_vty_session = VtySession()
+
+
+def run_vty_command(command, fallback=None):
+    """
+    Execute a command over the shared bgpd vty session, falling back to vtysh when the session is not available
+    :param command: vty command. Type: String
+    :param fallback: function which runs the vtysh command line. Default is run_command
+    :return: Tuple: integer return code, stdout as a string, stderr as a string
+    """
+    if g_vty_session.connect():
+        ret_code, out = g_vty_session.run(command)
+        if ret_code is not None:
+            return ret_code, out, ""
+    if fallback is None:
+        fallback = run_command
+    return fallback(["vtysh", "-c", command])
+
+
 class FRR(object):
     """Proxy object with FRR"""
     def __init__(self, daemons):
@@ -32,6 +126,7 @@ class FRR(object):
 
     @staticmethod
     def get_config():
+        # vtysh integrates the running config of all daemons, a bgpd vty session would return bgpd's only
         ret_code, out, err = run_command(["vtysh", "-c", "show running-config"])
         if ret_code != 0:
             log_crit("can't update running config: rc=%d out='%s' err='%s'" % (ret_code, out, err))
@@ -57,12 +152,13 @@ class FRR(object):
     @staticmethod
     def restart_peer_groups(peer_groups):
         """ Restart peer-groups which support BBR
+        The clear commands share one bgpd vty session, every peer-group is cleared only once
         :param peer_groups: List of peer_groups to restart
         :return: True if restart of all peer-groups was successful, False otherwise
         """
         res = True
-        for peer_group in sorted(peer_groups):
-            rc, out, err = run_command(["vtysh", "-c", "clear bgp peer-group %s soft in" % peer_group])
+        for peer_group in sorted(set(peer_groups)):
+            rc, out, err = run_vty_command("clear bgp peer-group %s soft in" % peer_group)
             if rc != 0:
                 log_value = peer_group, rc, out, err
                 log_crit("Can't restart bgp peer-group '%s'. rc='%d', out='%s', err='%s'" % log_value)
@@ -35,11 +35,12 @@ def do_work():
     frr = FRR(["bgpd", "zebra", "staticd"])
     frr.wait_for_daemons(seconds=20)
     #
+    constants = read_constants()
     common_objs = {
         'directory': Directory(),
-        'cfg_mgr':   ConfigMgr(frr),
+        'cfg_mgr':   ConfigMgr(frr, constants.get('bgp', {}).get('commit_delay', 0)),
         'tf':        TemplateFabric(),
-        'constants': read_constants(),
+        'constants': constants,
     }
     managers = [
         # Config DB managers
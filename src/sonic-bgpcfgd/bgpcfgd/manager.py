@@ -20,7 +20,13 @@ class Manager(object):
         self.db_name = database
         self.table_name = table_name
         self.set_queue = []
-        self.directory.subscribe(deps, self.on_deps_change)  # subscribe this class method on directory changes
+        # set_handler() could wait for any entry of the dependency tables, not only for the deps paths.
+        # So subscribe this class method on every change of the dependency tables
+        dep_tables = []
+        for db, table, _ in deps:
+            if (db, table, '') not in dep_tables:
+                dep_tables.append((db, table, ''))
+        self.directory.subscribe(dep_tables, self.on_deps_change)
 
     def get_database(self):
         """ Return associated database """
@@ -51,9 +57,19 @@ class Manager(object):
         else:
             log_err("Invalid operation '%s' for key '%s'" % (op, key))
 
+    def handler_batch(self, entries):
+        """
+        This method is executed with all events popped from the table at once.
+        Managers which can apply a burst of events in bulk override it, by default every entry goes to handler()
+        :param entries: list of (key, op, data) tuples in the order they were received
+        """
+        with self.directory.batch():
+            for key, op, data in entries:
+                self.handler(key, op, data)
+
     def on_deps_change(self):
         """ This method is being executed on every dependency change """
-        if not self.directory.available_deps(self.deps):
+        if not self.set_queue or not self.directory.available_deps(self.deps):
             return
         new_queue = []
         for key, data in self.set_queue:
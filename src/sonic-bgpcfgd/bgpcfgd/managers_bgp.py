@@ -4,6 +4,7 @@ from swsscommon import swsscommon
 import jinja2
 import netaddr
 
+from .frr import run_vty_command
 from .log import log_warn, log_err, log_info, log_debug, log_crit
 from .manager import Manager
 from .template import TemplateFabric
@@ -379,8 +380,7 @@ class BGPPeerMgrBase(Manager):
         Load peers from FRR.
         :return: set of peers, which are already installed in FRR
         """
-        command = ["vtysh", "-c", "show bgp vrfs json"]
-        ret_code, out, err = run_command(command)
+        ret_code, out, err = run_vty_command("show bgp vrfs json", run_command)
         if ret_code == 0:
             js_vrf = json.loads(out)
             vrfs = js_vrf['vrfs'].keys()
@@ -389,8 +389,7 @@ class BGPPeerMgrBase(Manager):
             raise Exception("Can't read bgp vrfs: %s" % err)
         peers = set()
         for vrf in vrfs:
-            command = ["vtysh", "-c", 'show bgp vrf %s neighbors json' % str(vrf)]
-            ret_code, out, err = run_command(command)
+            ret_code, out, err = run_vty_command('show bgp vrf %s neighbors json' % str(vrf), run_command)
             if ret_code == 0:
                 js_bgp = json.loads(out)
                 for nbr in js_bgp.keys():
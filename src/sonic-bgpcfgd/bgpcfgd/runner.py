@@ -1,4 +1,5 @@
-from collections import defaultdict
+import time
+
 from swsscommon import swsscommon
 
 from .log import log_debug, log_crit
@@ -19,14 +20,19 @@ class Runner(object):
         when corresponding db/table is updated
     """
     SELECT_TIMEOUT = 1000
+    STATS_TABLE_NAME = "BGPCFGD_STATS"
+    STATS_INTERVAL = 10  # seconds between exports of the counters to STATE_DB
 
     def __init__(self, cfg_manager):
         """ Constructor """
         self.cfg_manager = cfg_manager
         self.db_connectors = {}
         self.selector = swsscommon.Select()
-        self.callbacks = defaultdict(lambda: defaultdict(list))  # db -> table -> handlers[]
-        self.subscribers = set()
+        self.subscribers = {}  # (db, table) -> subscriber
+        self.managers = {}     # subscriber fd -> (subscriber, managers[])
+        self.stats = {}        # manager -> counters
+        self.stats_table = None
+        self.stats_exported = 0
 
     def add_manager(self, manager):
         """
@@ -41,30 +47,93 @@ class Runner(object):
         if db not in self.db_connectors:
             self.db_connectors[db] = swsscommon.DBConnector(db_name, 0)
 
-        if table_name not in self.callbacks[db]:
+        if (db, table_name) not in self.subscribers:
             conn = self.db_connectors[db]
             subscriber = swsscommon.SubscriberStateTable(conn, table_name)
-            self.subscribers.add(subscriber)
+            self.subscribers[(db, table_name)] = subscriber
+            self.managers[subscriber.getFd()] = (subscriber, [])
             self.selector.addSelectable(subscriber)
-        self.callbacks[db][table_name].append(manager.handler)
+        subscriber = self.subscribers[(db, table_name)]
+        self.managers[subscriber.getFd()][1].append(manager)
+        self.stats[manager] = {
+            'events': 0,
+            'batches': 0,
+            'queue_depth': 0,
+            'max_queue_depth': 0,
+            'latency_ms': 0.0,
+            'max_latency_ms': 0.0,
+        }
 
     def run(self):
         """ Main loop """
         while g_run:
-            state, _ = self.selector.select(Runner.SELECT_TIMEOUT)
+            state, selectable = self.selector.select(Runner.SELECT_TIMEOUT)
             if state == self.selector.TIMEOUT:
+                self.commit()  # write changes postponed by the commit delay
+                self.export_stats()
                 continue
             elif state == self.selector.ERROR:
                 raise Exception("Received error from select")
 
-            for subscriber in self.subscribers:
-                while True:
-                    key, op, fvs = subscriber.pop()
-                    if not key:
-                        break
-                    log_debug("Received message : '%s'" % str((key, op, fvs)))
-                    for callback in self.callbacks[subscriber.getDbConnector().getDbId()][subscriber.getTableName()]:
-                        callback(key, op, dict(fvs))
-            rc = self.cfg_manager.commit()
-            if not rc:
-                log_crit("Runner::commit was unsuccessful")
+            self.process(selectable.getFd())
+            self.commit()
+            self.export_stats()
+        self.commit(force=True)
+
+    def process(self, fd):
+        """
+        Drain the subscriber which became ready and pass all popped entries to its managers at once
+        :param fd: file descriptor of the ready subscriber
+        """
+        subscriber, managers = self.managers[fd]
+        entries = []
+        while True:
+            key, op, fvs = subscriber.pop()
+            if not key:
+                break
+            log_debug("Received message : '%s'" % str((key, op, fvs)))
+            entries.append((key, op, dict(fvs)))
+        if not entries:
+            return
+        for manager in managers:
+            start = time.time()
+            manager.handler_batch(entries)
+            self.update_stats(manager, len(entries), (time.time() - start) * 1000.0)
+
+    def update_stats(self, manager, n_entries, latency_ms):
+        """
+        Account one batch processed by the manager
+        :param manager: manager which processed the batch
+        :param n_entries: number of entries in the batch
+        :param latency_ms: time spent by the manager on the batch in milliseconds
+        """
+        stats = self.stats[manager]
+        stats['events'] += n_entries
+        stats['batches'] += 1
+        stats['queue_depth'] = n_entries
+        stats['max_queue_depth'] = max(stats['max_queue_depth'], n_entries)
+        stats['latency_ms'] = latency_ms
+        stats['max_latency_ms'] = max(stats['max_latency_ms'], latency_ms)
+
+    def export_stats(self, force=False):
+        """
+        Write the manager counters into STATE_DB BGPCFGD_STATS table, not more often than STATS_INTERVAL seconds
+        :param force: export the counters regardless of the interval
+        """
+        now = time.time()
+        if not force and now - self.stats_exported < self.STATS_INTERVAL:
+            return
+        self.stats_exported = now
+        if self.stats_table is None:
+            self.stats_table = swsscommon.Table(swsscommon.DBConnector("STATE_DB", 0), self.STATS_TABLE_NAME)
+        for manager, stats in self.stats.items():
+            key = "%s|%s|%s" % (manager.get_database(), manager.get_table_name(), manager.__class__.__name__)
+            fvs = [(name, "%.3f" % value if isinstance(value, float) else str(value)) for name, value in stats.items()]
+            fvs.append(('set_queue', str(len(manager.set_queue))))
+            self.stats_table.set(key, swsscommon.FieldValuePairs(fvs))
+
+    def commit(self, force=False):
+        """ Write pending changes to FRR """
+        rc = self.cfg_manager.commit(force=force)
+        if not rc:
+            log_crit("Runner::commit was unsuccessful")
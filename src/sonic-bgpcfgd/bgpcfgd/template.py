@@ -3,15 +3,16 @@ from functools import partial
 
 import jinja2
 import netaddr
+from sonic_py_common.general import get_jinja2_bytecode_cache
 
 from .log import log_err
 
 class TemplateFabric(object):
     """ Fabric for rendering jinja2 templates """
-    def __init__(self, template_path = '/usr/share/sonic/templates'):
+    def __init__(self, template_path = '/usr/share/sonic/templates', bytecode_cache_path = None):
         j2_template_paths = [template_path]
         j2_loader = jinja2.FileSystemLoader(j2_template_paths)
-        j2_env = jinja2.Environment(loader=j2_loader, trim_blocks=False)
+        j2_env = jinja2.Environment(loader=j2_loader, trim_blocks=False, bytecode_cache=get_jinja2_bytecode_cache('bgpcfgd', bytecode_cache_path))
         j2_env.filters['ipv4'] = self.is_ipv4
         j2_env.filters['ipv6'] = self.is_ipv6
         j2_env.filters['pfx_filter'] = self.pfx_filter
@@ -11,12 +11,18 @@ Description: bgpmon.py -- populating bgp related information in stateDB.
     BGP related items that needs to be updated in a periodic manner in the
     future, then more can be added into this process.
 
-    The script check if there are any bgp activities by monitoring the bgp
-    frr.log file timestamp.  If activity is detected, then it will request bgp
-    neighbor state via vtysh cli interface. This bgp activity monitoring is
-    done periodically (every 15 second). When triggered, it looks specifically
-    for the neighbor state in the json output of show ip bgp neighbors json
-    and update the state DB for each neighbor accordingly.
+    bgpd logs to syslog, which is forwarded to the host. The rsyslog of the bgp
+    docker also writes the bgpd %ADJCHANGE messages to bgpd_adjchange.log (see
+    bgpmon_rsyslog.conf), which the script follows. When a neighbor goes up or
+    down, only that neighbor state is requested via vtysh cli interface
+    (show bgp neighbors <peer> json) and updated in the state DB, so the change
+    is visible within the poll interval (1 second by default). As a fallback, a
+    full reconciliation is done periodically (every 60 seconds by default) if
+    bgp activity is detected by monitoring the frr.log file timestamp. When
+    bgpd_adjchange.log can't be followed, the reconciliation is done every 15
+    seconds. When triggered, it looks specifically for the
+    neighbor state in the json output of show bgp summary json and update the
+    state DB for each neighbor accordingly.
     In order to not disturb and hold on to the State DB access too long and
     removal of the stale neighbors (neighbors that was there previously on
     previous get request but no longer there in the current get request), a
@@ -24,8 +30,10 @@ Description: bgpmon.py -- populating bgp related information in stateDB.
     is a need to perform update or the peer is stale to be removed from the
     state DB
 """
+import argparse
 import json
 import os
+import re
 import sys
 import syslog
 from swsscommon import swsscommon
@@ -33,6 +41,77 @@ import time
 from sonic_py_common.general import getstatusoutput_noshell
 
 PIPE_BATCH_MAX_COUNT = 50
+ADJCHANGE_LOG_FILE = "/var/log/frr/bgpd_adjchange.log"
+DEFAULT_POLL_INTERVAL = 1
+DEFAULT_RECONCILE_INTERVAL = 60
+FALLBACK_RECONCILE_INTERVAL = 15
+# Above this number of changed neighbors one "show bgp summary json" is cheaper than a request per neighbor
+PEER_UPDATE_MAX_COUNT = 10
+# Jan  1 00:00:02.000000 sonic NOTICE bgp#bgpd[41]: [VTVCM-Y2NW3] %ADJCHANGE: neighbor 10.0.0.57(ARISTA01T1) in vrf default Up
+ADJCHANGE_RE = re.compile(r'%ADJCHANGE: neighbor (\S+?)(?:\(\S*\))?(?: in vrf (\S+))? (?:Up|Down)')
+
+class FrrLogTail:
+    """Follow the bgpd log and report neighbors mentioned in %ADJCHANGE messages"""
+    def __init__(self, filename=ADJCHANGE_LOG_FILE):
+        self.filename = filename
+        self.fp = None
+        self.inode = None
+        self.partial = ''
+
+    def is_following(self):
+        return self.fp is not None
+
+    def open(self, from_end):
+        try:
+            fp = open(self.filename, 'r', errors='replace')
+        except (IOError, OSError):
+            return False
+        if from_end:
+            fp.seek(0, os.SEEK_END)
+        self.close()
+        self.fp = fp
+        self.inode = os.fstat(fp.fileno()).st_ino
+        return True
+
+    def close(self):
+        if self.fp is not None:
+            self.fp.close()
+            self.fp = None
+        self.partial = ''
+
+    def rotated(self):
+        try:
+            st = os.stat(self.filename)
+        except (IOError, OSError):
+            return True
+        return st.st_ino != self.inode or st.st_size < self.fp.tell()
+
+    def read_lines(self):
+        data = self.partial + self.fp.read()
+        lines = data.split('\n')
+        # keep the last line until it is completely written
+        self.partial = lines.pop()
+        return lines
+
+    def get_changed_peers(self):
+        """Return the set of default vrf neighbors which changed their state since the last call"""
+        if self.fp is None:
+            # Nothing was followed before, the neighbors are known from the reconciliation
+            self.open(from_end=True)
+            return set()
+        lines = self.read_lines()
+        if self.rotated():
+            # read the new file from the beginning
+            if self.open(from_end=False):
+                lines += self.read_lines()
+            else:
+                self.close()
+        peers = set()
+        for line in lines:
+            m = ADJCHANGE_RE.search(line)
+            if m is not None and m.group(2) in (None, "default"):
+                peers.add(m.group(1))
+        return peers
 
 class BgpStateGet:
     def __init__(self):
@@ -66,6 +145,10 @@ class BgpStateGet:
         except (IOError, OSError):
             return True
 
+    @staticmethod
+    def get_peer_type(remote_as, local_as):
+        return "i-BGP" if remote_as == local_as else "e-BGP"
+
     def update_new_peer_states(self, peer_dict):
         peer_l = peer_dict["peers"].keys()
         self.new_peer_l.update(peer_l)
@@ -90,6 +173,59 @@ class BgpStateGet:
             if key == "ipv4Unicast" or key == "ipv6Unicast":
                 self.update_new_peer_states(value)
 
+    # The state of one neighbor as show bgp summary json reports it.
+    # An administratively shut down neighbor is "Idle (Admin)" there and "Idle" in show bgp neighbors json
+    @staticmethod
+    def get_summary_state(neigh_info):
+        if neigh_info["bgpState"] == "Idle" and neigh_info.get("adminShutDown"):
+            return "Idle (Admin)"
+        return neigh_info["bgpState"]
+
+    # Get the state of one neighbor.
+    # Returns a pair: False if the state can't be read, and (state, remoteAs, localAs) or None if the neighbor doesn't exist
+    def get_neigh_state(self, peer):
+        cmd = ["vtysh", "-c", 'show bgp neighbors {} json'.format(peer)]
+        rc, output = getstatusoutput_noshell(cmd)
+        if rc:
+            syslog.syslog(syslog.LOG_ERR, "*ERROR* Failed with rc:{} when execute: {}".format(rc, cmd))
+            return False, None
+        try:
+            neigh_info = json.loads(output)
+        except ValueError:
+            syslog.syslog(syslog.LOG_ERR, "*ERROR* Can't parse output of: {}".format(cmd))
+            return False, None
+        info = neigh_info.get(peer)
+        # show bgp summary json has only neighbors activated for ipv4 or ipv6 unicast
+        afi_info = info.get("addressFamilyInfo", {}) if isinstance(info, dict) else {}
+        if "ipv4Unicast" not in afi_info and "ipv6Unicast" not in afi_info:
+            return True, None
+        return True, (self.get_summary_state(info), info["remoteAs"], info["localAs"])
+
+    # Update State DB only for the neighbors which were reported as changed
+    def update_peers(self, peers):
+        if len(peers) > PEER_UPDATE_MAX_COUNT:
+            self.get_all_neigh_states()
+            self.update_neigh_states()
+            return
+        data = {}
+        for peer in peers:
+            ok, new_state = self.get_neigh_state(peer)
+            if not ok:
+                # leave it to the reconciliation
+                continue
+            key = "NEIGH_STATE_TABLE|%s" % peer
+            if new_state is None:
+                if peer in self.peer_l:
+                    data[key] = None
+                    self.peer_l.remove(peer)
+                    self.peer_state.pop(peer, None)
+            elif peer not in self.peer_l or self.peer_state[peer] != new_state[0]:
+                data[key] = {'state':new_state[0], 'peerType':self.get_peer_type(new_state[1], new_state[2])}
+                self.peer_l.add(peer)
+                self.peer_state[peer] = new_state[0]
+        if len(data) > 0:
+            self.flush_pipe(data)
+
     # This method will take the caller's dictionary which contains the peer state operation
     # That need to be updated in StateDB using Redis pipeline.
     # The data{} will be cleared at the end of this method before returning to caller.
@@ -130,7 +266,7 @@ class BgpStateGet:
                 if self.peer_state[peer] != self.new_peer_state[peer][0]:
                     # state changed. Update state DB for this entry
                     state = self.new_peer_state[peer][0]
-                    peerType = "i-BGP" if self.new_peer_state[peer][1] == self.new_peer_state[peer][2] else "e-BGP"
+                    peerType = self.get_peer_type(self.new_peer_state[peer][1], self.new_peer_state[peer][2])
                     data[key] = {'state':state, 'peerType':peerType}
                     self.peer_state[peer] = state
                 # remove this neighbor from old set since it is accounted for
@@ -138,7 +274,7 @@ class BgpStateGet:
             else:
                 # New neighbor found case. Add to dictionary and state DB
                 state = self.new_peer_state[peer][0]
-                peerType = "i-BGP" if self.new_peer_state[peer][1] == self.new_peer_state[peer][2] else "e-BGP"
+                peerType = self.get_peer_type(self.new_peer_state[peer][1], self.new_peer_state[peer][2])
                 data[key] = {'state':state, 'peerType':peerType}
                 self.peer_state[peer] = state
             if len(data) > PIPE_BATCH_MAX_COUNT:
@@ -158,7 +294,34 @@ class BgpStateGet:
         # Save the new set
         self.peer_l = self.new_peer_l.copy()
 
+def poll_once(bgp_state_get, log_tail, next_reconcile, reconcile_interval):
+    """
+    Update the neighbors reported by the bgpd log since the previous poll, or reconcile all neighbors
+    when next_reconcile is reached and bgpd was active.
+    Returns the time of the next full reconciliation
+    """
+    peers = log_tail.get_changed_peers()
+    now = time.time()
+    reconciled = False
+    if now >= next_reconcile:
+        interval = reconcile_interval if log_tail.is_following() else FALLBACK_RECONCILE_INTERVAL
+        next_reconcile = now + interval
+        if bgp_state_get.bgp_activity_detected():
+            bgp_state_get.get_all_neigh_states()
+            bgp_state_get.update_neigh_states()
+            reconciled = True
+    if not reconciled and peers:
+        bgp_state_get.update_peers(peers)
+    return next_reconcile
+
 def main():
+    parser = argparse.ArgumentParser(description="Populate BGP neighbor states in the state DB")
+    parser.add_argument("-p", "--poll-interval", type=float, default=DEFAULT_POLL_INTERVAL,
+                        help="seconds between checks of the bgpd log for neighbor state changes")
+    parser.add_argument("-r", "--reconcile-interval", type=float, default=DEFAULT_RECONCILE_INTERVAL,
+                        help="seconds between full reconciliations of the neighbor states")
+    parser.add_argument("-l", "--log-file", default=ADJCHANGE_LOG_FILE, help="bgpd log file to follow for %%ADJCHANGE messages")
+    args = parser.parse_args()
 
     syslog.syslog(syslog.LOG_INFO, "bgpmon service started")
     bgp_state_get = None
@@ -168,12 +331,12 @@ def main():
         syslog.syslog(syslog.LOG_ERR, "{}: error exit 1, reason {}".format("THIS_MODULE", str(e)))
         sys.exit(1)
 
-    # periodically obtain the new neighbor information and update if necessary
+    log_tail = FrrLogTail(args.log_file)
+    next_reconcile = 0
+    # update the neighbors reported by the bgpd log and periodically reconcile all of them
     while True:
-        time.sleep(15)
-        if bgp_state_get.bgp_activity_detected():
-            bgp_state_get.get_all_neigh_states()
-            bgp_state_get.update_neigh_states()
+        next_reconcile = poll_once(bgp_state_get, log_tail, next_reconcile, args.reconcile_interval)
+        time.sleep(args.poll_interval if log_tail.is_following() else FALLBACK_RECONCILE_INTERVAL)
 
 if __name__ == '__main__':
     main()
@@ -29,6 +29,10 @@ LOCAL_SRT_TABLE = "srt"
 LOCAL_BFD_TABLE = "bfd"
 LOCAL_BFD_PENDING_TABLE = "bfd_pending"
 LOCAL_INTERFACE_TABLE = "interface"
+LOCAL_ROUTE_NH_TABLE = "route_nh"
+
+#position of the per nexthop fields in the LOCAL_ROUTE_NH_TABLE entries
+ROUTE_NH_FIELDS = {"nexthop-vrf": 0, "nexthop": 1, "ifname": 2, "blackhole": 3, "distance": 4}
 
 def log_debug(msg):
     """ Send a message msg to the syslog as DEBUG """
@@ -110,14 +114,25 @@ class StaticRouteBfd(object):
         #interface, portchannel_interface and loopback_interface share same table, assume name is unique
         #assume only one ipv4  and/or one ipv6 for each interface
         self.local_db[LOCAL_INTERFACE_TABLE] = defaultdict(dict)
+        #nexthops of the bfd enabled static routes split per nexthop, route -> [(nh_vrf, nh_ip, ifname, blackhole, distance)]
+        self.local_db[LOCAL_ROUTE_NH_TABLE] = {}
 
         self.config_db  = swsscommon.DBConnector(CONFIG_DB_NAME, 0, True)
         self.appl_db = swsscommon.DBConnector(APPL_DB_NAME, 0, True)
         self.state_db = swsscommon.DBConnector(STATE_DB_NAME, 0, True)
 
-        self.bfd_appl_tbl = swsscommon.ProducerStateTable(self.appl_db, BFD_SESSION_TABLE_NAME)
+        #both appl_db tables are buffered in one pipeline, which is flushed once per select cycle
+        self.appl_pipeline = swsscommon.RedisPipeline(self.appl_db)
+        self.bfd_appl_tbl = swsscommon.ProducerStateTable(self.appl_pipeline, BFD_SESSION_TABLE_NAME, True)
+
+        self.static_route_appl_tbl = swsscommon.Table(self.appl_pipeline, STATIC_ROUTE_TABLE_NAME, True)
 
-        self.static_route_appl_tbl = swsscommon.Table(self.appl_db, STATIC_ROUTE_TABLE_NAME)
+        self.appl_tables = {
+            BFD_SESSION_TABLE_NAME: self.bfd_appl_tbl,
+            STATIC_ROUTE_TABLE_NAME: self.static_route_appl_tbl,
+        }
+        #appl_db updates of the current select cycle, table -> key -> (deleted, data)
+        self.appl_db_batch = None
 
         self.selector = swsscommon.Select()
         self.callbacks = defaultdict(lambda: defaultdict(list))  # db -> table -> handlers[]
@@ -173,13 +188,58 @@ class StaticRouteBfd(object):
             if len(entry) == 0:
                 self.remove_from_local_db(LOCAL_NEXTHOP_TABLE, nh_key)
 
+    def begin_appl_db_batch(self):
+        if self.appl_db_batch is None:
+            self.appl_db_batch = defaultdict(dict)
+
+    def update_appl_db(self, table_name, key, data):
+        """
+        Write an entry into appl_db, or stage it if a batch is open.
+        Staged updates of one key are merged the way redis applies them: a set merges the fields into the entry,
+        a delete drops the fields set before it.
+        :param table_name: appl_db table name
+        :param key: key of the entry
+        :param data: fields of the entry, None to delete the entry
+        """
+        if self.appl_db_batch is None:
+            self.write_appl_db(table_name, key, data is None, data)
+            self.appl_pipeline.flush()
+            return
+
+        updates = self.appl_db_batch[table_name]
+        deleted, cur_data = updates.pop(key, (False, None))
+        if data is None:
+            updates[key] = (True, None)
+        else:
+            new_data = dict(cur_data) if cur_data else {}
+            new_data.update(data)
+            updates[key] = (deleted, new_data)
+
+    def write_appl_db(self, table_name, key, deleted, data):
+        table = self.appl_tables[table_name]
+        if deleted:
+            table.delete(key)
+        if data is not None:
+            table.set(key, swsscommon.FieldValuePairs(list(data.items())))
+
+    def flush_appl_db_batch(self):
+        batch, self.appl_db_batch = self.appl_db_batch, None
+        if not batch:
+            return
+        cnt = 0
+        for table_name, updates in batch.items():
+            for key, (deleted, data) in updates.items():
+                self.write_appl_db(table_name, key, deleted, data)
+            cnt += len(updates)
+        self.appl_pipeline.flush()
+        log_debug("flushed %d appl_db updates" % cnt)
+
     def set_bfd_session_into_appl_db(self, key, data):
-        fvs = swsscommon.FieldValuePairs(list(data.items()))
-        self.bfd_appl_tbl.set(key, fvs)
+        self.update_appl_db(BFD_SESSION_TABLE_NAME, key, data)
         log_debug("set bfd session to appl_db, key %s, data %s"%(key, str(data)))
 
     def del_bfd_session_from_appl_db(self, key):
-        self.bfd_appl_tbl.delete(key)
+        self.update_appl_db(BFD_SESSION_TABLE_NAME, key, None)
 
     def interface_set_handler(self, key, data):
         valid, is_ipv4, if_name, ip = self.get_ip_from_key(key)
@@ -318,16 +378,10 @@ class StaticRouteBfd(object):
 
     def refresh_active_nh(self, route_cfg_key):
         data = self.get_local_db(LOCAL_CONFIG_TABLE, route_cfg_key)
-
-        arg_list    = lambda v: [x.strip() for x in v.split(',')] if len(v.strip()) != 0 else None
-        nh_list     = arg_list(data['nexthop']) if 'nexthop' in data else None
-        nh_vrf_list = arg_list(data['nexthop-vrf']) if 'nexthop-vrf' in data else None
+        route_nexthops = self.get_route_nexthops(route_cfg_key)
         nh_cnt      = 0
 
-        for index in range(len(nh_list)):
-            nh_ip = nh_list[index]
-            nh_vrf = nh_vrf_list[index]
-            nh_key = nh_vrf + "|" + nh_ip
+        for nh_vrf, nh_ip, _, _, _ in route_nexthops:
             bfd_key = nh_vrf + ":default:" + nh_ip
 
             bfd_session = self.get_local_db(LOCAL_BFD_TABLE, bfd_key)
@@ -343,7 +397,7 @@ class StaticRouteBfd(object):
 
         #if there is any bfd session state UP, we don't need to hold the static route update.
         data['bfd_nh_hold'] = "false"
-        new_config = self.reconstruct_static_route_config(data, self.get_local_db(LOCAL_SRT_TABLE, route_cfg_key))
+        new_config = self.reconstruct_static_route_config(data, self.get_local_db(LOCAL_SRT_TABLE, route_cfg_key), route_nexthops)
         self.set_static_route_into_appl_db(route_cfg_key.replace("|", ":"), new_config)
 
     def handle_bfd_change(self, cfg_key, data, to_bfd_enable):
@@ -424,6 +478,7 @@ class StaticRouteBfd(object):
             #skip if bfd is not enabled, but store it to local_db to detect bfd field dynamic change
             data['bfd'] = "false"
             self.set_local_db(LOCAL_CONFIG_TABLE, route_cfg_key, data)
+            self.remove_from_local_db(LOCAL_ROUTE_NH_TABLE, route_cfg_key)
             return True
 
         bkh_list    = arg_list(data['blackhole']) if 'blackhole' in data else None
@@ -460,6 +515,7 @@ class StaticRouteBfd(object):
                         self.del_bfd_session_from_appl_db(bfd_key)
 
         self.set_local_db(LOCAL_CONFIG_TABLE, route_cfg_key, data)
+        self.set_local_db(LOCAL_ROUTE_NH_TABLE, route_cfg_key, self.parse_route_nexthops(data))
         for index in range(len(nh_list)):
             nh_ip = nh_list[index]
             intf = intf_list[index]
@@ -538,6 +594,7 @@ class StaticRouteBfd(object):
             self.del_static_route_from_appl_db(route_cfg_key.replace("|", ":"))
 
         self.remove_from_local_db(LOCAL_SRT_TABLE, route_cfg_key)
+        self.remove_from_local_db(LOCAL_ROUTE_NH_TABLE, route_cfg_key)
 
         if redis_del:
             self.remove_from_local_db(LOCAL_CONFIG_TABLE, route_cfg_key)
@@ -583,35 +640,43 @@ class StaticRouteBfd(object):
                 self.remove_from_local_db(LOCAL_SRT_TABLE, srt_key)
 
     def set_static_route_into_appl_db(self, key, data):
-        fvs = swsscommon.FieldValuePairs(list(data.items()))
-        self.static_route_appl_tbl.set(key, fvs)
+        self.update_appl_db(STATIC_ROUTE_TABLE_NAME, key, data)
         log_debug("SRT_BFD: set static route to appl_db, key %s, data %s"%(key, str(data)))
 
     def del_static_route_from_appl_db(self, key):
-        self.static_route_appl_tbl.delete(key)
+        self.update_appl_db(STATIC_ROUTE_TABLE_NAME, key, None)
 
-    def reconstruct_static_route_config(self, original_config, reachable_nexthops):
+    def parse_route_nexthops(self, config):
+        """
+        Split the nexthop lists of a static route config per nexthop.
+        :param config: static route config
+        :return: list of (nh_vrf, nh_ip, ifname, blackhole, distance) tuples
+        """
         arg_list    = lambda v: [x.strip() for x in v.split(',')] if len(v.strip()) != 0 else None
-        bkh_list    = arg_list(original_config['blackhole']) if 'blackhole' in original_config else None
-        nh_list     = arg_list(original_config['nexthop']) if 'nexthop' in original_config else None
-        intf_list   = arg_list(original_config['ifname']) if 'ifname' in original_config else None
-        dist_list   = arg_list(original_config['distance']) if 'distance' in original_config else None
-        nh_vrf_list = arg_list(original_config['nexthop-vrf']) if 'nexthop-vrf' in original_config else None
-
-        bkh_candidate = ""
-        nh_candidate = ""
-        intf_candidate = ""
-        dist_candidate = ""
-        nh_vrf_candidate = ""
-
-
-        for i in range(len(nh_list)):
-            if (nh_vrf_list[i], nh_list[i]) in reachable_nexthops:
-                bkh_candidate += "," + (bkh_list[i] if bkh_list else "")
-                nh_candidate += "," + (nh_list[i] if nh_list else "")
-                intf_candidate += "," + (intf_list[i] if intf_list else "")
-                dist_candidate += "," + (dist_list[i] if dist_list else "")
-                nh_vrf_candidate += "," + (nh_vrf_list[i] if nh_vrf_list else "")
+        bkh_list    = arg_list(config['blackhole']) if 'blackhole' in config else None
+        nh_list     = arg_list(config['nexthop']) if 'nexthop' in config else None
+        intf_list   = arg_list(config['ifname']) if 'ifname' in config else None
+        dist_list   = arg_list(config['distance']) if 'distance' in config else None
+        nh_vrf_list = arg_list(config['nexthop-vrf']) if 'nexthop-vrf' in config else None
+
+        if nh_list is None:
+            return []
+        return [(nh_vrf_list[i] if nh_vrf_list else "",
+                 nh_list[i],
+                 intf_list[i] if intf_list else "",
+                 bkh_list[i] if bkh_list else "",
+                 dist_list[i] if dist_list else "") for i in range(len(nh_list))]
+
+    def get_route_nexthops(self, route_cfg_key):
+        nexthops = self.get_local_db(LOCAL_ROUTE_NH_TABLE, route_cfg_key)
+        if len(nexthops) == 0:
+            nexthops = self.parse_route_nexthops(self.get_local_db(LOCAL_CONFIG_TABLE, route_cfg_key))
+        return nexthops
+
+    def reconstruct_static_route_config(self, original_config, reachable_nexthops, route_nexthops=None):
+        if route_nexthops is None:
+            route_nexthops = self.parse_route_nexthops(original_config)
+        candidates = [nh for nh in route_nexthops if (nh[0], nh[1]) in reachable_nexthops]
 
         new_config = dict()
         for key in original_config:
@@ -619,16 +684,9 @@ class StaticRouteBfd(object):
                 continue
             if key == "bfd_nh_hold":
                 continue
-            if key == "blackhole":
-                new_config[key] = bkh_candidate[1:]
-            elif key == "nexthop":
-                new_config[key] = nh_candidate[1:]
-            elif key == "ifname":
-                new_config[key] = intf_candidate[1:]
-            elif key == "distance":
-                new_config[key] = dist_candidate[1:]
-            elif key == "nexthop-vrf":
-                new_config[key] = nh_vrf_candidate[1:]
+            if key in ROUTE_NH_FIELDS:
+                idx = ROUTE_NH_FIELDS[key]
+                new_config[key] = ",".join([nh[idx] for nh in candidates])
             else:
                 new_config[key] = original_config[key]
         new_config["expiry"] = "false"
@@ -664,7 +722,8 @@ class StaticRouteBfd(object):
                 config_data = self.get_local_db(LOCAL_CONFIG_TABLE, config_key)
                 #exit "hold" state when any BFD session becomes UP
                 config_data['bfd_nh_hold'] = "false"
-                new_config = self.reconstruct_static_route_config(config_data, self.get_local_db(LOCAL_SRT_TABLE, srt_key))
+                new_config = self.reconstruct_static_route_config(config_data, self.get_local_db(LOCAL_SRT_TABLE, srt_key),
+                                                                                  self.get_route_nexthops(config_key))
                 self.set_static_route_into_appl_db(srt_key.replace("|", ":"), new_config)
 
         elif state.upper() == "DOWN":
@@ -681,7 +740,8 @@ class StaticRouteBfd(object):
                     self.del_static_route_from_appl_db(srt_key.replace("|", ":"))
                 else:
                     config_data = self.get_local_db(LOCAL_CONFIG_TABLE, config_key)
-                    new_config = self.reconstruct_static_route_config(config_data, self.get_local_db(LOCAL_SRT_TABLE, srt_key))
+                    new_config = self.reconstruct_static_route_config(config_data, self.get_local_db(LOCAL_SRT_TABLE, srt_key),
+                                                                                      self.get_route_nexthops(config_key))
                     self.set_static_route_into_appl_db(srt_key.replace("|", ":"), new_config)
 
 
@@ -700,7 +760,8 @@ class StaticRouteBfd(object):
                 self.del_static_route_from_appl_db(srt_key.replace("|", ":"))
             else:
                 config_data = self.get_local_db(LOCAL_CONFIG_TABLE, config_key)
-                new_config = self.reconstruct_static_route_config(config_data, self.get_local_db(LOCAL_SRT_TABLE, srt_key))
+                new_config = self.reconstruct_static_route_config(config_data, self.get_local_db(LOCAL_SRT_TABLE, srt_key),
+                                                                                  self.get_route_nexthops(config_key))
                 self.set_static_route_into_appl_db(srt_key.replace("|", ":"), new_config)
 
     def bfd_state_callback(self, key, op, data):
@@ -742,6 +803,9 @@ class StaticRouteBfd(object):
             elif state == self.selector.ERROR:
                 raise Exception("Received error from select")
 
+            #collect the appl_db updates of all events in this cycle and write them in one pipeline
+            self.begin_appl_db_batch()
+
             if self.first_time:
                 self.first_time = False
                 self.reconciliation()
@@ -755,6 +819,8 @@ class StaticRouteBfd(object):
                     for callback in self.callbacks[sub.getDbConnector().getDbId()][sub.getTableName()]:
                         callback(key, op, dict(fvs))
 
+            self.flush_appl_db_batch()
+
 def do_work():
     sr_bfd = StaticRouteBfd()
     sr_bfd.run()
@@ -0,0 +1,149 @@
+import json
+import os
+import re
+
+from unittest.mock import MagicMock, patch
+
+from bgpmon.bgpmon import ADJCHANGE_LOG_FILE, BgpStateGet, FrrLogTail, poll_once
+
+
+ADJCHANGE_LOG = """\
+Jan  1 00:00:01.000000 sonic INFO bgp#bgpd[41]: [M59KS-A3ZXZ] bgp_update_receive: rcvd End-of-RIB for IPv4 Unicast from 10.0.0.1
+Jan  1 00:00:02.000000 sonic NOTICE bgp#bgpd[41]: [VTVCM-Y2NW3] %ADJCHANGE: neighbor 10.0.0.1(ARISTA01T2) in vrf default Up
+Jan  1 00:00:03.000000 sonic NOTICE bgp#bgpd[41]: [VTVCM-Y2NW3] %ADJCHANGE: neighbor fc00::2(ARISTA01T2) in vrf default Down BGP Notification send
+Jan  1 00:00:04.000000 sonic NOTICE bgp#bgpd[41]: [VTVCM-Y2NW3] %ADJCHANGE: neighbor 10.1.0.1(ARISTA02T2) in vrf Vrf_red Up
+Jan  1 00:00:05.000000 sonic NOTICE bgp#bgpd[41]: %ADJCHANGE: neighbor 10.0.0.57 Up
+"""
+
+@patch('bgpmon.bgpmon.swsscommon')
+def constructor(mocked_swsscommon):
+    return BgpStateGet()
+
+def neighbor_json(peer, state, remote_as, local_as, afi="ipv4Unicast", **kwargs):
+    info = {"bgpState": state, "remoteAs": remote_as, "localAs": local_as, "addressFamilyInfo": {afi: {}}}
+    info.update(kwargs)
+    return 0, json.dumps({peer: info})
+
+def test_rsyslog_writes_followed_file():
+    # bgpd logs are forwarded to the host, the container rsyslog keeps the %ADJCHANGE messages for bgpmon
+    conf = os.path.join(os.path.dirname(__file__), "..", "..", "..", "dockers", "docker-fpm-frr", "bgpmon_rsyslog.conf")
+    with open(conf) as fp:
+        text = fp.read()
+    assert re.search(r'^if \$programname == "bgpd" and \$msg contains "%ADJCHANGE" then', text, re.M)
+    assert re.search(r'^\s*file="%s"$' % ADJCHANGE_LOG_FILE, text, re.M)
+    assert FrrLogTail().filename == ADJCHANGE_LOG_FILE
+
+def test_log_tail(tmpdir):
+    log_file = str(tmpdir.join("bgpd_adjchange.log"))
+    with open(log_file, "w") as fp:
+        fp.write("old %ADJCHANGE: neighbor 10.0.0.3 Up\n")
+    tail = FrrLogTail(log_file)
+    # the lines written before the start are covered by the reconciliation
+    assert tail.get_changed_peers() == set()
+    assert tail.is_following()
+    with open(log_file, "a") as fp:
+        fp.write(ADJCHANGE_LOG)
+        fp.write("Jan  1 00:00:06.000000 sonic NOTICE bgp#bgpd[41]: %ADJCHANGE: neighbor 10.0.0.5")
+    assert tail.get_changed_peers() == {"10.0.0.1", "fc00::2", "10.0.0.57"}
+    assert tail.get_changed_peers() == set()
+    with open(log_file, "a") as fp:
+        fp.write(" Up\n")
+    assert tail.get_changed_peers() == {"10.0.0.5"}
+
+def test_log_tail_rotate(tmpdir):
+    log_file = str(tmpdir.join("bgpd_adjchange.log"))
+    open(log_file, "w").close()
+    tail = FrrLogTail(log_file)
+    tail.get_changed_peers()
+    with open(log_file, "a") as fp:
+        fp.write("%ADJCHANGE: neighbor 10.0.0.1 Up\n")
+    os.rename(log_file, log_file + ".1")
+    with open(log_file, "w") as fp:
+        fp.write("%ADJCHANGE: neighbor 10.0.0.3 Down\n")
+    assert tail.get_changed_peers() == {"10.0.0.1", "10.0.0.3"}
+    os.remove(log_file)
+    assert tail.get_changed_peers() == set()
+    assert not tail.is_following()
+
+def test_log_tail_no_file(tmpdir):
+    tail = FrrLogTail(str(tmpdir.join("bgpd_adjchange.log")))
+    assert tail.get_changed_peers() == set()
+    assert not tail.is_following()
+
+@patch('bgpmon.bgpmon.getstatusoutput_noshell')
+def test_update_peers(mocked_getstatusoutput):
+    bgp_state_get = constructor()
+    bgp_state_get.flush_pipe = MagicMock()
+    bgp_state_get.peer_l = {"10.0.0.1", "10.0.0.3", "10.0.0.5"}
+    bgp_state_get.peer_state = {"10.0.0.1": "Active", "10.0.0.3": "Established", "10.0.0.5": "Established"}
+    replies = {
+        "10.0.0.1": neighbor_json("10.0.0.1", "Established", 65200, 65100),
+        "10.0.0.3": (0, json.dumps({"bgpNoSuchNeighbor": True})),
+        "10.0.0.5": neighbor_json("10.0.0.5", "Established", 65100, 65100),
+        "10.0.0.7": neighbor_json("10.0.0.7", "Connect", 65100, 65100, afi="l2VpnEvpn"),
+        "fc00::2": neighbor_json("fc00::2", "Idle", 65100, 65100, afi="ipv6Unicast"),
+        "10.0.0.9": (1, ""),
+        "10.0.0.11": neighbor_json("10.0.0.11", "Idle", 65200, 65100, adminShutDown=True),
+    }
+    mocked_getstatusoutput.side_effect = lambda cmd: replies[cmd[2].split()[3]]
+    bgp_state_get.update_peers({"10.0.0.1", "10.0.0.3", "10.0.0.5", "10.0.0.7", "fc00::2", "10.0.0.9", "10.0.0.11"})
+    bgp_state_get.flush_pipe.assert_called_once_with({
+        "NEIGH_STATE_TABLE|10.0.0.1": {"state": "Established", "peerType": "e-BGP"},
+        "NEIGH_STATE_TABLE|10.0.0.3": None,
+        "NEIGH_STATE_TABLE|fc00::2": {"state": "Idle", "peerType": "i-BGP"},
+        "NEIGH_STATE_TABLE|10.0.0.11": {"state": "Idle (Admin)", "peerType": "e-BGP"},
+    })
+    assert bgp_state_get.peer_l == {"10.0.0.1", "10.0.0.5", "fc00::2", "10.0.0.11"}
+    assert bgp_state_get.peer_state == {"10.0.0.1": "Established", "10.0.0.5": "Established", "fc00::2": "Idle",
+                                        "10.0.0.11": "Idle (Admin)"}
+
+@patch('bgpmon.bgpmon.getstatusoutput_noshell')
+def test_update_peers_same_state_as_summary(mocked_getstatusoutput):
+    # a neighbor reconciled from show bgp summary json isn't rewritten by the per neighbor update
+    bgp_state_get = constructor()
+    bgp_state_get.flush_pipe = MagicMock()
+    summary = {"ipv4Unicast": {"peers": {"10.0.0.11": {"state": "Idle (Admin)", "remoteAs": 65200, "localAs": 65100}}}}
+    mocked_getstatusoutput.return_value = 0, json.dumps(summary)
+    bgp_state_get.get_all_neigh_states()
+    bgp_state_get.update_neigh_states()
+    bgp_state_get.flush_pipe.reset_mock()
+    mocked_getstatusoutput.return_value = neighbor_json("10.0.0.11", "Idle", 65200, 65100, adminShutDown=True)
+    bgp_state_get.update_peers({"10.0.0.11"})
+    assert not bgp_state_get.flush_pipe.called
+    assert bgp_state_get.peer_state == {"10.0.0.11": "Idle (Admin)"}
+
+def test_update_peers_many():
+    bgp_state_get = constructor()
+    bgp_state_get.get_all_neigh_states = MagicMock()
+    bgp_state_get.update_neigh_states = MagicMock()
+    bgp_state_get.get_neigh_state = MagicMock()
+    bgp_state_get.update_peers({"10.0.0.%d" % i for i in range(20)})
+    assert bgp_state_get.get_all_neigh_states.called
+    assert bgp_state_get.update_neigh_states.called
+    assert not bgp_state_get.get_neigh_state.called
+
+def test_poll_once():
+    bgp_state_get = MagicMock()
+    log_tail = MagicMock()
+    log_tail.is_following.return_value = True
+    log_tail.get_changed_peers.return_value = {"10.0.0.1"}
+
+    # full reconcile covers the changed peers
+    bgp_state_get.bgp_activity_detected.return_value = True
+    next_reconcile = poll_once(bgp_state_get, log_tail, 0, 60)
+    assert next_reconcile > 0
+    assert bgp_state_get.update_neigh_states.called
+    assert not bgp_state_get.update_peers.called
+
+    # reconcile is due but skipped, the changed peers are still updated
+    bgp_state_get.reset_mock()
+    bgp_state_get.bgp_activity_detected.return_value = False
+    poll_once(bgp_state_get, log_tail, 0, 60)
+    assert not bgp_state_get.update_neigh_states.called
+    bgp_state_get.update_peers.assert_called_once_with({"10.0.0.1"})
+
+    # reconcile is not due
+    bgp_state_get.reset_mock()
+    assert poll_once(bgp_state_get, log_tail, next_reconcile, 60) == next_reconcile
+    assert not bgp_state_get.bgp_activity_detected.called
+    bgp_state_get.update_peers.assert_called_once_with({"10.0.0.1"})
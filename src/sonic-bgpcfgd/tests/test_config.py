@@ -1,4 +1,4 @@
-from unittest.mock import MagicMock
+from unittest.mock import MagicMock, call, patch
 
 from bgpcfgd.config import ConfigMgr
 
@@ -205,3 +205,53 @@ def test_from_canonical():
     c = ConfigMgr(frr)
     raw = c.from_canonical(canonical)
     assert raw == expected
+
+@patch('bgpcfgd.config.time.time')
+def test_commit_delay(mocked_time):
+    frr = MagicMock()
+    frr.write = MagicMock(return_value = True)
+    frr.restart_peer_groups = MagicMock(return_value = True)
+    c = ConfigMgr(frr, commit_delay=2)
+    mocked_time.return_value = 100.0
+    c.push("change1")
+    c.restart_peer_groups(["pg1"])
+    assert c.commit()
+    mocked_time.return_value = 101.5
+    c.push("change2")
+    assert c.commit()
+    assert not frr.write.called
+    mocked_time.return_value = 102.0
+    assert c.commit()
+    frr.write.assert_called_once_with('change1\nchange2\n')
+    frr.restart_peer_groups.assert_called_once_with(["pg1"])
+    assert c.changes == ""
+
+def test_commit_delay_force():
+    frr = MagicMock()
+    c = ConfigMgr(frr, commit_delay=60)
+    c.push("change1")
+    c.commit()
+    assert not frr.write.called
+    c.commit(force=True)
+    frr.write.assert_called_once_with('change1\n')
+
+def test_commit_delay_update_flushes():
+    frr = MagicMock()
+    frr.get_config = MagicMock(return_value = "route-map rm1 permit 10\n")
+    c = ConfigMgr(frr, commit_delay=60)
+    c.push("route-map rm1 permit 10")
+    c.update()
+    # the running config is read after the pending changes are written
+    frr.write.assert_called_once_with('route-map rm1 permit 10\n')
+    assert frr.method_calls.index(call.write('route-map rm1 permit 10\n')) < frr.method_calls.index(call.get_config())
+    assert c.changes == ""
+    assert c.get_text() == ['route-map rm1 permit 10', '', '     ']
+
+def test_commit_restart_peer_groups_only():
+    frr = MagicMock()
+    c = ConfigMgr(frr, commit_delay=60)
+    c.restart_peer_groups(["pg1"])
+    c.commit(force=True)
+    assert not frr.write.called
+    frr.restart_peer_groups.assert_called_once_with(["pg1"])
+    assert c.peer_groups_to_restart == []
@@ -0,0 +1,63 @@
+
+from unittest.mock import patch
+
+from bgpcfgd.directory import Directory
+from . import swsscommon_test
+
+with patch.dict("sys.modules", swsscommon=swsscommon_test):
+    from bgpcfgd.manager import Manager
+    from bgpcfgd.managers_db import BGPDataBaseMgr
+
+NEIGHBORS = 10000
+
+
+class PeerMgr(Manager):
+    """ Peers which wait for bgp_asn and for the interface with their local address """
+    def __init__(self, common_objs):
+        super(PeerMgr, self).__init__(
+            common_objs,
+            [("CONFIG_DB", "DEVICE_METADATA", "localhost/bgp_asn"), ("LOCAL", "interfaces", "")],
+            "CONFIG_DB",
+            "BGP_NEIGHBOR",
+        )
+        self.calls = 0
+        self.peers = set()
+
+    def set_handler(self, key, data):
+        self.calls += 1
+        if data["local_addr"] not in self.directory.get_slot("LOCAL", "interfaces"):
+            return False
+        self.peers.add(key)
+        return True
+
+
+def test_queued_sets_scale():
+    common_objs = {
+        'directory': Directory(),
+        'cfg_mgr':   None,
+        'constants': {},
+    }
+    set_command = swsscommon_test.swsscommon.SET_COMMAND
+    peer_mgr = PeerMgr(common_objs)
+    intf_mgr = BGPDataBaseMgr(common_objs, "LOCAL", "interfaces")
+    meta_mgr = BGPDataBaseMgr(common_objs, "CONFIG_DB", "DEVICE_METADATA")
+
+    intf_mgr.handler_batch([("Loopback0", set_command, {})])
+
+    peer_mgr.handler_batch([("10.1.%d.%d" % (i // 256, i % 256), set_command, {"local_addr": "10.0.%d.%d" % (i // 256, i % 256)})
+                            for i in range(NEIGHBORS)])
+    assert len(peer_mgr.set_queue) == NEIGHBORS
+    assert peer_mgr.calls == 0
+
+    meta_mgr.handler_batch([("localhost", set_command, {"bgp_asn": "65100"})])
+    assert peer_mgr.calls == NEIGHBORS
+    # a put which doesn't change the table doesn't replay the queue
+    meta_mgr.handler_batch([("localhost", set_command, {"bgp_asn": "65100"})])
+    assert peer_mgr.calls == NEIGHBORS
+
+    intf_mgr.handler_batch([("10.0.%d.%d" % (i // 256, i % 256), set_command, {}) for i in range(NEIGHBORS)])
+
+    assert len(peer_mgr.peers) == NEIGHBORS
+    assert peer_mgr.set_queue == []
+    # the queue is replayed once per batch, not once per interface
+    assert peer_mgr.calls == 2 * NEIGHBORS
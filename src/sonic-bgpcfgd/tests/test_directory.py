@@ -55,3 +55,54 @@ def test_directory(mocked_log_err):
     # Test remove_slot() with nonexist table
     directory.remove_slot("db_name", "table_nonexist")
     mocked_log_err.assert_called_with("Directory: Can't remove slot 'db_name__table_nonexist'. The slot doesn't exist")
+
+def test_directory_notify():
+    directory = Directory()
+    handler = MagicMock()
+    directory.subscribe([("CONFIG_DB", "DEVICE_METADATA", "localhost/bgp_asn")], handler)
+
+    # other keys and paths don't trigger the handler
+    directory.put("CONFIG_DB", "DEVICE_METADATA", "remote", {"bgp_asn": "65100"})
+    directory.put("CONFIG_DB", "DEVICE_METADATA", "localhost", {"hostname": "switch"})
+    assert handler.call_count == 0
+
+    # the path appeared
+    directory.put("CONFIG_DB", "DEVICE_METADATA", "localhost", {"hostname": "switch", "bgp_asn": "65100"})
+    assert handler.call_count == 1
+
+    # the path value is the same
+    directory.put("CONFIG_DB", "DEVICE_METADATA", "localhost", {"hostname": "switch1", "bgp_asn": "65100"})
+    assert handler.call_count == 1
+
+    # the path value was changed
+    directory.put("CONFIG_DB", "DEVICE_METADATA", "localhost", {"hostname": "switch1", "bgp_asn": "65200"})
+    assert handler.call_count == 2
+
+    # the path appeared again after removal
+    directory.remove("CONFIG_DB", "DEVICE_METADATA", "localhost")
+    directory.put("CONFIG_DB", "DEVICE_METADATA", "localhost", {"hostname": "switch1", "bgp_asn": "65200"})
+    assert handler.call_count == 3
+
+def test_directory_notify_slot():
+    directory = Directory()
+    handler = MagicMock()
+    directory.subscribe([("LOCAL", "interfaces", "")], handler)
+    directory.put("LOCAL", "interfaces", "Ethernet0|10.0.0.0/31", {})
+    directory.put("LOCAL", "interfaces", "Ethernet4|10.0.0.2/31", {})
+    assert handler.call_count == 2
+    # the put didn't change the slot
+    directory.put("LOCAL", "interfaces", "Ethernet4|10.0.0.2/31", {})
+    assert handler.call_count == 2
+
+def test_directory_batch():
+    directory = Directory()
+    handler = MagicMock()
+    directory.subscribe([("LOCAL", "interfaces", ""), ("LOCAL", "local_addresses", "")], handler)
+    with directory.batch():
+        for i in range(10):
+            directory.put("LOCAL", "interfaces", "Ethernet%d|10.0.0.%d/31" % (i * 4, i * 2), {})
+            directory.put("LOCAL", "local_addresses", "10.0.0.%d" % (i * 2), {})
+        with directory.batch():
+            directory.put("LOCAL", "interfaces", "Ethernet40|10.0.0.20/31", {})
+        assert handler.call_count == 0
+    assert handler.call_count == 1
@@ -1,4 +1,7 @@
-from unittest.mock import patch
+import socket
+import threading
+
+from unittest.mock import MagicMock, patch
 import bgpcfgd.frr
 import pytest
 
@@ -24,7 +27,7 @@ def test_wait_for_daemons_error():
         assert f.wait_for_daemons(5)
 
 def test_get_config():
-    bgpcfgd.frr.run_command = lambda cmd: (0, "expected config", "")
+    bgpcfgd.frr.run_command = lambda cmd: (0, "expected config", "") if cmd == ["vtysh", "-c", "show running-config"] else None
     f = bgpcfgd.frr.FRR(["abc", "cde"])
     out = f.get_config()
     assert out == "expected config"
@@ -66,3 +69,71 @@ def test_restart_peer_groups_fail(mocked_log_crit):
     res = f.restart_peer_groups(["pg_1", "pg_2"])
     assert not res, "Expect False return value"
     mocked_log_crit.assert_called_with("Can't restart bgp peer-group 'pg_2'. rc='1', out='some output', err='some error'")
+
+def fake_vty_server(socket_path, replies):
+    """ Serve one vty client. replies maps a command to (return code, output) """
+    server = socket.socket(socket.AF_UNIX, socket.SOCK_STREAM)
+    server.bind(socket_path)
+    server.listen(1)
+    received = []
+    def serve():
+        conn, _ = server.accept()
+        buf = b''
+        while True:
+            data = conn.recv(1024)
+            if not data:
+                break
+            buf += data
+            while b'\0' in buf:
+                command, buf = buf.split(b'\0', 1)
+                command = command.decode()
+                received.append(command)
+                rc, out = replies.get(command, (0, ""))
+                conn.sendall(out.encode() + b'\0\0\0' + bytes([rc]))
+        conn.close()
+        server.close()
+    thr = threading.Thread(target=serve)
+    thr.start()
+    return thr, received
+
+def test_vty_session(tmpdir):
+    socket_path = str(tmpdir.join("bgpd.vty"))
+    replies = {
+        "show bgp vrfs json": (0, '{"vrfs": {"default": {}}}'),
+        "clear bgp peer-group pg_2 soft in": (1, "% No such peer-group"),
+    }
+    thr, received = fake_vty_server(socket_path, replies)
+    session = bgpcfgd.frr.VtySession(socket_path=socket_path)
+    assert session.connect()
+    assert session.run("show bgp vrfs json") == (0, '{"vrfs": {"default": {}}}')
+    assert session.run("clear bgp peer-group pg_2 soft in") == (1, "% No such peer-group")
+    session.close()
+    thr.join()
+    assert received == ["enable", "show bgp vrfs json", "clear bgp peer-group pg_2 soft in"]
+    assert session.run("show bgp vrfs json") == (None, "")
+
+def test_vty_session_no_socket(tmpdir):
+    session = bgpcfgd.frr.VtySession(socket_path=str(tmpdir.join("bgpd.vty")))
+    assert not session.connect()
+    assert session.run("show bgp vrfs json") == (None, "")
+
+def test_restart_peer_groups_vty_session(tmpdir):
+    socket_path = str(tmpdir.join("bgpd.vty"))
+    thr, received = fake_vty_server(socket_path, {})
+    bgpcfgd.frr.run_command = lambda cmd: pytest.fail("vtysh must not be executed")
+    with patch('bgpcfgd.frr.g_vty_session', bgpcfgd.frr.VtySession(socket_path=socket_path)) as session:
+        f = bgpcfgd.frr.FRR(["abc", "cde"])
+        res = f.restart_peer_groups(["pg_2", "pg_1", "pg_2"])
+        session.close()
+    thr.join()
+    assert res, "Expect True return value"
+    assert received == ["enable", "clear bgp peer-group pg_1 soft in", "clear bgp peer-group pg_2 soft in"]
+
+def test_get_config_vtysh():
+    # running config of all daemons, not only bgpd's from the vty session
+    bgpcfgd.frr.run_command = lambda cmd: (0, "expected config", "") if cmd == ["vtysh", "-c", "show running-config"] else None
+    session = MagicMock()
+    with patch('bgpcfgd.frr.g_vty_session', session):
+        out = bgpcfgd.frr.FRR(["abc", "cde"]).get_config()
+    assert out == "expected config"
+    assert not session.method_calls
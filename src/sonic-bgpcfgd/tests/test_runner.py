@@ -0,0 +1,120 @@
+from unittest.mock import MagicMock, call, patch
+
+from bgpcfgd.directory import Directory
+from . import swsscommon_test
+
+with patch.dict("sys.modules", swsscommon=swsscommon_test):
+    import bgpcfgd.runner
+    from bgpcfgd.manager import Manager
+    from bgpcfgd.runner import Runner
+
+
+class FakeSubscriber(object):
+    def __init__(self, fd, entries):
+        self.fd = fd
+        self.entries = list(entries)
+        self.popped = 0
+
+    def getFd(self):
+        return self.fd
+
+    def pop(self):
+        self.popped += 1
+        if not self.entries:
+            return "", "", ()
+        return self.entries.pop(0)
+
+def constructor(subscribers):
+    swsscommon = bgpcfgd.runner.swsscommon
+    swsscommon.reset_mock()
+    swsscommon.SonicDBConfig.getDbId = lambda db_name: {"CONFIG_DB": 4, "STATE_DB": 6}[db_name]
+    swsscommon.SubscriberStateTable.side_effect = lambda conn, table: subscribers[table]
+    cfg_mgr = MagicMock()
+    cfg_mgr.commit = MagicMock(return_value=True)
+    runner = Runner(cfg_mgr)
+    common_objs = {
+        'directory': Directory(),
+        'cfg_mgr':   cfg_mgr,
+        'tf':        MagicMock(),
+        'constants': {},
+    }
+    managers = {}
+    for table in subscribers:
+        m = Manager(common_objs, [], "CONFIG_DB", table)
+        m.handler_batch = MagicMock()
+        runner.add_manager(m)
+        managers[table] = m
+    return runner, managers
+
+def test_handler_batch_default():
+    m = Manager({'directory': Directory(), 'cfg_mgr': MagicMock(), 'constants': {}}, [], "CONFIG_DB", "BGP_NEIGHBOR")
+    m.handler = MagicMock()
+    m.handler_batch([("10.0.0.1", "SET", {"asn": "65001"}), ("10.0.0.3", "DEL", {})])
+    m.handler.assert_has_calls([call("10.0.0.1", "SET", {"asn": "65001"}), call("10.0.0.3", "DEL", {})])
+
+def test_process_only_ready_subscriber():
+    neighbors = FakeSubscriber(10, [("10.0.0.%d" % i, "SET", (("asn", "65001"),)) for i in range(3)])
+    routes = FakeSubscriber(11, [("10.1.0.0/24", "SET", (("nexthop", "10.0.0.1"),))])
+    runner, managers = constructor({"BGP_NEIGHBOR": neighbors, "STATIC_ROUTE": routes})
+    runner.process(10)
+    managers["BGP_NEIGHBOR"].handler_batch.assert_called_once_with([
+        ("10.0.0.0", "SET", {"asn": "65001"}),
+        ("10.0.0.1", "SET", {"asn": "65001"}),
+        ("10.0.0.2", "SET", {"asn": "65001"}),
+    ])
+    assert routes.popped == 0
+    assert not managers["STATIC_ROUTE"].handler_batch.called
+    stats = runner.stats[managers["BGP_NEIGHBOR"]]
+    assert stats['events'] == 3
+    assert stats['batches'] == 1
+    assert stats['queue_depth'] == 3
+    assert stats['max_queue_depth'] == 3
+    assert runner.stats[managers["STATIC_ROUTE"]]['events'] == 0
+
+def test_process_empty():
+    neighbors = FakeSubscriber(10, [])
+    runner, managers = constructor({"BGP_NEIGHBOR": neighbors})
+    runner.process(10)
+    assert not managers["BGP_NEIGHBOR"].handler_batch.called
+    assert runner.stats[managers["BGP_NEIGHBOR"]]['batches'] == 0
+
+def test_export_stats():
+    runner, managers = constructor({"BGP_NEIGHBOR": FakeSubscriber(10, [])})
+    managers["BGP_NEIGHBOR"].set_queue = [("10.0.0.1", {})]
+    runner.update_stats(managers["BGP_NEIGHBOR"], 5, 1.5)
+    swsscommon = bgpcfgd.runner.swsscommon
+    runner.export_stats()
+    swsscommon.FieldValuePairs.assert_called_once_with([
+        ('events', '5'),
+        ('batches', '1'),
+        ('queue_depth', '5'),
+        ('max_queue_depth', '5'),
+        ('latency_ms', '1.500'),
+        ('max_latency_ms', '1.500'),
+        ('set_queue', '1'),
+    ])
+    runner.stats_table.set.assert_called_once_with("CONFIG_DB|BGP_NEIGHBOR|Manager", swsscommon.FieldValuePairs.return_value)
+    # the next export is postponed until STATS_INTERVAL passes
+    runner.export_stats()
+    assert runner.stats_table.set.call_count == 1
+    runner.export_stats(force=True)
+    assert runner.stats_table.set.call_count == 2
+
+def test_run():
+    neighbors = FakeSubscriber(10, [("10.0.0.1", "SET", (("asn", "65001"),))])
+    runner, managers = constructor({"BGP_NEIGHBOR": neighbors})
+    runner.export_stats = MagicMock()
+    selectable = MagicMock()
+    selectable.getFd = MagicMock(return_value=10)
+    def select(timeout):
+        if neighbors.entries:
+            return runner.selector.OBJECT, selectable
+        bgpcfgd.runner.g_run = False
+        return runner.selector.TIMEOUT, None
+    runner.selector.select = select
+    try:
+        runner.run()
+    finally:
+        bgpcfgd.runner.g_run = True
+    managers["BGP_NEIGHBOR"].handler_batch.assert_called_once_with([("10.0.0.1", "SET", {"asn": "65001"})])
+    runner.cfg_manager.commit.assert_has_calls([call(force=False), call(force=False), call(force=True)])
@@ -1,20 +1,30 @@
-from unittest.mock import patch
-#from unittest.mock import MagicMock, patch
+from unittest.mock import MagicMock, patch
 
 from staticroutebfd.main import *
 from swsscommon import swsscommon
 
 @patch('swsscommon.swsscommon.DBConnector.__init__')
+@patch('swsscommon.swsscommon.RedisPipeline.__init__')
 @patch('swsscommon.swsscommon.ProducerStateTable.__init__')
 @patch('swsscommon.swsscommon.Table.__init__')
-def constructor(mock_db, mock_producer, mock_tbl):
+def constructor(mock_db, mock_pipeline, mock_producer, mock_tbl):
     mock_db.return_value = None
+    mock_pipeline.return_value = None
     mock_producer.return_value = None
     mock_tbl.return_value = None
 
     srt_bfd = StaticRouteBfd()
     return srt_bfd
 
+def mock_appl_db(dut):
+    dut.appl_pipeline = MagicMock()
+    dut.bfd_appl_tbl = MagicMock()
+    dut.static_route_appl_tbl = MagicMock()
+    dut.appl_tables = {
+        BFD_SESSION_TABLE_NAME: dut.bfd_appl_tbl,
+        STATIC_ROUTE_TABLE_NAME: dut.static_route_appl_tbl,
+    }
+
 def set_del_test(dut, hdlr, op, args, e_bfd_dict, e_srt_dict):
     set_del_test.bfd_dict = {}
     set_del_test.srt_dict = {}
@@ -677,5 +687,78 @@ def test_set_bfd_change_no_hold():
         {'set_default:2.2.2.0/24': {'nexthop': '192.168.2.2,192.168.1.2,192.168.3.2 ', 'ifname': 'if2,if1,if3', 'nexthop-vrf': 'default,default,default', 'expiry': 'false'}}
     )
 
-
-
+def test_appl_db_batch():
+    dut = constructor()
+    mock_appl_db(dut)
+
+    # without a batch every update is written and flushed right away
+    dut.set_static_route_into_appl_db("default:10.1.0.0/24", {"nexthop": "10.0.0.2"})
+    dut.static_route_appl_tbl.set.assert_called_once()
+    assert dut.appl_pipeline.flush.call_count == 1
+
+    dut.static_route_appl_tbl.reset_mock()
+    dut.appl_pipeline.reset_mock()
+    dut.begin_appl_db_batch()
+    dut.set_static_route_into_appl_db("default:10.1.0.0/24", {"nexthop": "10.0.0.2", "distance": "10"})
+    dut.set_static_route_into_appl_db("default:10.1.0.0/24", {"nexthop": "10.0.0.3"})
+    dut.set_static_route_into_appl_db("default:10.2.0.0/24", {"nexthop": "10.0.0.2"})
+    dut.del_static_route_from_appl_db("default:10.2.0.0/24")
+    dut.del_static_route_from_appl_db("default:10.3.0.0/24")
+    dut.set_static_route_into_appl_db("default:10.3.0.0/24", {"nexthop": "10.0.0.4"})
+    dut.del_bfd_session_from_appl_db("default:default:10.0.0.5")
+    assert not dut.static_route_appl_tbl.set.called
+    assert not dut.appl_pipeline.flush.called
+
+    dut.flush_appl_db_batch()
+    assert dut.appl_pipeline.flush.call_count == 1
+    routes = {call[0][0]: dict(call[0][1]) for call in dut.static_route_appl_tbl.set.call_args_list}
+    assert routes == {
+        "default:10.1.0.0/24": {"nexthop": "10.0.0.3", "distance": "10"},
+        "default:10.3.0.0/24": {"nexthop": "10.0.0.4"},
+    }
+    deleted = [call[0][0] for call in dut.static_route_appl_tbl.delete.call_args_list]
+    assert deleted == ["default:10.2.0.0/24", "default:10.3.0.0/24"]
+    dut.bfd_appl_tbl.delete.assert_called_once_with("default:default:10.0.0.5")
+
+    # nothing is left to write after the flush
+    dut.flush_appl_db_batch()
+    assert dut.appl_pipeline.flush.call_count == 1
+
+def test_scale_bfd_flap():
+    nh_count = 64
+    route_count = 20000
+    dut = constructor()
+    mock_appl_db(dut)
+    for i in range(nh_count):
+        dut.interface_set_handler("if%d|10.0.%d.1/24" % (i, i), {})
+
+    dut.begin_appl_db_batch()
+    for i in range(route_count):
+        nh1, nh2 = i % nh_count, (i + 1) % nh_count
+        dut.static_route_set_handler("20.%d.%d.0/24" % (i // 256, i % 256), {
+            "bfd": "true",
+            "ifname": "if%d, if%d" % (nh1, nh2),
+            "nexthop": "10.0.%d.2, 10.0.%d.2" % (nh1, nh2),
+        })
+    dut.flush_appl_db_batch()
+    assert dut.bfd_appl_tbl.set.call_count == nh_count
+    assert not dut.static_route_appl_tbl.set.called
+    assert len(dut.local_db[LOCAL_NEXTHOP_TABLE]["default|10.0.0.2"]) == route_count * 2 // nh_count
+
+    # every route has two nexthops coming up in the same cycle, but it is written only once
+    dut.begin_appl_db_batch()
+    for i in range(nh_count):
+        dut.bfd_state_set_handler("default|default|10.0.%d.2" % i, {"state": "Up"})
+    dut.flush_appl_db_batch()
+    assert dut.static_route_appl_tbl.set.call_count == route_count
+    assert dut.appl_pipeline.flush.call_count == 2
+
+    # a shared nexthop goes down, only the routes over it are rewritten
+    dut.static_route_appl_tbl.reset_mock()
+    dut.begin_appl_db_batch()
+    dut.bfd_state_set_handler("default|default|10.0.0.2", {"state": "Down"})
+    dut.flush_appl_db_batch()
+    assert dut.static_route_appl_tbl.set.call_count == route_count * 2 // nh_count
+    routes = {call[0][0]: dict(call[0][1]) for call in dut.static_route_appl_tbl.set.call_args_list}
+    assert routes["default:20.0.0.0/24"] == {"ifname": "if1", "nexthop": "10.0.1.2", "nexthop-vrf": "default", "expiry": "false"}
+    assert routes["default:20.0.63.0/24"] == {"ifname": "if63", "nexthop": "10.0.63.2", "nexthop-vrf": "default", "expiry": "false"}
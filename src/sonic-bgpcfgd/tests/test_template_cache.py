@@ -0,0 +1,47 @@
+import os
+
+from unittest.mock import patch
+
+from bgpcfgd.template import TemplateFabric
+from .test_templates import TEMPLATE_PATH, load_tests, load_json
+
+
+def shipped_templates():
+    names = []
+    for root, _, files in os.walk(TEMPLATE_PATH):
+        for name in files:
+            if name.endswith(".j2"):
+                names.append(os.path.relpath(os.path.join(root, name), TEMPLATE_PATH))
+    return sorted(names)
+
+def compile_all(tf, names):
+    """ Load every template and return how many of them were compiled from the source """
+    with patch.object(tf.env, "compile", wraps=tf.env.compile) as compile_mock:
+        for name in names:
+            tf.from_file(name)
+    return compile_mock.call_count
+
+def test_bytecode_cache_disabled():
+    with patch.dict(os.environ, {"SONIC_CACHE_PATH": ""}):
+        tf = TemplateFabric(TEMPLATE_PATH)
+    assert tf.env.bytecode_cache is None
+    tf = TemplateFabric(TEMPLATE_PATH, bytecode_cache_path="")
+    assert tf.env.bytecode_cache is None
+
+def test_bytecode_cache_cold_vs_warm(tmpdir):
+    cache_path = str(tmpdir)
+    names = shipped_templates()
+    assert compile_all(TemplateFabric(TEMPLATE_PATH, bytecode_cache_path=cache_path), names) == len(names)
+    cached_files = [name for _, _, files in os.walk(cache_path) for name in files]
+    assert len(cached_files) == len(names)
+    # a new fabric loads every template from the cache without compiling it
+    assert compile_all(TemplateFabric(TEMPLATE_PATH, bytecode_cache_path=cache_path), names) == 0
+
+def test_bytecode_cache_same_result(tmpdir):
+    cache_path = str(tmpdir)
+    template_fname, tests = load_tests("general", "peer-group.conf")
+    cold = TemplateFabric(TEMPLATE_PATH, bytecode_cache_path=cache_path).from_file(template_fname)
+    warm = TemplateFabric(TEMPLATE_PATH, bytecode_cache_path=cache_path).from_file(template_fname)
+    for _, param_fname, _ in tests:
+        params = load_json(param_fname)
+        assert cold.render(params) == warm.render(params)
@@ -1,11 +1,13 @@
 from __future__ import print_function
 
+import hashlib
 import ipaddress
 import math
 import os
 import sys
 import json
 import jinja2
+import pickle
 import subprocess
 from collections import defaultdict
 
@@ -15,6 +17,7 @@ from lxml.etree import QName
 from natsort import natsorted, ns as natsortns
 
 from portconfig import get_port_config, get_fabric_port_config, get_fabric_monitor_config
+from sonic_py_common.general import get_cache_dir
 from sonic_py_common.interface import backplane_prefix
 from sonic_py_common.multi_asic import is_multi_asic
 
@@ -73,12 +76,61 @@ acl_table_type_defination = {
     }
 }
 
+# Parsed xml documents keyed by content hash, so that one file is parsed only
+# once per process even if several parse_* functions are called on it
+XML_ROOT_CACHE_SIZE = 4
+xml_root_cache = {}
+
+# Element tag strings in Clark notation, see qname()
+qname_cache = {}
+
+# parse_xml() results persisted across processes, see parse_xml_cached()
+MINIGRAPH_CACHE_NAME = 'minigraph'
+MINIGRAPH_CACHE_FILES = 8
+
 ###############################################################################
 #
 # Minigraph parsing functions
 #
 ###############################################################################
 
+def index_children(element):
+    """ Map each child tag to the first child with that tag, same as element.find(tag)
+    but without scanning the children again for every lookup.
+    """
+    children = {}
+    for node in element:
+        if node.tag not in children:
+            children[node.tag] = node
+    return children
+
+def qname(namespace, tag):
+    """ Return the '{namespace}tag' string lxml uses for element tags.
+    Tag strings are built once and reused, as they are compared for every visited element.
+    """
+    key = (namespace, tag)
+    tag_str = qname_cache.get(key)
+    if tag_str is None:
+        tag_str = str(QName(namespace, tag))
+        qname_cache[key] = tag_str
+    return tag_str
+
+def parse_xml_root(filename, content=None):
+    """ Return the root element of the xml file, reusing an earlier parse of the same content.
+    The returned tree is shared and must not be modified.
+    """
+    if content is None:
+        with open(filename, 'rb') as f:
+            content = f.read()
+    digest = hashlib.sha256(content).hexdigest()
+    root = xml_root_cache.get(digest)
+    if root is None:
+        root = ET.fromstring(content, base_url=filename)
+        if len(xml_root_cache) >= XML_ROOT_CACHE_SIZE:
+            xml_root_cache.clear()
+        xml_root_cache[digest] = root
+    return root
+
 class minigraph_encoder(json.JSONEncoder):
     def default(self, obj):
         if isinstance(obj, (
@@ -124,29 +176,29 @@ def parse_device(device):
     d_subtype = None
 
     for node in device:
-        if node.tag == str(QName(ns, "Address")):
-            lo_prefix = node.find(str(QName(ns2, "IPPrefix"))).text
-        elif node.tag == str(QName(ns, "AddressV6")):
-            lo_prefix_v6 = node.find(str(QName(ns2, "IPPrefix"))).text
-        elif node.tag == str(QName(ns, "ManagementAddress")):
-            mgmt_prefix = node.find(str(QName(ns2, "IPPrefix"))).text
-        elif node.tag == str(QName(ns, "ManagementAddressV6")):
-            mgmt_prefix_v6 = node.find(str(QName(ns2, "IPPrefix"))).text
-        elif node.tag == str(QName(ns, "Hostname")):
+        if node.tag == qname(ns, "Address"):
+            lo_prefix = node.find(qname(ns2, "IPPrefix")).text
+        elif node.tag == qname(ns, "AddressV6"):
+            lo_prefix_v6 = node.find(qname(ns2, "IPPrefix")).text
+        elif node.tag == qname(ns, "ManagementAddress"):
+            mgmt_prefix = node.find(qname(ns2, "IPPrefix")).text
+        elif node.tag == qname(ns, "ManagementAddressV6"):
+            mgmt_prefix_v6 = node.find(qname(ns2, "IPPrefix")).text
+        elif node.tag == qname(ns, "Hostname"):
             name = node.text
-        elif node.tag == str(QName(ns, "HwSku")):
+        elif node.tag == qname(ns, "HwSku"):
             hwsku = node.text
-        elif node.tag == str(QName(ns, "DeploymentId")):
+        elif node.tag == qname(ns, "DeploymentId"):
             deployment_id = node.text
-        elif node.tag == str(QName(ns, "ElementType")):
+        elif node.tag == qname(ns, "ElementType"):
             d_type = node.text
-        elif node.tag == str(QName(ns, "ClusterName")):
+        elif node.tag == qname(ns, "ClusterName"):
             cluster = node.text
-        elif node.tag == str(QName(ns, "SubType")):
+        elif node.tag == qname(ns, "SubType"):
             d_subtype = node.text
 
-    if d_type is None and str(QName(ns3, "type")) in device.attrib:
-        d_type = device.attrib[str(QName(ns3, "type"))]
+    if d_type is None and qname(ns3, "type") in device.attrib:
+        d_type = device.attrib[qname(ns3, "type")]
 
     return (lo_prefix, lo_prefix_v6, mgmt_prefix, mgmt_prefix_v6, name, hwsku, d_type, deployment_id, cluster, d_subtype)
 
@@ -230,18 +282,45 @@ def parse_png(png, hname, dpg_ecmp_content = None):
     FG_NHG = {}
     NEIGH = {}
 
+    hname_lower = hname.lower()
     for child in png:
-        if child.tag == str(QName(ns, "DeviceInterfaceLinks")):
-            for link in child.findall(str(QName(ns, "DeviceLinkBase"))):
-                linktype = link.find(str(QName(ns, "ElementType"))).text
+        if child.tag == qname(ns, "DeviceInterfaceLinks"):
+            for link in child.findall(qname(ns, "DeviceLinkBase")):
+                fields = index_children(link)
+                linktype = fields.get(qname(ns, "ElementType")).text
+
+                if qname(ns3, "type") in link.attrib:
+                    link_type = link.attrib[qname(ns3, "type")]
+                    if link_type == 'DeviceSerialLink':
+                        for node in link:
+                            if node.tag == qname(ns, "EndPort"):
+                                console_port = node.text.split()[-1]
+                            elif node.tag == qname(ns, "EndDevice"):
+                                console_dev = node.text
+                    elif link_type == 'DeviceMgmtLink':
+                        for node in link:
+                            if node.tag == qname(ns, "EndPort"):
+                                mgmt_port = node.text.split()[-1]
+                            elif node.tag == qname(ns, "EndDevice"):
+                                mgmt_dev = node.text
+
+                if linktype == "LogicalLink":
+                    intf_name = fields.get(qname(ns, "EndPort")).text
+                    start_device = fields.get(qname(ns, "StartDevice")).text
+                    if intf_name in port_alias_map:
+                        intf_name = port_alias_map[intf_name]
+
+                    mux_cable_ports[intf_name] = start_device
+
                 if linktype == "DeviceSerialLink":
-                    enddevice = link.find(str(QName(ns, "EndDevice"))).text
-                    endport = link.find(str(QName(ns, "EndPort"))).text
-                    startdevice = link.find(str(QName(ns, "StartDevice"))).text
-                    startport = link.find(str(QName(ns, "StartPort"))).text
-                    baudrate = link.find(str(QName(ns, "Bandwidth"))).text
-                    flowcontrol = 1 if link.find(str(QName(ns, "FlowControl"))) is not None and link.find(str(QName(ns, "FlowControl"))).text == 'true' else 0
-                    if enddevice.lower() == hname.lower() and endport.isdigit():
+                    enddevice = fields.get(qname(ns, "EndDevice")).text
+                    endport = fields.get(qname(ns, "EndPort")).text
+                    startdevice = fields.get(qname(ns, "StartDevice")).text
+                    startport = fields.get(qname(ns, "StartPort")).text
+                    baudrate = fields.get(qname(ns, "Bandwidth")).text
+                    flowcontrol_node = fields.get(qname(ns, "FlowControl"))
+                    flowcontrol = 1 if flowcontrol_node is not None and flowcontrol_node.text == 'true' else 0
+                    if enddevice.lower() == hname_lower and endport.isdigit():
                         console_ports[endport] = {
                             'remote_device': startdevice,
                             'baud_rate': baudrate,
@@ -256,27 +335,27 @@ def parse_png(png, hname, dpg_ecmp_content = None):
                     continue
 
                 if linktype == "DeviceInterfaceLink":
-                    endport = link.find(str(QName(ns, "EndPort"))).text
-                    startdevice = link.find(str(QName(ns, "StartDevice"))).text
+                    endport = fields.get(qname(ns, "EndPort")).text
+                    startdevice = fields.get(qname(ns, "StartDevice")).text
                     port_device_map[endport] = startdevice
 
                 if linktype != "DeviceInterfaceLink" and linktype != "UnderlayInterfaceLink" and linktype != "DeviceMgmtLink":
                     continue
 
-                enddevice = link.find(str(QName(ns, "EndDevice"))).text
-                endport = link.find(str(QName(ns, "EndPort"))).text
-                startdevice = link.find(str(QName(ns, "StartDevice"))).text
-                startport = link.find(str(QName(ns, "StartPort"))).text
-                bandwidth_node = link.find(str(QName(ns, "Bandwidth")))
+                enddevice = fields.get(qname(ns, "EndDevice")).text
+                endport = fields.get(qname(ns, "EndPort")).text
+                startdevice = fields.get(qname(ns, "StartDevice")).text
+                startport = fields.get(qname(ns, "StartPort")).text
+                bandwidth_node = fields.get(qname(ns, "Bandwidth"))
                 bandwidth = bandwidth_node.text if bandwidth_node is not None else None
-                if enddevice.lower() == hname.lower():
+                if enddevice.lower() == hname_lower:
                     if endport in port_alias_map:
                         endport = port_alias_map[endport]
                     if linktype != "DeviceMgmtLink":
                         neighbors[endport] = {'name': startdevice, 'port': startport}
                     if bandwidth:
                         port_speeds[endport] = bandwidth
-                elif startdevice.lower() == hname.lower():
+                elif startdevice.lower() == hname_lower:
                     if startport in port_alias_map:
                         startport = port_alias_map[startport]
                     if linktype != "DeviceMgmtLink":
@@ -284,8 +363,8 @@ def parse_png(png, hname, dpg_ecmp_content = None):
                     if bandwidth:
                         port_speeds[startport] = bandwidth
 
-        if child.tag == str(QName(ns, "Devices")):
-            for device in child.findall(str(QName(ns, "Device"))):
+        if child.tag == qname(ns, "Devices"):
+            for device in child.findall(qname(ns, "Device")):
                 (lo_prefix, lo_prefix_v6, mgmt_prefix, mgmt_prefix_v6, name, hwsku, d_type, deployment_id, cluster, d_subtype) = parse_device(device)
                 device_data = {}
                 if hwsku != None:
@@ -308,34 +387,6 @@ def parse_png(png, hname, dpg_ecmp_content = None):
                     device_data['subtype'] = d_subtype
                 devices[name] = device_data
 
-        if child.tag == str(QName(ns, "DeviceInterfaceLinks")):
-            for if_link in child.findall(str(QName(ns, 'DeviceLinkBase'))):
-                if str(QName(ns3, "type")) in if_link.attrib:
-                    link_type = if_link.attrib[str(QName(ns3, "type"))]
-                    if link_type == 'DeviceSerialLink':
-                        for node in if_link:
-                            if node.tag == str(QName(ns, "EndPort")):
-                                console_port = node.text.split()[-1]
-                            elif node.tag == str(QName(ns, "EndDevice")):
-                                console_dev = node.text
-                    elif link_type == 'DeviceMgmtLink':
-                        for node in if_link:
-                            if node.tag == str(QName(ns, "EndPort")):
-                                mgmt_port = node.text.split()[-1]
-                            elif node.tag == str(QName(ns, "EndDevice")):
-                                mgmt_dev = node.text
-
-
-        if child.tag == str(QName(ns, "DeviceInterfaceLinks")):
-            for link in child.findall(str(QName(ns, 'DeviceLinkBase'))):
-                if link.find(str(QName(ns, "ElementType"))).text == "LogicalLink":
-                    intf_name = link.find(str(QName(ns, "EndPort"))).text
-                    start_device = link.find(str(QName(ns, "StartDevice"))).text
-                    if intf_name in port_alias_map:
-                        intf_name = port_alias_map[intf_name]
-
-                    mux_cable_ports[intf_name] = start_device
-
         if dpg_ecmp_content and (len(dpg_ecmp_content)):
             for version, content in dpg_ecmp_content.items():  # version is ipv4 or ipv6
                 fine_grained_content = formulate_fine_grained_ecmp(version, content, port_device_map, port_alias_map)  # port_alias_map
@@ -351,11 +402,11 @@ def parse_png(png, hname, dpg_ecmp_content = None):
 def parse_asic_external_link(link, asic_name, hostname):
     neighbors = {}
     port_speeds = {}
-    enddevice = link.find(str(QName(ns, "EndDevice"))).text
-    endport = link.find(str(QName(ns, "EndPort"))).text
-    startdevice = link.find(str(QName(ns, "StartDevice"))).text
-    startport = link.find(str(QName(ns, "StartPort"))).text
-    bandwidth_node = link.find(str(QName(ns, "Bandwidth")))
+    enddevice = link.find(qname(ns, "EndDevice")).text
+    endport = link.find(qname(ns, "EndPort")).text
+    startdevice = link.find(qname(ns, "StartDevice")).text
+    startport = link.find(qname(ns, "StartPort")).text
+    bandwidth_node = link.find(qname(ns, "Bandwidth"))
     bandwidth = bandwidth_node.text if bandwidth_node is not None else None
     # if chassis internal is false, the interface name will be
     # interface alias which should be converted to asic port name
@@ -377,11 +428,11 @@ def parse_asic_external_link(link, asic_name, hostname):
 def parse_asic_internal_link(link, asic_name, hostname):
     neighbors = {}
     port_speeds = {}
-    enddevice = link.find(str(QName(ns, "EndDevice"))).text
-    endport = link.find(str(QName(ns, "EndPort"))).text
-    startdevice = link.find(str(QName(ns, "StartDevice"))).text
-    startport = link.find(str(QName(ns, "StartPort"))).text
-    bandwidth_node = link.find(str(QName(ns, "Bandwidth")))
+    enddevice = link.find(qname(ns, "EndDevice")).text
+    endport = link.find(qname(ns, "EndPort")).text
+    startdevice = link.find(qname(ns, "StartDevice")).text
+    startport = link.find(qname(ns, "StartPort")).text
+    bandwidth_node = link.find(qname(ns, "Bandwidth"))
     bandwidth = bandwidth_node.text if bandwidth_node is not None else None
     if ((enddevice.lower() == asic_name.lower()) and
             (startdevice.lower() != hostname.lower())):
@@ -405,13 +456,13 @@ def parse_asic_png(png, asic_name, hostname):
     devices = {}
     port_speeds = {}
     for child in png:
-        if child.tag == str(QName(ns, "DeviceInterfaceLinks")):
-            for link in child.findall(str(QName(ns, "DeviceLinkBase"))):
+        if child.tag == qname(ns, "DeviceInterfaceLinks"):
+            for link in child.findall(qname(ns, "DeviceLinkBase")):
                 # Chassis internal node is used in multi-asic device or chassis minigraph
                 # where the minigraph will contain the internal asic connectivity and
                 # external neighbor information. The ChassisInternal node will be used to
                 # determine if the link is internal to the device or chassis.
-                chassis_internal_node = link.find(str(QName(ns, "ChassisInternal")))
+                chassis_internal_node = link.find(qname(ns, "ChassisInternal"))
                 chassis_internal = chassis_internal_node.text if chassis_internal_node is not None else "false"
 
                 # If the link is an external link include the external neighbor
@@ -425,8 +476,8 @@ def parse_asic_png(png, asic_name, hostname):
                     neighbors.update(int_neighbors)
                     port_speeds.update(int_port_speeds)
 
-        if child.tag == str(QName(ns, "Devices")):
-            for device in child.findall(str(QName(ns, "Device"))):
+        if child.tag == qname(ns, "Devices"):
+            for device in child.findall(qname(ns, "Device")):
                 (lo_prefix, lo_prefix_v6, mgmt_prefix, mgmt_prefix_v6, name, hwsku, d_type, deployment_id, cluster, _) = parse_device(device)
                 device_data = {}
                 if hwsku != None:
@@ -451,11 +502,11 @@ def parse_asic_png(png, asic_name, hostname):
 
 
 def parse_loopback_intf(child):
-    lointfs = child.find(str(QName(ns, "LoopbackIPInterfaces")))
+    lointfs = child.find(qname(ns, "LoopbackIPInterfaces"))
     lo_intfs = {}
-    for lointf in lointfs.findall(str(QName(ns1, "LoopbackIPInterface"))):
-        intfname = lointf.find(str(QName(ns, "AttachTo"))).text
-        ipprefix = lointf.find(str(QName(ns1, "PrefixStr"))).text
+    for lointf in lointfs.findall(qname(ns1, "LoopbackIPInterface")):
+        intfname = lointf.find(qname(ns, "AttachTo")).text
+        ipprefix = lointf.find(qname(ns1, "PrefixStr")).text
         lo_intfs[(intfname, ipprefix)] = {}
     return lo_intfs
 
@@ -488,91 +539,95 @@ def parse_dpg(dpg, hname):
             There is just one aclintf node in the minigraph
             Get the aclintfs node first.
         """
-        if not aclintfs and child.find(str(QName(ns, "AclInterfaces"))) is not None and child.find(str(QName(ns, "AclInterfaces"))).findall(str(QName(ns, "AclInterface"))):
-            aclintfs = child.find(str(QName(ns, "AclInterfaces"))).findall(str(QName(ns, "AclInterface")))
+        if not aclintfs:
+            aclintfs_node = child.find(qname(ns, "AclInterfaces"))
+            if aclintfs_node is not None:
+                aclintfs = aclintfs_node.findall(qname(ns, "AclInterface"))
         """
             In Multi-NPU platforms the mgmt intfs are defined only for the host not for individual asic
             There is just one mgmtintf node in the minigraph
             Get the mgmtintfs node first. We need mgmt intf to get mgmt ip in per asic dockers.
         """
-        if not mgmtintfs and child.find(str(QName(ns, "ManagementIPInterfaces"))) is not None and  child.find(str(QName(ns, "ManagementIPInterfaces"))).findall(str(QName(ns1, "ManagementIPInterface"))):
-            mgmtintfs = child.find(str(QName(ns, "ManagementIPInterfaces"))).findall(str(QName(ns1, "ManagementIPInterface")))
-        hostname = child.find(str(QName(ns, "Hostname")))
+        if not mgmtintfs:
+            mgmtintfs_node = child.find(qname(ns, "ManagementIPInterfaces"))
+            if mgmtintfs_node is not None:
+                mgmtintfs = mgmtintfs_node.findall(qname(ns1, "ManagementIPInterface"))
+        hostname = child.find(qname(ns, "Hostname"))
         if hostname.text.lower() != hname.lower():
             continue
 
         vni = vni_default
-        vni_element = child.find(str(QName(ns, "VNI")))
+        vni_element = child.find(qname(ns, "VNI"))
         if vni_element != None:
             if vni_element.text.isdigit():
                 vni = int(vni_element.text)
             else:
                 print("VNI must be an integer (use default VNI %d instead)" % vni_default, file=sys.stderr)
 
-        ipintfs = child.find(str(QName(ns, "IPInterfaces")))
+        ipintfs = child.find(qname(ns, "IPInterfaces"))
         intfs = {}
         ip_intfs_map = {}
-        for ipintf in ipintfs.findall(str(QName(ns, "IPInterface"))):
-            intfalias = ipintf.find(str(QName(ns, "AttachTo"))).text
+        for ipintf in ipintfs.findall(qname(ns, "IPInterface")):
+            intfalias = ipintf.find(qname(ns, "AttachTo")).text
             intfname = port_alias_map.get(intfalias, intfalias)
-            ipprefix = ipintf.find(str(QName(ns, "Prefix"))).text
+            ipprefix = ipintf.find(qname(ns, "Prefix")).text
             intfs[(intfname, ipprefix)] = {}
             ip_intfs_map[ipprefix] = intfalias
         lo_intfs = parse_loopback_intf(child)
 
-        subintfs = child.find(str(QName(ns, "SubInterfaces")))
+        subintfs = child.find(qname(ns, "SubInterfaces"))
         if subintfs is not None:
-            for subintf in subintfs.findall(str(QName(ns, "SubInterface"))):
-                intfalias = subintf.find(str(QName(ns, "AttachTo"))).text
+            for subintf in subintfs.findall(qname(ns, "SubInterface")):
+                intfalias = subintf.find(qname(ns, "AttachTo")).text
                 intfname = port_alias_map.get(intfalias, intfalias)
-                ipprefix = subintf.find(str(QName(ns, "Prefix"))).text
-                subintfvlan = subintf.find(str(QName(ns, "Vlan"))).text
+                ipprefix = subintf.find(qname(ns, "Prefix")).text
+                subintfvlan = subintf.find(qname(ns, "Vlan")).text
                 subintfname = intfname + VLAN_SUB_INTERFACE_SEPARATOR + subintfvlan
                 intfs[(subintfname, ipprefix)] = {}
 
-        mvrfConfigs = child.find(str(QName(ns, "MgmtVrfConfigs")))
+        mvrfConfigs = child.find(qname(ns, "MgmtVrfConfigs"))
         mvrf = {}
         if mvrfConfigs != None:
-            mv = mvrfConfigs.find(str(QName(ns1, "MgmtVrfGlobal")))
+            mv = mvrfConfigs.find(qname(ns1, "MgmtVrfGlobal"))
             if mv != None:
-                mvrf_en_flag = mv.find(str(QName(ns, "mgmtVrfEnabled"))).text
+                mvrf_en_flag = mv.find(qname(ns, "mgmtVrfEnabled")).text
                 mvrf["vrf_global"] = {"mgmtVrfEnabled": mvrf_en_flag}
 
         mgmt_intf = {}
         for mgmtintf in mgmtintfs:
-            intfname = mgmtintf.find(str(QName(ns, "AttachTo"))).text
-            ipprefix = mgmtintf.find(str(QName(ns1, "PrefixStr"))).text
+            intfname = mgmtintf.find(qname(ns, "AttachTo")).text
+            ipprefix = mgmtintf.find(qname(ns1, "PrefixStr")).text
             mgmtipn = ipaddress.ip_network(UNICODE_TYPE(ipprefix), False)
             gwaddr = ipaddress.ip_address(next(mgmtipn.hosts()))
             mgmt_intf[(intfname, ipprefix)] = {'gwaddr': gwaddr}
 
-        voqinbandintfs = child.find(str(QName(ns, "VoqInbandInterfaces")))
+        voqinbandintfs = child.find(qname(ns, "VoqInbandInterfaces"))
         voq_inband_intfs = {}
         if voqinbandintfs:
-            for voqintf in voqinbandintfs.findall(str(QName(ns1, "VoqInbandInterface"))):
-                intfname = voqintf.find(str(QName(ns, "Name"))).text
-                intftype = voqintf.find(str(QName(ns, "Type"))).text
-                ipprefix = voqintf.find(str(QName(ns1, "PrefixStr"))).text
+            for voqintf in voqinbandintfs.findall(qname(ns1, "VoqInbandInterface")):
+                intfname = voqintf.find(qname(ns, "Name")).text
+                intftype = voqintf.find(qname(ns, "Type")).text
+                ipprefix = voqintf.find(qname(ns1, "PrefixStr")).text
                 if intfname not in voq_inband_intfs:
                    voq_inband_intfs[intfname] = {'inband_type': intftype}
                 voq_inband_intfs["%s|%s" % (intfname, ipprefix)] = {}
 
-        pcintfs = child.find(str(QName(ns, "PortChannelInterfaces")))
+        pcintfs = child.find(qname(ns, "PortChannelInterfaces"))
         pc_intfs = []
         pcs = {}
         pc_members = {}
         intfs_inpc = [] # List to hold all the LAG member interfaces
-        for pcintf in pcintfs.findall(str(QName(ns, "PortChannel"))):
-            pcintfname = pcintf.find(str(QName(ns, "Name"))).text
-            pcintfmbr = pcintf.find(str(QName(ns, "AttachTo"))).text
+        for pcintf in pcintfs.findall(qname(ns, "PortChannel")):
+            pcintfname = pcintf.find(qname(ns, "Name")).text
+            pcintfmbr = pcintf.find(qname(ns, "AttachTo")).text
             pcmbr_list = pcintfmbr.split(';')
             pc_intfs.append(pcintfname)
             for i, member in enumerate(pcmbr_list):
                 pcmbr_list[i] = port_alias_map.get(member, member)
                 intfs_inpc.append(pcmbr_list[i])
                 pc_members[(pcintfname, pcmbr_list[i])] = {}
-            if pcintf.find(str(QName(ns, "Fallback"))) != None:
-                pcs[pcintfname] = {'fallback': pcintf.find(str(QName(ns, "Fallback"))).text, 'min_links': str(int(math.ceil(len() * 0.75))), 'lacp_key': 'auto'}
+            if pcintf.find(qname(ns, "Fallback")) != None:
+                pcs[pcintfname] = {'fallback': pcintf.find(qname(ns, "Fallback")).text, 'min_links': str(int(math.ceil(len() * 0.75))), 'lacp_key': 'auto'}
             else:
                 pcs[pcintfname] = {'min_links': str(int(math.ceil(len(pcmbr_list) * 0.75))), 'lacp_key': 'auto' }
         port_nhipv4_map = {}
@@ -581,26 +636,26 @@ def parse_dpg(dpg, hname):
         nhportlist = []
         dpg_ecmp_content = {}
         static_routes = {}
-        ipnhs = child.find(str(QName(ns, "IPNextHops")))
+        ipnhs = child.find(qname(ns, "IPNextHops"))
         if ipnhs is not None:
-            for ipnh in ipnhs.findall(str(QName(ns, "IPNextHop"))):
-                if ipnh.find(str(QName(ns, "Type"))).text == 'FineGrainedECMPGroupMember':
-                    ipnhfmbr = ipnh.find(str(QName(ns, "AttachTo"))).text
-                    ipnhaddr = ipnh.find(str(QName(ns, "Address"))).text
+            for ipnh in ipnhs.findall(qname(ns, "IPNextHop")):
+                if ipnh.find(qname(ns, "Type")).text == 'FineGrainedECMPGroupMember':
+                    ipnhfmbr = ipnh.find(qname(ns, "AttachTo")).text
+                    ipnhaddr = ipnh.find(qname(ns, "Address")).text
                     nhportlist.append(ipnhfmbr)
                     if "." in ipnhaddr:
                         port_nhipv4_map[ipnhfmbr] = ipnhaddr
                     elif ":" in ipnhaddr:
                         port_nhipv6_map[ipnhfmbr] = ipnhaddr
-                elif ipnh.find(str(QName(ns, "Type"))).text == 'StaticRoute':
-                    prefix = ipnh.find(str(QName(ns, "Address"))).text
+                elif ipnh.find(qname(ns, "Type")).text == 'StaticRoute':
+                    prefix = ipnh.find(qname(ns, "Address")).text
                     ifname = []
                     nexthop = []
-                    for nexthop_tuple in ipnh.find(str(QName(ns, "AttachTo"))).text.split(";"):
+                    for nexthop_tuple in ipnh.find(qname(ns, "AttachTo")).text.split(";"):
                         ifname.append(nexthop_tuple.split(",")[0])
                         nexthop.append(nexthop_tuple.split(",")[1])
-                    if ipnh.find(str(QName(ns, "Advertise"))):
-                       advertise = ipnh.find(str(QName(ns, "Advertise"))).text
+                    if ipnh.find(qname(ns, "Advertise")):
+                       advertise = ipnh.find(qname(ns, "Advertise")).text
                     else:
                         advertise = "false"
                     if '/' not in prefix:
@@ -624,30 +679,30 @@ def parse_dpg(dpg, hname):
                 dpg_ecmp_content['ipv4'] = ipv4_content
                 dpg_ecmp_content['ipv6'] = ipv6_content
 
-        vlanintfs = child.find(str(QName(ns, "VlanInterfaces")))
+        vlanintfs = child.find(qname(ns, "VlanInterfaces"))
         vlans = {}
         vlan_members = {}
         vlan_member_list = {}
         dhcp_relay_table = {}
         # Dict: vlan member (port/PortChannel) -> set of VlanID, in which the member if an untagged vlan member
         untagged_vlan_mbr = defaultdict(set)
-        for vintf in vlanintfs.findall(str(QName(ns, "VlanInterface"))):
-            vlanid = vintf.find(str(QName(ns, "VlanID"))).text
-            vlantype = vintf.find(str(QName(ns, "Type")))
+        for vintf in vlanintfs.findall(qname(ns, "VlanInterface")):
+            vlanid = vintf.find(qname(ns, "VlanID")).text
+            vlantype = vintf.find(qname(ns, "Type"))
             if vlantype is None:
                 vlantype_name = ""
             else:
                 vlantype_name = vlantype.text
-            vintfmbr = vintf.find(str(QName(ns, "AttachTo"))).text
+            vintfmbr = vintf.find(qname(ns, "AttachTo")).text
             vmbr_list = vintfmbr.split(';')
             if vlantype_name != "Tagged":
                 for member in vmbr_list:
                     untagged_vlan_mbr[member].add(vlanid)
-        for vintf in vlanintfs.findall(str(QName(ns, "VlanInterface"))):
-            vintfname = vintf.find(str(QName(ns, "Name"))).text
-            vlanid = vintf.find(str(QName(ns, "VlanID"))).text
-            vintfmbr = vintf.find(str(QName(ns, "AttachTo"))).text
-            vlantype = vintf.find(str(QName(ns, "Type")))
+        for vintf in vlanintfs.findall(qname(ns, "VlanInterface")):
+            vintfname = vintf.find(qname(ns, "Name")).text
+            vlanid = vintf.find(qname(ns, "VlanID")).text
+            vintfmbr = vintf.find(qname(ns, "AttachTo")).text
+            vlantype = vintf.find(qname(ns, "Type"))
             if vlantype is None:
                 vlantype_name = ""
             else:
@@ -668,13 +723,13 @@ def parse_dpg(dpg, hname):
 
             # If this VLAN requires a DHCP relay agent, it will contain a <DhcpRelays> element
             # containing a list of DHCP server IPs
-            vintf_node = vintf.find(str(QName(ns, "DhcpRelays")))
+            vintf_node = vintf.find(qname(ns, "DhcpRelays"))
             if vintf_node is not None and vintf_node.text is not None:
                 vintfdhcpservers = vintf_node.text
                 vdhcpserver_list = vintfdhcpservers.split(';')
                 vlan_attributes['dhcp_servers'] = vdhcpserver_list
 
-            vintf_node = vintf.find(str(QName(ns, "Dhcpv6Relays")))
+            vintf_node = vintf.find(qname(ns, "Dhcpv6Relays"))
             if vintf_node is not None and vintf_node.text is not None:
                 vintfdhcpservers = vintf_node.text
                 vdhcpserver_list = vintfdhcpservers.split(';')
@@ -683,11 +738,11 @@ def parse_dpg(dpg, hname):
             sonic_vlan_member_name = "Vlan%s" % (vlanid)
             dhcp_relay_table[sonic_vlan_member_name] = dhcp_attributes
 
-            vlanmac = vintf.find(str(QName(ns, "MacAddress")))
+            vlanmac = vintf.find(qname(ns, "MacAddress"))
             if vlanmac is not None and vlanmac.text is not None:
                 vlan_attributes['mac'] = vlanmac.text
 
-            vintf_node = vintf.find(str(QName(ns, "SecondarySubnets")))
+            vintf_node = vintf.find(qname(ns, "SecondarySubnets"))
             if vintf_node is not None and vintf_node.text is not None:
                 subnets = vintf_node.text.split(';')
                 for subnet in subnets:
@@ -705,15 +760,15 @@ def parse_dpg(dpg, hname):
             vlan_member_list[sonic_vlan_name] = vmbr_list
 
         for aclintf in aclintfs:
-            if aclintf.find(str(QName(ns, "InAcl"))) is not None:
-                aclname = aclintf.find(str(QName(ns, "InAcl"))).text.upper().replace(" ", "_").replace("-", "_")
+            if aclintf.find(qname(ns, "InAcl")) is not None:
+                aclname = aclintf.find(qname(ns, "InAcl")).text.upper().replace(" ", "_").replace("-", "_")
                 stage = "ingress"
-            elif aclintf.find(str(QName(ns, "OutAcl"))) is not None:
-                aclname = aclintf.find(str(QName(ns, "OutAcl"))).text.upper().replace(" ", "_").replace("-", "_")
+            elif aclintf.find(qname(ns, "OutAcl")) is not None:
+                aclname = aclintf.find(qname(ns, "OutAcl")).text.upper().replace(" ", "_").replace("-", "_")
                 stage = "egress"
             else:
                 sys.exit("Error: 'AclInterface' must contain either an 'InAcl' or 'OutAcl' subelement.")
-            aclattach = aclintf.find(str(QName(ns, "AttachTo"))).text.split(';')
+            aclattach = aclintf.find(qname(ns, "AttachTo")).text.split(';')
             acl_intfs = []
             is_bmc_data = False
             is_bmc_data_v6 = False
@@ -799,7 +854,7 @@ def parse_dpg(dpg, hname):
                         if panel_port not in intfs_inpc and panel_port not in acl_intfs:
                             acl_intfs.append(panel_port)
                     break
-            if aclintf.find(str(QName(ns, "Type"))) is not None and aclintf.find(str(QName(ns, "Type"))).text.upper() == "BMCDATA":
+            if aclintf.find(qname(ns, "Type")) is not None and aclintf.find(qname(ns, "Type")).text.upper() == "BMCDATA":
                 if 'v6' in aclname.lower():
                     is_bmc_data_v6 = True
                     acl_table_types['BMCDATAV6'] = acl_table_type_defination['BMCDATAV6']
@@ -835,7 +890,7 @@ def parse_dpg(dpg, hname):
             else:
                 # This ACL has no interfaces to attach to -- consider this a control plane ACL
                 try:
-                    aclservice = aclintf.find(str(QName(ns, "Type"))).text
+                    aclservice = aclintf.find(qname(ns, "Type")).text
 
                     # If we already have an ACL with this name and this ACL is bound to a different service,
                     # append the service to our list of services
@@ -855,7 +910,7 @@ def parse_dpg(dpg, hname):
                     print("Warning: Ignoring Control Plane ACL %s without type" % aclname, file=sys.stderr)
 
 
-        mg_tunnels = child.find(str(QName(ns, "TunnelInterfaces")))
+        mg_tunnels = child.find(qname(ns, "TunnelInterfaces"))
         if mg_tunnels is not None:
             table_key_to_mg_key_map = {"encap_ecn_mode": "EcnEncapsulationMode",
                                        "ecn_mode": "EcnDecapsulationMode",
@@ -868,7 +923,7 @@ def parse_dpg(dpg, hname):
                                        "encap_tc_to_queue_map": "EncapTcToQueueMap",
                                        "encap_tc_to_dscp_map": "EncapTcToDscpMap"}
 
-            for mg_tunnel in mg_tunnels.findall(str(QName(ns, "TunnelInterface"))):
+            for mg_tunnel in mg_tunnels.findall(qname(ns, "TunnelInterface")):
                 tunnel_type = mg_tunnel.attrib["Type"]
                 tunnel_name = mg_tunnel.attrib["Name"]
                 tunnelintfs[tunnel_type][tunnel_name] = {
@@ -893,7 +948,7 @@ def parse_dpg(dpg, hname):
 
 def parse_host_loopback(dpg, hname):
     for child in dpg:
-        hostname = child.find(str(QName(ns, "Hostname")))
+        hostname = child.find(qname(ns, "Hostname"))
         if hostname.text.lower() != hname.lower():
             continue
         lo_intfs = parse_loopback_intf(child)
@@ -909,25 +964,25 @@ def parse_cpg(cpg, hname, local_devices=[]):
     bgp_sentinel_sessions = {}
     for child in cpg:
         tag = child.tag
-        if tag == str(QName(ns, "PeeringSessions")):
-            for session in child.findall(str(QName(ns, "BGPSession"))):
-                start_router = session.find(str(QName(ns, "StartRouter"))).text
-                start_peer = session.find(str(QName(ns, "StartPeer"))).text
-                end_router = session.find(str(QName(ns, "EndRouter"))).text
-                end_peer = session.find(str(QName(ns, "EndPeer"))).text
-                rrclient = 1 if session.find(str(QName(ns, "RRClient"))) is not None else 0
-                if session.find(str(QName(ns, "HoldTime"))) is not None:
-                    holdtime = session.find(str(QName(ns, "HoldTime"))).text
+        if tag == qname(ns, "PeeringSessions"):
+            for session in child.findall(qname(ns, "BGPSession")):
+                start_router = session.find(qname(ns, "StartRouter")).text
+                start_peer = session.find(qname(ns, "StartPeer")).text
+                end_router = session.find(qname(ns, "EndRouter")).text
+                end_peer = session.find(qname(ns, "EndPeer")).text
+                rrclient = 1 if session.find(qname(ns, "RRClient")) is not None else 0
+                if session.find(qname(ns, "HoldTime")) is not None:
+                    holdtime = session.find(qname(ns, "HoldTime")).text
                 else:
                     holdtime = 180
-                if session.find(str(QName(ns, "KeepAliveTime"))) is not None:
-                    keepalive = session.find(str(QName(ns, "KeepAliveTime"))).text
+                if session.find(qname(ns, "KeepAliveTime")) is not None:
+                    keepalive = session.find(qname(ns, "KeepAliveTime")).text
                 else:
                     keepalive = 60
-                nhopself = 1 if session.find(str(QName(ns, "NextHopSelf"))) is not None else 0
+                nhopself = 1 if session.find(qname(ns, "NextHopSelf")) is not None else 0
 
                 # choose the right table and admin_status for the peer
-                chassis_internal_ibgp = session.find(str(QName(ns, "ChassisInternal")))
+                chassis_internal_ibgp = session.find(qname(ns, "ChassisInternal"))
                 if chassis_internal_ibgp is not None and chassis_internal_ibgp.text == "voq":
                     table = bgp_voq_chassis_sessions
                     admin_status = 'up'
@@ -963,48 +1018,43 @@ def parse_cpg(cpg, hname, local_devices=[]):
                     }
                     if admin_status:
                         table[end_peer.lower()]['admin_status'] = admin_status
-        elif child.tag == str(QName(ns, "Routers")):
-            for router in child.findall(str(QName(ns1, "BGPRouterDeclaration"))):
-                asn = router.find(str(QName(ns1, "ASN"))).text
-                hostname = router.find(str(QName(ns1, "Hostname"))).text
+        elif child.tag == qname(ns, "Routers"):
+            # Index the sessions by peer name, to find the sessions of each router without scanning all of them
+            sessions_by_peer = defaultdict(list)
+            for sessions in (bgp_sessions, bgp_internal_sessions, bgp_voq_chassis_sessions):
+                for bgp_session in sessions.values():
+                    sessions_by_peer[bgp_session['name'].lower()].append(bgp_session)
+            for router in child.findall(qname(ns1, "BGPRouterDeclaration")):
+                asn = router.find(qname(ns1, "ASN")).text
+                hostname = router.find(qname(ns1, "Hostname")).text
                 if hostname.lower() == hname.lower():
                     myasn = asn
-                    peers = router.find(str(QName(ns1, "Peers")))
-                    for bgpPeer in peers.findall(str(QName(ns, "BGPPeer"))):
-                        addr = bgpPeer.find(str(QName(ns, "Address"))).text
-                        if bgpPeer.find(str(QName(ns1, "PeersRange"))) is not None: # FIXME: is better to check for type BGPPeerPassive
-                            name = bgpPeer.find(str(QName(ns1, "Name"))).text
-                            ip_range = bgpPeer.find(str(QName(ns1, "PeersRange"))).text
+                    peers = router.find(qname(ns1, "Peers"))
+                    for bgpPeer in peers.findall(qname(ns, "BGPPeer")):
+                        addr = bgpPeer.find(qname(ns, "Address")).text
+                        if bgpPeer.find(qname(ns1, "PeersRange")) is not None: # FIXME: is better to check for type BGPPeerPassive
+                            name = bgpPeer.find(qname(ns1, "Name")).text
+                            ip_range = bgpPeer.find(qname(ns1, "PeersRange")).text
                             ip_range_group = ip_range.split(';') if ip_range and ip_range != "" else []
                             if name == "BGPSentinel" or name == "BGPSentinelV6":
                                 bgp_sentinel_sessions[name] = {
                                     'name': name,
                                     'ip_range': ip_range_group
                                 }
-                                if bgpPeer.find(str(QName(ns, "Address"))) is not None:
-                                    bgp_sentinel_sessions[name]['src_address'] = bgpPeer.find(str(QName(ns, "Address"))).text
+                                if bgpPeer.find(qname(ns, "Address")) is not None:
+                                    bgp_sentinel_sessions[name]['src_address'] = bgpPeer.find(qname(ns, "Address")).text
                             else:
                                 bgp_peers_with_range[name] = {
                                     'name': name,
                                     'ip_range': ip_range_group
                                 }
-                                if bgpPeer.find(str(QName(ns, "Address"))) is not None:
-                                    bgp_peers_with_range[name]['src_address'] = bgpPeer.find(str(QName(ns, "Address"))).text
-                                if bgpPeer.find(str(QName(ns1, "PeerAsn"))) is not None:
-                                    bgp_peers_with_range[name]['peer_asn'] = bgpPeer.find(str(QName(ns1, "PeerAsn"))).text
+                                if bgpPeer.find(qname(ns, "Address")) is not None:
+                                    bgp_peers_with_range[name]['src_address'] = bgpPeer.find(qname(ns, "Address")).text
+                                if bgpPeer.find(qname(ns1, "PeerAsn")) is not None:
+                                    bgp_peers_with_range[name]['peer_asn'] = bgpPeer.find(qname(ns1, "PeerAsn")).text
                 else:
-                    for peer in bgp_sessions:
-                        bgp_session = bgp_sessions[peer]
-                        if hostname.lower() == bgp_session['name'].lower():
-                            bgp_session['asn'] = asn
-                    for peer in bgp_internal_sessions:
-                        bgp_internal_session = bgp_internal_sessions[peer]
-                        if hostname.lower() == bgp_internal_session['name'].lower():
-                            bgp_internal_session['asn'] = asn
-                    for peer in bgp_voq_chassis_sessions:
-                        bgp_session = bgp_voq_chassis_sessions[peer]
-                        if hostname.lower() == bgp_session['name'].lower():
-                            bgp_session['asn'] = asn
+                    for bgp_session in sessions_by_peer.get(hostname.lower(), []):
+                        bgp_session['asn'] = asn
 
     bgp_monitors = { key: bgp_sessions[key] for key in bgp_sessions if 'asn' in bgp_sessions[key] and bgp_sessions[key]['name'] == 'BGPMonitor' }
     def filter_bad_asn(table):
@@ -1039,13 +1089,13 @@ def parse_meta(meta, hname):
     qos_profile = None
     rack_mgmt_map = None
 
-    device_metas = meta.find(str(QName(ns, "Devices")))
-    for device in device_metas.findall(str(QName(ns1, "DeviceMetadata"))):
-        if device.find(str(QName(ns1, "Name"))).text.lower() == hname.lower():
-            properties = device.find(str(QName(ns1, "Properties")))
-            for device_property in properties.findall(str(QName(ns1, "DeviceProperty"))):
-                name = device_property.find(str(QName(ns1, "Name"))).text
-                value = device_property.find(str(QName(ns1, "Value"))).text
+    device_metas = meta.find(qname(ns, "Devices"))
+    for device in device_metas.findall(qname(ns1, "DeviceMetadata")):
+        if device.find(qname(ns1, "Name")).text.lower() == hname.lower():
+            properties = device.find(qname(ns1, "Properties"))
+            for device_property in properties.findall(qname(ns1, "DeviceProperty")):
+                name = device_property.find(qname(ns1, "Name")).text
+                value = device_property.find(qname(ns1, "Value")).text
                 value_group = value.strip().split(';') if value and value != "" else []
                 if name == "DhcpResources":
                     dhcp_servers = value_group
@@ -1093,14 +1143,14 @@ def parse_meta(meta, hname):
 
 
 def parse_linkmeta(meta, hname):
-    link = meta.find(str(QName(ns, "Link")))
+    link = meta.find(qname(ns, "Link"))
     linkmetas = {}
-    for linkmeta in link.findall(str(QName(ns1, "LinkMetadata"))):
+    for linkmeta in link.findall(qname(ns1, "LinkMetadata")):
         port = None
         fec_disabled = None
 
         # Sample: ARISTA05T1:Ethernet1/33;switch-t0:fortyGigE0/4
-        key = linkmeta.find(str(QName(ns1, "Key"))).text
+        key = linkmeta.find(qname(ns1, "Key")).text
         endpoints = key.split(';')
         for endpoint in endpoints:
             t = endpoint.split(':')
@@ -1118,10 +1168,10 @@ def parse_linkmeta(meta, hname):
         macsec_enabled = False
         tx_power = None
         laser_freq = None
-        properties = linkmeta.find(str(QName(ns1, "Properties")))
-        for device_property in properties.findall(str(QName(ns1, "DeviceProperty"))):
-            name = device_property.find(str(QName(ns1, "Name"))).text
-            value = device_property.find(str(QName(ns1, "Value"))).text
+        properties = linkmeta.find(qname(ns1, "Properties"))
+        for device_property in properties.findall(qname(ns1, "DeviceProperty")):
+            name = device_property.find(qname(ns1, "Name")).text
+            value = device_property.find(qname(ns1, "Value")).text
             if name == "FECDisabled":
                 fec_disabled = value
             elif name in [ "GeminiPeeringLink", "LibraPeeringLink" ]:
@@ -1177,13 +1227,13 @@ def parse_asic_meta(meta, hname):
     max_cores = None
     deployment_id = None
     macsec_profile = {}
-    device_metas = meta.find(str(QName(ns, "Devices")))
-    for device in device_metas.findall(str(QName(ns1, "DeviceMetadata"))):
-        if device.find(str(QName(ns1, "Name"))).text.lower() == hname.lower():
-            properties = device.find(str(QName(ns1, "Properties")))
-            for device_property in properties.findall(str(QName(ns1, "DeviceProperty"))):
-                name = device_property.find(str(QName(ns1, "Name"))).text
-                value = device_property.find(str(QName(ns1, "Value"))).text
+    device_metas = meta.find(qname(ns, "Devices"))
+    for device in device_metas.findall(qname(ns1, "DeviceMetadata")):
+        if device.find(qname(ns1, "Name")).text.lower() == hname.lower():
+            properties = device.find(qname(ns1, "Properties"))
+            for device_property in properties.findall(qname(ns1, "DeviceProperty")):
+                name = device_property.find(qname(ns1, "Name")).text
+                value = device_property.find(qname(ns1, "Value")).text
                 if name == "SubRole":
                     sub_role = value
                 elif name == "SwitchId":
@@ -1203,31 +1253,31 @@ def parse_deviceinfo(meta, hwsku):
     port_speeds = {}
     port_descriptions = {}
     sys_ports = {}
-    for device_info in meta.findall(str(QName(ns, "DeviceInfo"))):
-        dev_sku = device_info.find(str(QName(ns, "HwSku"))).text
+    for device_info in meta.findall(qname(ns, "DeviceInfo")):
+        dev_sku = device_info.find(qname(ns, "HwSku")).text
         if dev_sku == hwsku:
-            interfaces = device_info.find(str(QName(ns, "EthernetInterfaces"))).findall(str(QName(ns1, "EthernetInterface")))
-            interfaces = interfaces + device_info.find(str(QName(ns, "ManagementInterfaces"))).findall(str(QName(ns1, "ManagementInterface")))
+            interfaces = device_info.find(qname(ns, "EthernetInterfaces")).findall(qname(ns1, "EthernetInterface"))
+            interfaces = interfaces + device_info.find(qname(ns, "ManagementInterfaces")).findall(qname(ns1, "ManagementInterface"))
             for interface in interfaces:
-                alias = interface.find(str(QName(ns, "InterfaceName"))).text
-                speed = interface.find(str(QName(ns, "Speed"))).text
-                desc  = interface.find(str(QName(ns, "Description")))
+                alias = interface.find(qname(ns, "InterfaceName")).text
+                speed = interface.find(qname(ns, "Speed")).text
+                desc  = interface.find(qname(ns, "Description"))
                 if desc != None:
                     port_descriptions[port_alias_map.get(alias, alias)] = desc.text
                 port_speeds[port_alias_map.get(alias, alias)] = speed
 
-            sysports = device_info.find(str(QName(ns, "SystemPorts")))
+            sysports = device_info.find(qname(ns, "SystemPorts"))
             if sysports is not None:
-                for sysport in sysports.findall(str(QName(ns, "SystemPort"))):
-                    portname = sysport.find(str(QName(ns, "Name"))).text
-                    hostname = sysport.find(str(QName(ns, "Hostname")))
-                    asic_name = sysport.find(str(QName(ns, "AsicName")))
-                    system_port_id = sysport.find(str(QName(ns, "SystemPortId"))).text
-                    switch_id = sysport.find(str(QName(ns, "SwitchId"))).text
-                    core_id = sysport.find(str(QName(ns, "CoreId"))).text
-                    core_port_id = sysport.find(str(QName(ns, "CorePortId"))).text
-                    speed = sysport.find(str(QName(ns, "Speed"))).text
-                    num_voq = sysport.find(str(QName(ns, "NumVoq"))).text
+                for sysport in sysports.findall(qname(ns, "SystemPort")):
+                    portname = sysport.find(qname(ns, "Name")).text
+                    hostname = sysport.find(qname(ns, "Hostname"))
+                    asic_name = sysport.find(qname(ns, "AsicName"))
+                    system_port_id = sysport.find(qname(ns, "SystemPortId")).text
+                    switch_id = sysport.find(qname(ns, "SwitchId")).text
+                    core_id = sysport.find(qname(ns, "CoreId")).text
+                    core_port_id = sysport.find(qname(ns, "CorePortId")).text
+                    speed = sysport.find(qname(ns, "Speed")).text
+                    num_voq = sysport.find(qname(ns, "NumVoq")).text
                     key = portname
                     if asic_name is not None:
                        key = "%s|%s" % (asic_name.text, key)
@@ -1464,9 +1514,56 @@ def select_mmu_profiles(profile, platform, hwsku):
 # Main functions
 #
 ###############################################################################
+def get_dns_conf_path():
+    if os.environ.get("CFGGEN_UNIT_TESTING", "0") == "2":
+        return os.path.join(os.path.dirname(__file__), "tests/", "dns.j2")
+    return "/usr/share/sonic/templates/dns.j2"
+
+def get_parse_xml_inputs(hwsku, platform, port_config_file, asic_name, hwsku_config_file, fabric_port_config_file):
+    """ Return the port config and a digest of every input of parse_xml() besides the minigraph itself:
+    the arguments, port and fabric config (from files or CONFIG_DB) and the DNS template.
+    """
+    port_config = get_port_config(hwsku=hwsku, platform=platform, port_config_file=port_config_file, asic_name=asic_name, hwsku_config_file=hwsku_config_file)
+    fabric_monitor = get_fabric_monitor_config(hwsku=hwsku, asic_name=asic_name)
+    fabric_ports = get_fabric_port_config(hwsku=hwsku, platform=platform, fabric_port_config_file=fabric_port_config_file, asic_name=asic_name, hwsku_config_file=hwsku_config_file)
+    dns_conf = get_dns_conf_path()
+    dns = None
+    if os.path.isfile(dns_conf):
+        with open(dns_conf, 'rb') as f:
+            dns = f.read()
+    inputs = [platform, port_config_file, asic_name, hwsku_config_file, fabric_port_config_file,
+              os.environ.get("CFGGEN_UNIT_TESTING"), port_config, fabric_monitor, fabric_ports, dns]
+    return port_config, hashlib.sha256(pickle.dumps(inputs, protocol=2)).hexdigest()
+
+def load_parse_xml_cache(cache_file):
+    try:
+        with open(cache_file, 'rb') as f:
+            return pickle.load(f)
+    except Exception:
+        return None
+
+def save_parse_xml_cache(cache_dir, cache_file, entry):
+    try:
+        tmp_file = '{}.{}.tmp'.format(cache_file, os.getpid())
+        with open(tmp_file, 'wb') as f:
+            pickle.dump(entry, f, protocol=2)
+        os.rename(tmp_file, cache_file)
+        # Keep only the most recent results
+        files = [os.path.join(cache_dir, name) for name in os.listdir(cache_dir) if name.endswith('.pickle')]
+        files.sort(key=os.path.getmtime, reverse=True)
+        for old_file in files[MINIGRAPH_CACHE_FILES:]:
+            os.remove(old_file)
+    except (IOError, OSError) as e:
+        print("Warning: failed to save minigraph cache: {}".format(str(e)), file=sys.stderr)
+
 def parse_xml(filename, platform=None, port_config_file=None, asic_name=None, hwsku_config_file=None, fabric_port_config_file=None ):
     """ Parse minigraph xml file.
 
+    Results are persisted in the SONiC cache directory (see sonic_py_common.general.get_cache_dir),
+    keyed on the minigraph content and the arguments. A cached result is used only if the port config,
+    fabric config and DNS template it was built from haven't changed either, so a repeated invocation
+    doesn't parse the minigraph again. Warnings printed while parsing are not repeated for a cached result.
+
     Keyword arguments:
     filename -- minigraph file name
     platform -- device platform
@@ -1475,8 +1572,35 @@ def parse_xml(filename, platform=None, port_config_file=None, asic_name=None, hw
     generate asic specific configuration.
     fabric_port_config_file -- fabric port config file name
      """
+    with open(filename, 'rb') as f:
+        content = f.read()
+
+    cache_dir = get_cache_dir(MINIGRAPH_CACHE_NAME)
+    if cache_dir is None:
+        results, _ = _parse_xml(parse_xml_root(filename, content), platform, port_config_file, asic_name, hwsku_config_file, fabric_port_config_file)
+        return results
+
+    args = [platform, port_config_file, asic_name, hwsku_config_file, fabric_port_config_file]
+    key = hashlib.sha256(content + pickle.dumps(args, protocol=2)).hexdigest()
+    cache_file = os.path.join(cache_dir, key + '.pickle')
+    entry = load_parse_xml_cache(cache_file)
+    if entry is not None:
+        (ports, alias_map, alias_asic_map), inputs = get_parse_xml_inputs(entry['hwsku'], platform, port_config_file, asic_name, hwsku_config_file, fabric_port_config_file)
+        if entry['inputs'] == inputs:
+            port_names_map.update(ports)
+            port_alias_map.update(alias_map)
+            port_alias_asic_map.update(alias_asic_map)
+            select_mmu_profiles(entry['qos_profile'], platform, entry['hwsku'])
+            return entry['results']
+
+    results, qos_profile = _parse_xml(parse_xml_root(filename, content), platform, port_config_file, asic_name, hwsku_config_file, fabric_port_config_file)
+    hwsku = results['DEVICE_METADATA']['localhost']['hwsku']
+    _, inputs = get_parse_xml_inputs(hwsku, platform, port_config_file, asic_name, hwsku_config_file, fabric_port_config_file)
+    save_parse_xml_cache(cache_dir, cache_file, {'hwsku': hwsku, 'qos_profile': qos_profile, 'inputs': inputs, 'results': results})
+    return results
 
-    root = ET.parse(filename).getroot()
+def _parse_xml(root, platform, port_config_file, asic_name, hwsku_config_file, fabric_port_config_file):
+    """ Parse the minigraph document, return the results and the QoS profile of the device """
 
     u_neighbors = None
     u_devices = None
@@ -1540,15 +1664,12 @@ def parse_xml(filename, platform=None, port_config_file=None, asic_name=None, hw
     qos_profile = None
     rack_mgmt_map = None
 
-    hwsku_qn = QName(ns, "HwSku")
-    hostname_qn = QName(ns, "Hostname")
-    docker_routing_config_mode_qn = QName(ns, "DockerRoutingConfigMode")
     for child in root:
-        if child.tag == str(hwsku_qn):
+        if child.tag == qname(ns, "HwSku"):
             hwsku = child.text
-        if child.tag == str(hostname_qn):
+        if child.tag == qname(ns, "Hostname"):
             hostname = child.text
-        if child.tag == str(docker_routing_config_mode_qn):
+        if child.tag == qname(ns, "DockerRoutingConfigMode"):
             docker_routing_config_mode = child.text
 
     (ports, alias_map, alias_asic_map) = get_port_config(hwsku=hwsku, platform=platform, port_config_file=port_config_file, asic_name=asic_name, hwsku_config_file=hwsku_config_file)
@@ -1562,33 +1683,33 @@ def parse_xml(filename, platform=None, port_config_file=None, asic_name=None, hw
 
     for child in root:
         if asic_name is None:
-            if child.tag == str(QName(ns, "DpgDec")):
+            if child.tag == qname(ns, "DpgDec"):
                 (intfs, lo_intfs, mvrf, mgmt_intf, voq_inband_intfs, vlans, vlan_members, dhcp_relay_table, pcs, pc_members, acls, acl_table_types, vni, tunnel_intfs, dpg_ecmp_content, static_routes, tunnel_intfs_qos_remap_config) = parse_dpg(child, hostname)
-            elif child.tag == str(QName(ns, "CpgDec")):
+            elif child.tag == qname(ns, "CpgDec"):
                 (bgp_sessions, bgp_internal_sessions, bgp_voq_chassis_sessions, bgp_asn, bgp_peers_with_range, bgp_monitors, bgp_sentinel_sessions) = parse_cpg(child, hostname)
-            elif child.tag == str(QName(ns, "PngDec")):
+            elif child.tag == qname(ns, "PngDec"):
                 (neighbors, devices, console_dev, console_port, mgmt_dev, mgmt_port, port_speed_png, console_ports, mux_cable_ports, png_ecmp_content) = parse_png(child, hostname, dpg_ecmp_content)
-            elif child.tag == str(QName(ns, "UngDec")):
+            elif child.tag == qname(ns, "UngDec"):
                 (u_neighbors, u_devices, _, _, _, _, _, _) = parse_png(child, hostname, None)
-            elif child.tag == str(QName(ns, "MetadataDeclaration")):
+            elif child.tag == qname(ns, "MetadataDeclaration"):
                 (syslog_servers, dhcp_servers, dhcpv6_servers, ntp_servers, tacacs_servers, mgmt_routes, erspan_dst, deployment_id, region, cloudtype, resource_type, downstream_subrole, switch_id, switch_type, max_cores, kube_data, macsec_profile, downstream_redundancy_types, redundancy_type, qos_profile, rack_mgmt_map) = parse_meta(child, hostname)
-            elif child.tag == str(QName(ns, "LinkMetadataDeclaration")):
+            elif child.tag == qname(ns, "LinkMetadataDeclaration"):
                 linkmetas = parse_linkmeta(child, hostname)
-            elif child.tag == str(QName(ns, "DeviceInfos")):
+            elif child.tag == qname(ns, "DeviceInfos"):
                 (port_speeds_default, port_descriptions, sys_ports) = parse_deviceinfo(child, hwsku)
         else:
-            if child.tag == str(QName(ns, "DpgDec")):
+            if child.tag == qname(ns, "DpgDec"):
                 (intfs, lo_intfs, mvrf, mgmt_intf, voq_inband_intfs, vlans, vlan_members, dhcp_relay_table, pcs, pc_members, acls, acl_table_types, vni, tunnel_intfs, dpg_ecmp_content, static_routes, tunnel_intfs_qos_remap_config) = parse_dpg(child, asic_name)
                 host_lo_intfs = parse_host_loopback(child, hostname)
-            elif child.tag == str(QName(ns, "CpgDec")):
+            elif child.tag == qname(ns, "CpgDec"):
                 (bgp_sessions, bgp_internal_sessions, bgp_voq_chassis_sessions, bgp_asn, bgp_peers_with_range, bgp_monitors, bgp_sentinel_sessions) = parse_cpg(child, asic_name, local_devices)
-            elif child.tag == str(QName(ns, "PngDec")):
+            elif child.tag == qname(ns, "PngDec"):
                 (neighbors, devices, port_speed_png) = parse_asic_png(child, asic_name, hostname)
-            elif child.tag == str(QName(ns, "MetadataDeclaration")):
+            elif child.tag == qname(ns, "MetadataDeclaration"):
                 (sub_role, switch_id, switch_type, max_cores, deployment_id, macsec_profile) = parse_asic_meta(child, asic_name)
-            elif child.tag == str(QName(ns, "LinkMetadataDeclaration")):
+            elif child.tag == qname(ns, "LinkMetadataDeclaration"):
                 linkmetas = parse_linkmeta(child, hostname)
-            elif child.tag == str(QName(ns, "DeviceInfos")):
+            elif child.tag == qname(ns, "DeviceInfos"):
                 (port_speeds_default, port_descriptions, sys_ports) = parse_deviceinfo(child, hwsku)
 
     select_mmu_profiles(qos_profile, platform, hwsku)
@@ -2054,10 +2175,7 @@ def parse_xml(filename, platform=None, port_config_file=None, asic_name=None, hw
     results['NTP_SERVER'] = dict((item, {}) for item in ntp_servers)
     # Set default DNS nameserver from dns.j2
     results['DNS_NAMESERVER'] = {}
-    if os.environ.get("CFGGEN_UNIT_TESTING", "0") == "2":
-        dns_conf = os.path.join(os.path.dirname(__file__), "tests/", "dns.j2")
-    else:
-        dns_conf = "/usr/share/sonic/templates/dns.j2"
+    dns_conf = get_dns_conf_path()
     if os.path.isfile(dns_conf):
         text = ""
         with open(dns_conf) as template_file:
@@ -2151,7 +2269,7 @@ def parse_xml(filename, platform=None, port_config_file=None, asic_name=None, hw
     if current_device and current_device['type'] in leafrouter_device_types:
         results['DEVICE_METADATA']['localhost']['suppress-fib-pending'] = 'enabled'
 
-    return results
+    return results, qos_profile
 
 def get_tunnel_entries(tunnel_intfs, tunnel_intfs_qos_remap_config, lo_intfs, tunnel_qos_remap, mux_tunnel_name, peer_switch_ip):
     lo_addr = ''
@@ -2195,11 +2313,11 @@ def get_ports_in_active_active(root, devices, neighbors):
     """Parse out ports in active-active cable type."""
     servers = {hostname.lower(): device_data for hostname, device_data in devices.items() if device_data["type"] == "Server"}
     ports_in_active_active = {}
-    dpg_section = root.find(str(QName(ns, "DpgDec")))
+    dpg_section = root.find(qname(ns, "DpgDec"))
     neighbor_to_port_mapping = {neighbor["name"].lower(): port for port, neighbor in neighbors.items()}
     if dpg_section is not None:
         for child in dpg_section:
-            hostname = child.find(str(QName(ns, "Hostname")))
+            hostname = child.find(qname(ns, "Hostname"))
             if hostname is None:
                 continue
             hostname = hostname.text.lower()
@@ -2261,7 +2379,7 @@ def get_mux_cable_entries(ports, mux_cable_ports, active_active_ports, neighbors
 
 
 def parse_device_desc_xml(filename):
-    root = ET.parse(filename).getroot()
+    root = parse_xml_root(filename)
     (lo_prefix, lo_prefix_v6, mgmt_prefix, mgmt_prefix_v6, hostname, hwsku, d_type, _, _, _) = parse_device(root)
 
     results = {}
@@ -2292,17 +2410,17 @@ def parse_device_desc_xml(filename):
 def parse_asic_sub_role(filename, asic_name):
     if not os.path.isfile(filename):
         return None
-    root = ET.parse(filename).getroot()
+    root = parse_xml_root(filename)
     for child in root:
-        if child.tag == str(QName(ns, "MetadataDeclaration")):
+        if child.tag == qname(ns, "MetadataDeclaration"):
             sub_role, _, _, _, _, _= parse_asic_meta(child, asic_name)
             return sub_role
 
 def parse_asic_switch_type(filename, asic_name):
     if os.path.isfile(filename):
-        root = ET.parse(filename).getroot()
+        root = parse_xml_root(filename)
         for child in root:
-            if child.tag == str(QName(ns, "MetadataDeclaration")):
+            if child.tag == qname(ns, "MetadataDeclaration"):
                 _, _, switch_type, _, _, _ = parse_asic_meta(child, asic_name)
                 return switch_type
     return None
@@ -2311,10 +2429,10 @@ def parse_asic_meta_get_devices(root):
     local_devices = []
 
     for child in root:
-        if child.tag == str(QName(ns, "MetadataDeclaration")):
-            device_metas = child.find(str(QName(ns, "Devices")))
-            for device in device_metas.findall(str(QName(ns1, "DeviceMetadata"))):
-                name = device.find(str(QName(ns1, "Name"))).text.lower()
+        if child.tag == qname(ns, "MetadataDeclaration"):
+            device_metas = child.find(qname(ns, "Devices"))
+            for device in device_metas.findall(qname(ns1, "DeviceMetadata")):
+                name = device.find(qname(ns1, "Name")).text.lower()
                 local_devices.append(name)
 
     return local_devices
@@ -84,6 +84,7 @@ setup(
     py_modules = py_modules,
     scripts = [
         'sonic-cfggen',
+        'sonic-cfggen-client',
     ],
     install_requires = dependencies,
     data_files = [
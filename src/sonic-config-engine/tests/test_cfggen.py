@@ -82,6 +82,23 @@ class TestCfgGen(TestCase):
         output = self.run_script(argument)
         self.assertEqual(output, '')
 
+    def test_var_lookup_lazy_imports(self):
+        # Simple variable lookups must not import the minigraph, port config, preset, yang or yaml parsers
+        env = dict(os.environ, CFGGEN_UNIT_TESTING="")
+        argument = ['-a', '{"key1":"value"}', '-v', 'key1']
+        result = subprocess.run([utils.PYTHON_INTERPRETTER, '-X', 'importtime'] + self.script_file[1:] + argument,
+                                env=env, stdout=subprocess.PIPE, stderr=subprocess.PIPE, universal_newlines=True)
+        self.assertEqual(result.returncode, 0)
+        self.assertEqual(result.stdout.strip(), 'value')
+        imported = set()
+        for line in result.stderr.splitlines():
+            if not line.startswith('import time:') or 'cumulative' in line:
+                continue
+            imported.add(line.split('|')[-1].strip())
+        for module in ['lxml', 'minigraph', 'portconfig', 'smartswitch_config', 'config_samples',
+                       'sonic_yang', 'sonic_yang_cfg_generator', 'yaml', 'netaddr']:
+            self.assertNotIn(module, imported)
+
     def test_device_desc(self):
         argument = ['-v', "DEVICE_METADATA[\'localhost\'][\'hwsku\']", "-M", self.sample_device_desc]
         output = self.run_script(argument)
@@ -213,6 +230,41 @@ class TestCfgGen(TestCase):
         for key, value in data.items():
             self.assertEqual(output_data[key.replace("key", "jk")], value)
 
+    def test_manifest(self):
+        manifest_file = os.path.join(self.test_dir, 'manifest.json')
+        jobs = [
+            {'template': os.path.join(self.test_dir, 'test.j2'), 'destination': self.output_file},
+            {'template': os.path.join(self.test_dir, 'sample-template-1.json.j2'), 'destination': 'config-db'},
+            {'var': 'jk1_1'},
+            {'var_json': 'TABLE', 'key': 'k1'},
+            {'template': os.path.join(self.test_dir, 'test2.j2'), 'destination': self.output2_file},
+        ]
+        with open(manifest_file, 'w') as f:
+            json.dump(jobs, f)
+        argument = ['-y', os.path.join(self.test_dir, 'test.yml')]
+        argument += ['-a', '{"key1":"value", "key1_1":"value1_1", "TABLE": {"k1": {"f": "v"}, "k2": {"f": "v"}}}']
+        argument += ['--manifest', manifest_file, '--print-timing']
+        try:
+            output = self.run_script(argument)
+        finally:
+            os.remove(manifest_file)
+        self.assertEqual(output.split('\n')[0], 'value1_1')
+        self.assertEqual(json.loads(output.split('\n', 1)[1]), {'k1': {'f': 'v'}})
+        with open(self.output_file) as tf:
+            self.assertEqual(tf.read().strip(), 'value1\nvalue2')
+        with open(self.output2_file) as tf:
+            self.assertEqual(tf.read().strip(), 'value')
+
+    def test_manifest_invalid_job(self):
+        manifest_file = os.path.join(self.test_dir, 'manifest.json')
+        with open(manifest_file, 'w') as f:
+            json.dump([{'var': 'key1', 'var_json': 'TABLE'}], f)
+        try:
+            with self.assertRaises(subprocess.CalledProcessError):
+                self.run_script(['-a', '{"key1":"value"}', '--manifest', manifest_file])
+        finally:
+            os.remove(manifest_file)
+
     # FIXME: This test depends heavily on the ordering of the interfaces and
     # it is not at all intuitive what that ordering should be. Could make it
     # more robust by adding better parsing logic.
@@ -0,0 +1,68 @@
+import os
+import subprocess
+import tempfile
+import time
+
+import tests.common_utils as utils
+
+from unittest import TestCase
+
+
+class TestCfgGenServer(TestCase):
+
+    def setUp(self):
+        self.test_dir = os.path.dirname(os.path.realpath(__file__))
+        self.script_file = [utils.PYTHON_INTERPRETTER, os.path.join(self.test_dir, '..', 'sonic-cfggen')]
+        self.client_file = [utils.PYTHON_INTERPRETTER, os.path.join(self.test_dir, '..', 'sonic-cfggen-client')]
+        self.sample_graph = os.path.join(self.test_dir, 'sample_graph.xml')
+        self.port_config = os.path.join(self.test_dir, 't0-sample-port-config.ini')
+        self.socket_dir = tempfile.mkdtemp()
+        self.socket_path = os.path.join(self.socket_dir, 'sonic-cfggen.sock')
+        self.env = dict(os.environ, CFGGEN_UNIT_TESTING="2", SONIC_CFGGEN_SOCKET=self.socket_path)
+        self.server = subprocess.Popen(self.script_file + ['--serve', self.socket_path], env=self.env)
+        for _ in range(100):
+            if os.path.exists(self.socket_path):
+                break
+            time.sleep(0.1)
+        self.assertTrue(os.path.exists(self.socket_path))
+
+    def tearDown(self):
+        self.server.terminate()
+        self.server.wait()
+        if os.path.exists(self.socket_path):
+            os.remove(self.socket_path)
+        os.rmdir(self.socket_dir)
+
+    def run_both(self, argument):
+        direct = subprocess.run(self.script_file + argument, env=self.env, capture_output=True, universal_newlines=True)
+        served = subprocess.run(self.client_file + argument, env=self.env, capture_output=True, universal_newlines=True)
+        return direct, served
+
+    def test_var(self):
+        argument = ['-v', "DEVICE_METADATA['localhost']['hostname']", '-m', self.sample_graph, '-p', self.port_config]
+        direct, served = self.run_both(argument)
+        self.assertEqual(served.returncode, 0)
+        self.assertEqual(served.stdout.strip(), 'OCPSCH01040DDLF')
+        self.assertEqual(served.stdout, direct.stdout)
+
+    def test_print_data_repeated(self):
+        argument = ['-m', self.sample_graph, '-p', self.port_config, '--print-data']
+        direct, served = self.run_both(argument)
+        self.assertEqual(served.stdout, direct.stdout)
+        # second request is served from the warm process and must not differ
+        _, served = self.run_both(argument)
+        self.assertEqual(served.stdout, direct.stdout)
+
+    def test_relative_path(self):
+        argument = ['-v', "DEVICE_METADATA['localhost']['hostname']", '-m', os.path.basename(self.sample_graph),
+                    '-p', os.path.basename(self.port_config)]
+        served = subprocess.run(self.client_file + argument, env=self.env, cwd=self.test_dir,
+                                capture_output=True, universal_newlines=True)
+        self.assertEqual(served.stdout.strip(), 'OCPSCH01040DDLF')
+
+    def test_error_exit_code(self):
+        argument = ['-m', os.path.join(self.test_dir, 'no-such-minigraph.xml'), '--print-data']
+        direct, served = self.run_both(argument)
+        self.assertNotEqual(direct.returncode, 0)
+        self.assertEqual(served.returncode, direct.returncode)
+        self.assertTrue(len(served.stderr) > 0)
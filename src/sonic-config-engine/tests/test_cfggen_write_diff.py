@@ -0,0 +1,65 @@
+import os
+
+from unittest import TestCase
+from sonic_py_common.general import load_module_from_source
+
+test_dir = os.path.dirname(os.path.realpath(__file__))
+sonic_cfggen = load_module_from_source('sonic_cfggen', os.path.join(test_dir, '..', 'sonic-cfggen'))
+
+
+class TestConfigDBDiff(TestCase):
+
+    def setUp(self):
+        self.current = {
+            'PORT': {
+                'Ethernet0': {'mtu': '9100', 'speed': '100000', 'admin_status': 'up'},
+                'Ethernet4': {'mtu': '9100', 'speed': '100000'},
+            },
+            'VLAN': {
+                'Vlan1000': {'vlanid': '1000'},
+            },
+            'LOOPBACK_INTERFACE': {
+                'Loopback0': {'NULL': 'NULL'},
+                'Loopback0|10.1.0.32/32': {'NULL': 'NULL'},
+            },
+        }
+
+    def test_no_change(self):
+        sets, deletes, unchanged = sonic_cfggen._get_config_db_diff(self.current, self.current)
+        self.assertEqual(sets, {})
+        self.assertEqual(deletes, [])
+        self.assertEqual(unchanged, 5)
+
+    def test_field_change(self):
+        new = {'PORT': {'Ethernet0': {'mtu': '1500', 'speed': '100000'}}}
+        sets, deletes, unchanged = sonic_cfggen._get_config_db_diff(self.current, new)
+        # Only the changed field is written, fields missing from new data are kept
+        self.assertEqual(sets, {('PORT', 'Ethernet0'): {'mtu': '1500'}})
+        self.assertEqual(deletes, [])
+        self.assertEqual(unchanged, 0)
+
+    def test_new_entry_and_table(self):
+        new = {
+            'PORT': {'Ethernet8': {'mtu': '9100'}},
+            'VLAN_MEMBER': {'Vlan1000|Ethernet8': {'tagging_mode': 'untagged'}},
+        }
+        sets, deletes, _ = sonic_cfggen._get_config_db_diff(self.current, new)
+        self.assertEqual(sets, {
+            ('PORT', 'Ethernet8'): {'mtu': '9100'},
+            ('VLAN_MEMBER', 'Vlan1000|Ethernet8'): {'tagging_mode': 'untagged'},
+        })
+        self.assertEqual(deletes, [])
+
+    def test_delete(self):
+        new = {
+            'PORT': {'Ethernet4': None, 'Ethernet12': None},
+            'LOOPBACK_INTERFACE': None,
+        }
+        sets, deletes, _ = sonic_cfggen._get_config_db_diff(self.current, new)
+        self.assertEqual(sets, {})
+        # Entries which don't exist are not deleted
+        self.assertEqual(sorted(deletes), [
+            ('LOOPBACK_INTERFACE', 'Loopback0'),
+            ('LOOPBACK_INTERFACE', 'Loopback0|10.1.0.32/32'),
+            ('PORT', 'Ethernet4'),
+        ])
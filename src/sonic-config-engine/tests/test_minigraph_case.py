@@ -1,11 +1,13 @@
 import json
 import os
+import shutil
 import subprocess
+import tempfile
 import ipaddress
 import tests.common_utils as utils
 import minigraph
 
-from unittest import TestCase
+from unittest import TestCase, mock
 
 TOR_ROUTER = 'ToRRouter'
 BACKEND_TOR_ROUTER = 'BackEndToRRouter'
@@ -575,3 +577,43 @@ class TestCfgGenCaseInsensitive(TestCase):
         # TC2: For other minigraph, result should not contain FLEX_COUNTER_TABLE
         result = minigraph.parse_xml(self.sample_graph)
         self.assertNotIn('FLEX_COUNTER_TABLE', result)
+
+    def test_parse_xml_root_cache(self):
+        minigraph.xml_root_cache.clear()
+        root = minigraph.parse_xml_root(self.sample_graph)
+        # Same content is parsed only once
+        self.assertIs(minigraph.parse_xml_root(self.sample_graph), root)
+        self.assertEqual(len(minigraph.xml_root_cache), 1)
+        # Results are the same whether the document is cached or not
+        result = minigraph.parse_xml(self.sample_graph, port_config_file=self.port_config)
+        minigraph.xml_root_cache.clear()
+        self.assertEqual(minigraph.parse_xml(self.sample_graph, port_config_file=self.port_config), result)
+        # Cache doesn't grow without bound
+        graphs = [self.sample_graph, self.sample_simple_graph, self.sample_resource_graph, self.sample_subintf_graph,
+                  self.sample_simple_device_desc, self.sample_simple_device_desc_ipv6_only]
+        for graph in graphs:
+            minigraph.parse_xml_root(graph)
+        self.assertLessEqual(len(minigraph.xml_root_cache), minigraph.XML_ROOT_CACHE_SIZE)
+
+    def test_parse_xml_persisted_cache(self):
+        cache_path = tempfile.mkdtemp()
+        try:
+            port_config = os.path.join(cache_path, 'port_config.ini')
+            shutil.copy(self.port_config, port_config)
+            with mock.patch.dict(os.environ, {'SONIC_CACHE_PATH': cache_path}):
+                result = minigraph.parse_xml(self.sample_graph, port_config_file=port_config)
+                self.assertEqual(len(os.listdir(os.path.join(cache_path, 'minigraph'))), 1)
+                # A repeated invocation doesn't parse the minigraph again
+                with mock.patch('minigraph._parse_xml') as parse_mock:
+                    self.assertEqual(minigraph.parse_xml(self.sample_graph, port_config_file=port_config), result)
+                    self.assertFalse(parse_mock.called)
+                # A changed port config invalidates the cached result
+                with open(port_config, 'a') as f:
+                    f.write('Ethernet128     105,106,107,108   fortyGigE0/128\n')
+                result = minigraph.parse_xml(self.sample_graph, port_config_file=port_config)
+                self.assertIn('Ethernet128', result['PORT'])
+                with mock.patch('minigraph._parse_xml') as parse_mock:
+                    self.assertEqual(minigraph.parse_xml(self.sample_graph, port_config_file=port_config), result)
+                    self.assertFalse(parse_mock.called)
+        finally:
+            shutil.rmtree(cache_path)
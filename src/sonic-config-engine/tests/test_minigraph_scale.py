@@ -0,0 +1,76 @@
+import minigraph
+
+from lxml import etree as ET
+from unittest import TestCase
+
+HOSTNAME = 'switch-t1-01'
+DEVICES = 500
+LINKS = 10000
+
+
+def sub(parent, namespace, tag, text=None):
+    node = ET.SubElement(parent, minigraph.qname(namespace, tag))
+    if text is not None:
+        node.text = text
+    return node
+
+def build_png():
+    png = ET.Element(minigraph.qname(minigraph.ns, 'PhysicalNetworkGraphDeclaration'))
+    links = sub(png, minigraph.ns, 'DeviceInterfaceLinks')
+    for i in range(LINKS):
+        link = sub(links, minigraph.ns, 'DeviceLinkBase')
+        sub(link, minigraph.ns, 'ElementType', 'DeviceInterfaceLink')
+        sub(link, minigraph.ns, 'Bandwidth', '100000')
+        sub(link, minigraph.ns, 'EndDevice', HOSTNAME if i % 2 == 0 else 'peer-%d' % ((i + 1) % DEVICES))
+        sub(link, minigraph.ns, 'EndPort', 'Ethernet%d' % i)
+        sub(link, minigraph.ns, 'StartDevice', 'peer-%d' % (i % DEVICES))
+        sub(link, minigraph.ns, 'StartPort', 'Ethernet%d' % i)
+    devices = sub(png, minigraph.ns, 'Devices')
+    for i in range(DEVICES):
+        device = sub(devices, minigraph.ns, 'Device')
+        address = sub(device, minigraph.ns, 'Address')
+        sub(address, minigraph.ns2, 'IPPrefix', '10.1.%d.%d/32' % (i // 256, i % 256))
+        sub(device, minigraph.ns, 'Hostname', 'peer-%d' % i)
+        sub(device, minigraph.ns, 'HwSku', 'Arista-VM')
+        sub(device, minigraph.ns, 'ElementType', 'LeafRouter')
+    return png
+
+def build_cpg():
+    cpg = ET.Element(minigraph.qname(minigraph.ns, 'CpgDec'))
+    sessions = sub(cpg, minigraph.ns, 'PeeringSessions')
+    for i in range(DEVICES):
+        session = sub(sessions, minigraph.ns, 'BGPSession')
+        sub(session, minigraph.ns, 'StartRouter', 'peer-%d' % i)
+        sub(session, minigraph.ns, 'StartPeer', '10.0.%d.%d' % (i // 128, (i % 128) * 2 + 1))
+        sub(session, minigraph.ns, 'EndRouter', HOSTNAME)
+        sub(session, minigraph.ns, 'EndPeer', '10.0.%d.%d' % (i // 128, (i % 128) * 2))
+    routers = sub(cpg, minigraph.ns, 'Routers')
+    for i in range(DEVICES):
+        router = sub(routers, minigraph.ns1, 'BGPRouterDeclaration')
+        sub(router, minigraph.ns1, 'ASN', str(64000 + i))
+        sub(router, minigraph.ns1, 'Hostname', 'peer-%d' % i)
+    router = sub(routers, minigraph.ns1, 'BGPRouterDeclaration')
+    sub(router, minigraph.ns1, 'ASN', '65100')
+    sub(router, minigraph.ns1, 'Hostname', HOSTNAME)
+    sub(router, minigraph.ns1, 'Peers')
+    return cpg
+
+
+class TestMinigraphScale(TestCase):
+
+    def test_parse_png_scale(self):
+        png = build_png()
+        neighbors, devices, _, _, _, _, port_speeds, _, _, _ = minigraph.parse_png(png, HOSTNAME)
+        self.assertEqual(len(devices), DEVICES)
+        self.assertEqual(len(neighbors), LINKS // 2)
+        self.assertEqual(neighbors['Ethernet0'], {'name': 'peer-0', 'port': 'Ethernet0'})
+        self.assertEqual(port_speeds['Ethernet2'], '100000')
+        self.assertEqual(devices['peer-7'], {'hwsku': 'Arista-VM', 'lo_addr': '10.1.0.7/32', 'type': 'LeafRouter'})
+
+    def test_parse_cpg_scale(self):
+        cpg = build_cpg()
+        bgp_sessions, _, _, myasn, _, _, _ = minigraph.parse_cpg(cpg, HOSTNAME)
+        self.assertEqual(myasn, '65100')
+        self.assertEqual(len(bgp_sessions), DEVICES)
+        self.assertEqual(bgp_sessions['10.0.0.3']['asn'], '64001')
+        self.assertEqual(bgp_sessions['10.0.0.3']['name'], 'peer-1')
@@ -5,7 +5,7 @@ import subprocess
 import time
 import syslog
 import os
-from swsscommon.swsscommon import ConfigDBConnector
+from swsscommon.swsscommon import ConfigDBConnector, Table, GetTableResult
 import socket
 import threading
 import queue
@@ -43,11 +43,16 @@ class CachedDataWithOp:
         return '(%s, %s)' % (self.data, op_str)
 
 bgpd_client = None
+cmd_transaction = None
 
 def g_run_command(table, command, use_bgpd_client, daemons, ignore_fail = False):
     syslog.syslog(syslog.LOG_DEBUG, "execute command {} for table {}.".format(command, table))
     if not command.startswith('vtysh '):
         use_bgpd_client = False
+    if use_bgpd_client and cmd_transaction is not None:
+        # command will be sent with all other commands of the transaction on commit
+        cmd_transaction.add(table, command, daemons, ignore_fail)
+        return True
     if use_bgpd_client:
         if not bgpd_client.run_vtysh_command(table, command, daemons) and not ignore_fail:
             syslog.syslog(syslog.LOG_ERR, 'command execution failure. Command: "{}"'.format(command))
@@ -62,6 +67,123 @@ def g_run_command(table, command, use_bgpd_client, daemons, ignore_fail = False)
             return False
     return True
 
+def begin_cmd_transaction():
+    global cmd_transaction
+    if bgpd_client is not None and cmd_transaction is None:
+        cmd_transaction = VtyshCmdTransaction()
+
+def set_cmd_transaction_key(table_key, cache = None):
+    # commands added to the transaction from now on are generated for table_key, its data in cache is restored
+    # if any of them fails on commit
+    if cmd_transaction is not None:
+        cmd_transaction.set_key(table_key, cache)
+
+def save_cmd_transaction_data(container, key):
+    # container[key] is restored together with the cached data of the current table key if any of its commands
+    # fails on commit, for state derived from the commands and kept outside of the table cache
+    if cmd_transaction is not None:
+        cmd_transaction.save_data(container, key)
+
+def commit_cmd_transaction():
+    global cmd_transaction
+    if cmd_transaction is None:
+        return True
+    transaction = cmd_transaction
+    cmd_transaction = None
+    return transaction.commit(bgpd_client)
+
+class VtyshCmdTransaction:
+    """
+    Commands generated by table handlers for a batch of table updates. The commands are sent to each
+    daemon as one config block on commit, with the command context (configure terminal, router bgp, ...)
+    shared by consecutive commands sent only once. A command already added in the same context is not
+    added again, unless a 'no' command was added in between. 'no' commands are always added.
+    Commands added are reported as successful to the handlers, which update their cached table data.
+    Cached data of the table keys which generated a failed command is restored on commit, so that the
+    commands are generated again on the next update of the key. Other data saved for the key, like the
+    local ASN of a VRF, is restored as well.
+    """
+    VTYSH_MARK = 'vtysh '
+    def __init__(self):
+        # list of (daemons, context, command, ignore_fail, set of table keys)
+        self.cmd_list = []
+        # (daemons, context) -> {(command, ignore_fail): index in cmd_list} of commands added since the last 'no' command
+        self.cmd_index = {}
+        self.table_key = None
+        # table key -> list of (container, key, data of the key in container before the transaction)
+        self.saved_data = {}
+    def set_key(self, table_key, cache = None):
+        self.table_key = table_key
+        if cache is not None:
+            self.save_data(cache, table_key)
+    def save_data(self, container, key):
+        if self.table_key is None:
+            return
+        saved_list = self.saved_data.setdefault(self.table_key, [])
+        if any(saved[0] is container and saved[1] == key for saved in saved_list):
+            return
+        saved_list.append((container, key, copy.deepcopy(container.get(key))))
+    def add(self, table, command, daemons, ignore_fail = False):
+        cmd_list = re.findall(r"-c\s+'([^']+)'\s*", command[len(self.VTYSH_MARK):])
+        if len(cmd_list) == 0:
+            return
+        daemons = bgpd_client.get_vtysh_daemons(table, cmd_list, daemons)
+        if daemons is None or len(daemons) == 0:
+            syslog.syslog(syslog.LOG_ERR, 'no common daemon list found for command %s' % command)
+            return
+        cmd_list = [cmd.strip() for cmd in cmd_list]
+        table_keys = set() if self.table_key is None else {self.table_key}
+        entry = (tuple(daemons), tuple(cmd_list[:-1]), cmd_list[-1], ignore_fail, table_keys)
+        cmd_index = self.cmd_index.setdefault(entry[:2], {})
+        idx = cmd_index.get(entry[2:4])
+        if idx is not None:
+            # same command added again in the same context, it is applied already by the first one
+            self.cmd_list[idx][4].update(table_keys)
+            return
+        if entry[2].startswith('no '):
+            # the command could remove config set by any previous command, also in nested contexts (no router
+            # bgp ...). It is not dropped either, as config it removes could be set again before its next occurrence
+            self.cmd_index.clear()
+        else:
+            cmd_index[entry[2:4]] = len(self.cmd_list)
+        self.cmd_list.append(entry)
+    def get_daemon_blocks(self):
+        """
+        Return list of (daemons, [(command, ignore_fail)], [set of table keys of each command]) in the order
+        each daemon list first appears
+        """
+        blocks = {}
+        for daemons, context, command, ignore_fail, table_keys in self.cmd_list:
+            block, block_keys, last_context = blocks.setdefault(daemons, ([], [], None))
+            if context != last_context:
+                if last_context is not None:
+                    block.append(('end', False))
+                    block_keys.append(set())
+                block += [(cmd, False) for cmd in context]
+                block_keys += [table_keys] * len(context)
+            block.append((command, ignore_fail))
+            block_keys.append(table_keys)
+            blocks[daemons] = (block, block_keys, context)
+        return [(list(daemons), block + [('end', False)], block_keys + [set()])
+                for daemons, (block, block_keys, _) in blocks.items()]
+    def commit(self, client):
+        ret_val = True
+        failed_keys = set()
+        for daemons, block, block_keys in self.get_daemon_blocks():
+            syslog.syslog(syslog.LOG_DEBUG, 'send block of %d commands to %s' % (len(block), daemons))
+            for idx in client.run_vtysh_block(daemons, block):
+                syslog.syslog(syslog.LOG_ERR, 'command execution failure. Command: "{}"'.format(block[idx][0]))
+                failed_keys.update(block_keys[idx])
+                ret_val = False
+        for table_key in failed_keys:
+            for container, key, data in self.saved_data.get(table_key, []):
+                syslog.syslog(syslog.LOG_INFO, 'restore data {} of {} for failed commands of {}'.format(data, key, table_key))
+                if not data:
+                    container.pop(key, None)
+                else:
+                    container[key] = data
+        return ret_val
+
 def extract_cmd_daemons(cmd_str):
     # daemon list could be given within brackets at head of input lines
     dm_mark = re.match(r'\[(?P<daemons>.+)\]', cmd_str)
@@ -170,6 +292,30 @@ class BgpdClientMgr(threading.Thread):
         msg_buf.close()
         return (ret_code, reply_msg)
     @staticmethod
+    def __get_replies(sock, count):
+        """
+        Read replies of count commands sent in one go. Each reply is the command output followed by 3 zero
+        bytes and the return code. Return list of (ret_code, reply), ret_code is None for missing replies.
+        """
+        replies = []
+        msg_buf = bytearray()
+        while len(replies) < count:
+            msg_end = msg_buf.find(b'\0\0\0')
+            if msg_end >= 0 and len(msg_buf) >= msg_end + 4:
+                replies.append((msg_buf[msg_end + 3], msg_buf[:msg_end].decode()))
+                del msg_buf[:msg_end + 4]
+                continue
+            try:
+                rd_msg = sock.recv(16384)
+            except socket.timeout:
+                syslog.syslog(syslog.LOG_ERR, 'socket reading timeout')
+                break
+            if len(rd_msg) == 0:
+                syslog.syslog(syslog.LOG_ERR, 'socket closed by frr daemon')
+                break
+            msg_buf += rd_msg
+        return replies + [(None, None)] * (count - len(replies))
+    @staticmethod
     def __send_data(sock, data):
         if isinstance(data, str):
             data = bytes(data, 'utf-8')
@@ -272,17 +418,51 @@ class BgpdClientMgr(threading.Thread):
                 ret_val = True
             resp += reply
         return (ret_val, resp)
+    def get_vtysh_daemons(self, table, cmd_list, daemons = None):
+        if daemons is None:
+            daemons = self.TABLE_DAEMON.get(table, None)
+        if daemons is None:
+            daemons = self.__get_cmd_daemons(cmd_list + ['end'])
+        return daemons
+    def run_vtysh_block(self, daemons, cmd_list):
+        """
+        Run list of (command, ignore_fail) on daemons and return the indexes of failed commands in the list.
+        All commands are written to each daemon in one go and the replies are read afterwards. Same as for
+        a single command, a command succeeds if it succeeds on at least one daemon.
+        """
+        succ_list = [False] * len(cmd_list)
+        data = ''.join(cmd + '\0' for cmd, _ in cmd_list)
+        with self.lock:
+            for daemon in daemons:
+                sock = self.client_socks.get(daemon, None)
+                if sock is None:
+                    syslog.syslog(syslog.LOG_ERR, 'daemon %s is not connected' % daemon)
+                    continue
+                syslog.syslog(syslog.LOG_DEBUG, 'VTYSH BLOCK: %d commands daemon: %s' % (len(cmd_list), daemon))
+                try:
+                    self.__send_data(sock, data)
+                except socket.error as msg:
+                    syslog.syslog(syslog.LOG_ERR, 'failed to send commands to frr daemon: %s' % msg)
+                    succ_list = [False] * len(cmd_list)
+                    break
+                for idx, (ret_code, reply) in enumerate(self.__get_replies(sock, len(cmd_list))):
+                    if ret_code is None:
+                        syslog.syslog(syslog.LOG_ERR, 'failed to get reply of command %s from frr daemon' % cmd_list[idx][0])
+                    elif ret_code != 0:
+                        syslog.syslog(syslog.LOG_DEBUG, '[%s] command %s return code: %d' % (daemon, cmd_list[idx][0], ret_code))
+                        syslog.syslog(syslog.LOG_DEBUG, reply)
+                    else:
+                        succ_list[idx] = True
+        return [idx for idx, (succ, (_, ignore_fail)) in enumerate(zip(succ_list, cmd_list))
+                if not succ and not ignore_fail]
     def run_vtysh_command(self, table, command, daemons):
         if not command.startswith(self.VTYSH_MARK):
             syslog.syslog(syslog.LOG_ERR, 'command %s is not for vtysh config' % command)
             return False
         cmd_line = command[len(self.VTYSH_MARK):]
         cmd_list = re.findall(r"-c\s+'([^']+)'\s*", cmd_line)
+        daemons = self.get_vtysh_daemons(table, cmd_list, daemons)
         cmd_list.append('end')
-        if daemons is None:
-            daemons = self.TABLE_DAEMON.get(table, None)
-        if daemons is None:
-            daemons = self.__get_cmd_daemons(cmd_list)
         if daemons is None or len(daemons) == 0:
             syslog.syslog(syslog.LOG_ERR, 'no common daemon list found for given commands')
             return False
@@ -558,6 +738,36 @@ class BGPKeyMapList(list):
                     except ValueError:
                         pass
             super(BGPKeyMapList, self).append((db_field, BGPKeyMapInfo(cmd_str, hdl_func, hdl_data)))
+        # parsed field list of each key map and index of data field to key maps referencing it
+        self.field_specs = []
+        self.field_index = {}
+        for map_idx, (db_field, _) in enumerate(self):
+            field_spec = self.compile_db_field(db_field)
+            self.field_specs.append(field_spec)
+            for key_list, _ in field_spec[0]:
+                for k in key_list:
+                    self.field_index.setdefault(k, []).append(map_idx)
+    @staticmethod
+    def compile_db_field(db_field):
+        merge_vals = type(db_field) is tuple
+        if type(db_field) is not list and type(db_field) is not tuple:
+            db_field = [db_field]
+        fld_list = []
+        req_idx_list = []
+        opt_idx_list = set()
+        for idx, dkey in enumerate(db_field):
+            optional = False
+            if len(dkey) > 0 and dkey[0] == '+':
+                if len(dkey) > 1 and dkey[1] == '+':
+                    opt_idx_list.add(idx)
+                    dkey = dkey[2:]
+                else:
+                    dkey = dkey[1:]
+                optional = True
+            else:
+                req_idx_list.append(idx)
+            fld_list.append((dkey.split('&'), optional))
+        return (fld_list, req_idx_list, opt_idx_list, merge_vals)
     def __eq__(self, other):
         return super(BGPKeyMapList, self).__eq__(other) and self.table_name == other.table_name and self.table_key == other.table_key
     def __ne__(self, other):
@@ -644,32 +854,21 @@ class BGPKeyMapList(list):
         start_idx = len(upper_vals)
         ret_val = False
         run_cmd_cnt = 0
-        for db_field, key_map in self:
-            merge_vals = False
-            if type(db_field) is not list and type(db_field) is not tuple:
-                db_field = [db_field]
-            elif type(db_field) is tuple:
-                db_field = list(db_field)
-                merge_vals = True
+        # only key maps referencing a changed field could generate command
+        map_idx_set = set()
+        for k, v in data.items():
+            if isinstance(v, CachedDataWithOp) and v.op != CachedDataWithOp.OP_NONE:
+                map_idx_set.update(self.field_index.get(k, []))
+        for map_idx in sorted(map_idx_set):
+            key_map = self[map_idx][1]
+            fld_list, req_idx_list, opt_idx_list, merge_vals = self.field_specs[map_idx]
 
             idx = 0
-            req_idx_list = []
             key_list_list = []
-            opt_idx_list = set()
             run_cmd = True
-            for dkey in db_field:
-                optional = False
-                if len(dkey) > 0 and dkey[0] == '+':
-                    if len(dkey) > 1 and dkey[1] == '+':
-                        opt_idx_list.add(idx)
-                        dkey = dkey[2:]
-                    else:
-                        dkey = dkey[1:]
-                    optional = True
-                else:
-                    req_idx_list.append(idx)
+            for fld_keys, optional in fld_list:
                 key_list = []
-                for k in dkey.split('&'):
+                for k in fld_keys:
                     if k in data and isinstance(data[k], CachedDataWithOp):
                         key_list.append(k)
                 if not optional and len(key_list) == 0:
@@ -1442,10 +1641,25 @@ def hdl_static_route(daemon, cmd_str, op, st_idx, args, data):
     return cmd_list
 
 class ExtConfigDBConnector(ConfigDBConnector):
+    # seconds to block waiting for the first keyspace notification of a batch
+    LISTEN_TIMEOUT = 1.0
+    # seconds to coalesce further notifications after the first one of a batch
+    COALESCE_WINDOW = 0.05
+    # maximum number of changed keys fetched and dispatched in one batch
+    MAX_BATCH_KEYS = 1000
+    # minimum number of changed keys of a table in a batch to read the whole table with one dump instead of per key
+    MIN_TABLE_DUMP_KEYS = 64
+    # tables updated before others in a batch because commands of later tables depend on them
+    TABLE_DEP_RANK = {table: rank for rank, table in enumerate([
+        'DEVICE_METADATA', 'VRF', 'BGP_GLOBALS', 'PREFIX_SET', 'PREFIX', 'COMMUNITY_SET', 'EXTENDED_COMMUNITY_SET',
+        'AS_PATH_SET', 'ROUTE_MAP', 'BGP_PEER_GROUP', 'BGP_NEIGHBOR', 'BGP_GLOBALS_AF', 'BGP_PEER_GROUP_AF',
+        'BGP_NEIGHBOR_AF'])}
     def __init__(self, ns_attrs = None):
         super(ExtConfigDBConnector, self).__init__()
         self.nosort_attrs = ns_attrs if ns_attrs is not None else {}
         self.__listen_thread_running = False
+        self.notification_count = 0
+        self.dispatch_count = 0
     def raw_to_typed(self, raw_data, table = ''):
         if len(raw_data) == 0:
             raw_data = None
@@ -1456,20 +1670,80 @@ class ExtConfigDBConnector(ConfigDBConnector):
             if type(val) is list and key not in self.nosort_attrs.get(table, set()):
                 val.sort()
         return data
+    def __add_changed_key(self, changes, msg_item):
+        if msg_item['type'] != 'pmessage':
+            return
+        self.notification_count += 1
+        key = msg_item['channel'].split(':', 1)[1]
+        try:
+            (table, row) = key.split(self.TABLE_NAME_SEPARATOR, 1)
+        except ValueError:
+            return  #Ignore non table-formated redis entries
+        if table in self.handlers and key not in changes:
+            changes[key] = (table, row)
+    def __get_all_data(self, changes):
+        client = self.get_redis_client(self.db_name)
+        table_rows = {}
+        for table, row in changes.values():
+            table_rows.setdefault(table, []).append(row)
+        # a table with many changed keys, e.g. on a bulk load, is read with one table dump script
+        table_data = {}
+        for table, rows in table_rows.items():
+            if len(rows) >= self.MIN_TABLE_DUMP_KEYS:
+                table_data[table] = GetTableResult()
+                Table(client, table).dump(table_data[table])
+        all_data = []
+        for key, (table, row) in changes.items():
+            if table in table_data:
+                all_data.append(dict(table_data[table].get(row, {})))
+            else:
+                all_data.append(client.hgetall(key))
+        return all_data
+    def __get_dispatch_order(self, changes, all_data):
+        # updates are dispatched from VRF to address family tables, and row deletions in reverse order
+        upd_list = []
+        del_list = []
+        for idx, ((table, row), raw_data) in enumerate(zip(changes.values(), all_data)):
+            rank = self.TABLE_DEP_RANK.get(table, len(self.TABLE_DEP_RANK))
+            if len(raw_data) == 0:
+                del_list.append((-rank, idx, table, row, raw_data))
+            else:
+                upd_list.append((rank, idx, table, row, raw_data))
+        return [item[2:] for item in sorted(upd_list) + sorted(del_list)]
+    def dispatch_changes(self, changes):
+        """Read the current data of all changed keys, with one table dump for the tables with many changed keys,
+           and fire table handler once per key.
+           Keys are dispatched in table dependency order, otherwise in the order of their first notification.
+           Commands generated for a batch of keys are sent as one transaction.
+        """
+        if len(changes) == 0:
+            return
+        try:
+            all_data = self.__get_all_data(changes)
+        except Exception as e:
+            syslog.syslog(syslog.LOG_ERR, '[bgp cfgd] Failed reading config DB update with exception:' + str(e))
+            logging.exception(e)
+            return
+        if len(changes) > 1:
+            begin_cmd_transaction()
+        try:
+            for table, row, raw_data in self.__get_dispatch_order(changes, all_data):
+                try:
+                    data = self.raw_to_typed(raw_data, table)
+                    self._ConfigDBConnector__fire(table, row, data)
+                    self.dispatch_count += 1
+                except Exception as e:
+                    syslog.syslog(syslog.LOG_ERR, '[bgp cfgd] Failed handling config DB update with exception:' + str(e))
+                    logging.exception(e)
+        finally:
+            if not commit_cmd_transaction():
+                syslog.syslog(syslog.LOG_ERR, '[bgp cfgd] Failed running commands of config DB update batch')
+        syslog.syslog(syslog.LOG_DEBUG, 'dispatched %d changed keys, notifications received %d dispatched %d' %
+                      (len(changes), self.notification_count, self.dispatch_count))
     def sub_msg_handler(self, msg_item):
-        if msg_item['type'] == 'pmessage':
-            key = msg_item['channel'].split(':', 1)[1]
-            try:
-                (table, row) = key.split(self.TABLE_NAME_SEPARATOR, 1)
-                if table in self.handlers:
-                    client = self.get_redis_client(self.db_name)
-                    data = self.raw_to_typed(client.hgetall(key), table)
-                    super(ExtConfigDBConnector, self)._ConfigDBConnector__fire(table, row, data)
-            except ValueError:
-                pass    #Ignore non table-formated redis entries
-            except Exception as e:
-                syslog.syslog(syslog.LOG_ERR, '[bgp cfgd] Failed handling config DB update with exception:' + str(e))
-                logging.exception(e)
+        changes = {}
+        self.__add_changed_key(changes, msg_item)
+        self.dispatch_changes(changes)
 
     def listen_thread(self, timeout):
         self.__listen_thread_running = True
@@ -1477,8 +1751,20 @@ class ExtConfigDBConnector(ConfigDBConnector):
         self.pubsub.psubscribe(sub_key_space)
         while self.__listen_thread_running:
             msg = self.pubsub.get_message(timeout, True)
-            if msg:
-                self.sub_msg_handler(msg)
+            if not msg:
+                continue
+            # coalesce notifications of the same key, e.g. one notification per field write of a bulk load
+            changes = {}
+            self.__add_changed_key(changes, msg)
+            end_time = time.time() + self.COALESCE_WINDOW
+            while self.__listen_thread_running and len(changes) < self.MAX_BATCH_KEYS:
+                wait_time = end_time - time.time()
+                if wait_time <= 0:
+                    break
+                msg = self.pubsub.get_message(wait_time, True)
+                if msg:
+                    self.__add_changed_key(changes, msg)
+            self.dispatch_changes(changes)
 
         self.pubsub.punsubscribe(sub_key_space)
 
@@ -1486,7 +1772,7 @@ class ExtConfigDBConnector(ConfigDBConnector):
         """Start listen Redis keyspace events and will trigger corresponding handlers when content of a table changes.
         """
         self.pubsub = self.get_redis_client(self.db_name).pubsub()
-        self.sub_thread = threading.Thread(target=self.listen_thread, args=(0.01,))
+        self.sub_thread = threading.Thread(target=self.listen_thread, args=(self.LISTEN_TIMEOUT,))
         self.sub_thread.start()
 
     def stop_listen(self):
@@ -2092,6 +2378,10 @@ class BGPConfigDaemon:
             self.config_mode = db_entry['docker_routing_config_mode']
         else:
             self.config_mode = "separated"
+        # (table, table key) ==> compiled key map list
+        self.key_map_cache = {}
+        for table in self.tbl_to_key_map:
+            self.__get_key_map(table, None)
         # VRF ==> local_as
         self.bgp_asn = {}
         # VRF ==> confederation peer list
@@ -2380,6 +2670,7 @@ class BGPConfigDaemon:
             syslog.syslog(syslog.LOG_ERR, 'failed to delete local_asn for VRF %s' % vrf)
             return False
         if vrf in self.bgp_asn:
+            save_cmd_transaction_data(self.bgp_asn, vrf)
             del(self.bgp_asn[vrf])
         for dkey, dval in data.items():
             # force delete all VRF instance attributes in cache
@@ -2555,6 +2846,14 @@ class BGPConfigDaemon:
 
         return cmd_suffix, None
 
+    def __get_key_map(self, table, tbl_key):
+        cache_key = (table, None if tbl_key is None else tuple(sorted(tbl_key.items())))
+        key_map = self.key_map_cache.get(cache_key, None)
+        if key_map is None:
+            key_map = BGPKeyMapList(self.tbl_to_key_map[table], table, tbl_key)
+            self.key_map_cache[cache_key] = key_map
+        return key_map
+
     def __update_bgp(self, data_list):
         while not self.bgp_message.empty():
             key, del_table, table, data = self.bgp_message.get()
@@ -2565,6 +2864,7 @@ class BGPConfigDaemon:
                 # bypass non-compatible neighbor table
                 continue
             data_list.append((table, key, data))
+            set_cmd_transaction_key(ExtConfigDBConnector.get_table_key(table, key), self.table_data_cache)
             if len(key_list) > 1:
                 key = key_list[1]
             else:
@@ -2597,7 +2897,7 @@ class BGPConfigDaemon:
                     if new_key is not None:
                         key = new_key
                         tbl_key = {'ip_prefix': ('ipv4' if af_id == socket.AF_INET else 'ipv6')}
-                key_map = BGPKeyMapList(self.tbl_to_key_map[table], table, tbl_key)
+                key_map = self.__get_key_map(table, tbl_key)
             else:
                 key_map = None
             if table == 'BGP_GLOBALS':
@@ -2618,6 +2918,7 @@ class BGPConfigDaemon:
                             command = "vtysh -c 'configure terminal' -c 'router bgp {} vrf {}' -c 'no bgp default ipv4-unicast'".format(dval.data, vrf)
                             if self.__run_command(table, command):
                                 syslog.syslog(syslog.LOG_DEBUG, 'set local_asn %s to VRF %s, re-apply all VRF related tables' % (dval.data, vrf))
+                                save_cmd_transaction_data(self.bgp_asn, vrf)
                                 self.bgp_asn[vrf] = dval.data
                                 self.__apply_dep_vrf_table(vrf, 'ROUTE_REDISTRIBUTE')
                                 dval.status = CachedDataWithOp.STAT_SUCC
@@ -2636,6 +2937,7 @@ class BGPConfigDaemon:
                         syslog.syslog(syslog.LOG_ERR, 'failed running BGP global config command')
                         continue
                     if 'confed_peers' in data:
+                        save_cmd_transaction_data(self.bgp_confed_peers, vrf)
                         self.bgp_confed_peers[vrf] = copy.copy(self.upd_confed_peers)
                 else:
                     self.__delete_vrf_asn(vrf, table, data)
@@ -3764,6 +4066,7 @@ class BGPConfigDaemon:
         self.bgp_message.put((key, del_table, table, data))
         upd_data_list = []
         self.__update_bgp(upd_data_list)
+        set_cmd_transaction_key(None)
         for table, key, data in upd_data_list:
             table_key = ExtConfigDBConnector.get_table_key(table, key)
             self.__update_cache_data(table_key, data)
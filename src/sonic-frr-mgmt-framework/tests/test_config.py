@@ -19,6 +19,217 @@ def test_contructor():
     daemon.config_db.pubsub.punsubscribe.assert_called_once()
     assert(daemon.config_db.sub_thread.is_alive() == False)
 
+@patch.dict('sys.modules', **mockmapping)
+def test_listen_coalesce():
+    from frrcfgd.frrcfgd import ExtConfigDBConnector
+    config_db = ExtConfigDBConnector()
+    config_db.TABLE_NAME_SEPARATOR = '|'
+    config_db.COALESCE_WINDOW = 1
+    config_db.raw_to_typed = lambda raw_data, table: raw_data
+    fire = MagicMock()
+    config_db._ConfigDBConnector__fire = fire
+    config_db.handlers = {'BGP_NEIGHBOR': MagicMock(), 'ROUTE_MAP': MagicMock()}
+    db_data = {'BGP_NEIGHBOR|default|10.0.0.%d' % idx: {'asn': '100', 'holdtime': '30'} for idx in range(3)}
+    db_data['ROUTE_MAP|map1|10'] = {'route_operation': 'permit'}
+    # one notification per field write, plus a key not handled by daemon
+    messages = [{'type': 'psubscribe'}]
+    for key in db_data:
+        messages += [{'type': 'pmessage', 'channel': '__keyspace@4__:' + key}] * 2
+    messages.append({'type': 'pmessage', 'channel': '__keyspace@4__:PORT|Ethernet0'})
+    def get_message(timeout, interrupt):
+        if messages:
+            return messages.pop(0)
+        config_db.stop_listen()
+        return None
+    config_db.pubsub = MagicMock()
+    config_db.pubsub.get_message = get_message
+    # neighbors are read with one table dump, the single route map key with HGETALL
+    config_db.MIN_TABLE_DUMP_KEYS = 3
+    table_data = dict(db_data)
+    table_data['BGP_NEIGHBOR|default|10.0.0.9'] = {'asn': '300'}
+    def dump_table(client, table):
+        tbl = MagicMock()
+        tbl.dump.side_effect = lambda result: result.update(
+            {key.split('|', 1)[1]: data for key, data in table_data.items() if key.startswith(table + '|')})
+        return tbl
+    client = MagicMock(spec=['hgetall', 'pubsub'])
+    client.hgetall.side_effect = lambda key: db_data[key]
+    config_db.get_redis_client = MagicMock(return_value=client)
+    with patch('frrcfgd.frrcfgd.Table', side_effect=dump_table) as table_cls, \
+            patch('frrcfgd.frrcfgd.GetTableResult', dict):
+        config_db.listen_thread(0.01)
+    # all keys are read in one batch and dispatched once, route map before neighbors
+    table_cls.assert_called_once_with(client, 'BGP_NEIGHBOR')
+    client.hgetall.assert_called_once_with('ROUTE_MAP|map1|10')
+    exp_keys = ['ROUTE_MAP|map1|10'] + ['BGP_NEIGHBOR|default|10.0.0.%d' % idx for idx in range(3)]
+    assert(fire.call_args_list == [((key.split('|', 1)[0], key.split('|', 1)[1], db_data[key]),) for key in exp_keys])
+    assert(config_db.notification_count == 9)
+    assert(config_db.dispatch_count == 4)
+
+@patch.dict('sys.modules', **mockmapping)
+def test_cmd_transaction():
+    import frrcfgd.frrcfgd as frrcfgd
+    from frrcfgd.frrcfgd import BGPConfigDaemon
+    client = MagicMock()
+    client.get_vtysh_daemons = lambda table, cmd_list, daemons: daemons if daemons is not None else ['bgpd']
+    client.run_vtysh_block.return_value = []
+    frrcfgd.bgpd_client = client
+    daemon = BGPConfigDaemon()
+    hdlr = dict(daemon.table_handler_list)
+    frrcfgd.begin_cmd_transaction()
+    hdlr['BGP_GLOBALS']('BGP_GLOBALS', 'default', {'local_asn': '100', 'router_id': '1.1.1.1'})
+    for idx in range(3):
+        hdlr['BGP_NEIGHBOR']('BGP_NEIGHBOR', 'default|10.0.0.%d' % idx, {'asn': '200'})
+    assert(not client.run_vtysh_block.called)
+    assert(frrcfgd.commit_cmd_transaction())
+    assert(frrcfgd.cmd_transaction is None)
+    # one block for bgpd with context sent once for each consecutive context
+    client.run_vtysh_block.assert_called_once()
+    daemons, block = client.run_vtysh_block.call_args[0]
+    assert(daemons == ['bgpd'])
+    assert([cmd for cmd, _ in block] == [
+        'configure terminal', 'router bgp 100 vrf default', 'no bgp default ipv4-unicast', 'bgp router-id 1.1.1.1',
+        'neighbor 10.0.0.0 remote-as 200', 'neighbor 10.0.0.1 remote-as 200', 'neighbor 10.0.0.2 remote-as 200',
+        'end'])
+    # cached data of the key whose command failed is restored, its commands are generated again on next update
+    nbr_keys = ['BGP_NEIGHBOR&&default|10.0.0.%d' % idx for idx in range(3)]
+    assert([daemon.table_data_cache[key] for key in nbr_keys] == [{'asn': '200'}] * 3)
+    frrcfgd.begin_cmd_transaction()
+    for idx in range(3):
+        hdlr['BGP_NEIGHBOR']('BGP_NEIGHBOR', 'default|10.0.0.%d' % idx, {'asn': '300'})
+    hdlr['BGP_NEIGHBOR']('BGP_NEIGHBOR', 'default|10.0.0.3', {'asn': '300'})
+    client.run_vtysh_block.reset_mock()
+    client.run_vtysh_block.side_effect = lambda daemons, block: [idx for idx, (cmd, _) in enumerate(block)
+                                                                 if cmd in ('neighbor 10.0.0.1 remote-as 300',
+                                                                            'neighbor 10.0.0.3 remote-as 300')]
+    assert(not frrcfgd.commit_cmd_transaction())
+    assert(daemon.table_data_cache[nbr_keys[0]] == {'asn': '300'})
+    assert(daemon.table_data_cache[nbr_keys[1]] == {'asn': '200'})
+    assert(daemon.table_data_cache[nbr_keys[2]] == {'asn': '300'})
+    assert('BGP_NEIGHBOR&&default|10.0.0.3' not in daemon.table_data_cache)
+    client.run_vtysh_block.side_effect = None
+    client.run_vtysh_block.reset_mock()
+    frrcfgd.begin_cmd_transaction()
+    hdlr['BGP_NEIGHBOR']('BGP_NEIGHBOR', 'default|10.0.0.1', {'asn': '300'})
+    assert(frrcfgd.commit_cmd_transaction())
+    _, block = client.run_vtysh_block.call_args[0]
+    assert('neighbor 10.0.0.1 remote-as 300' in [cmd for cmd, _ in block])
+    assert(daemon.table_data_cache[nbr_keys[1]] == {'asn': '300'})
+    # commands run directly without transaction
+    with patch('frrcfgd.frrcfgd.subprocess.Popen') as popen:
+        client.run_vtysh_command.return_value = True
+        hdlr['BGP_NEIGHBOR']('BGP_NEIGHBOR', 'default|10.0.0.5', {'asn': '300'})
+        client.run_vtysh_command.assert_called_once_with('BGP_NEIGHBOR',
+            "vtysh -c 'configure terminal' -c 'router bgp 100 vrf default' -c 'neighbor 10.0.0.5 remote-as 300'", None)
+        assert(not popen.called)
+    frrcfgd.bgpd_client = None
+
+@patch.dict('sys.modules', **mockmapping)
+def test_cmd_transaction_restore_vrf_asn():
+    import frrcfgd.frrcfgd as frrcfgd
+    from frrcfgd.frrcfgd import BGPConfigDaemon
+    client = MagicMock()
+    client.get_vtysh_daemons = lambda table, cmd_list, daemons: daemons if daemons is not None else ['bgpd']
+    frrcfgd.bgpd_client = client
+    daemon = BGPConfigDaemon()
+    hdlr = dict(daemon.table_handler_list)
+    glb_key = 'BGP_GLOBALS&&Vrf_red'
+    # local ASN and confed peers of the VRF are restored with the cache when creating the BGP instance fails
+    client.run_vtysh_block.side_effect = lambda daemons, block: [idx for idx, (cmd, _) in enumerate(block)
+                                                                 if cmd == 'router bgp 200 vrf Vrf_red']
+    frrcfgd.begin_cmd_transaction()
+    hdlr['BGP_GLOBALS']('BGP_GLOBALS', 'Vrf_red', {'local_asn': '200', 'confed_peers': ['10']})
+    assert(daemon.bgp_asn['Vrf_red'] == '200')
+    assert(daemon.bgp_confed_peers['Vrf_red'] == {'10'})
+    assert(not frrcfgd.commit_cmd_transaction())
+    assert('Vrf_red' not in daemon.bgp_asn)
+    assert('Vrf_red' not in daemon.bgp_confed_peers)
+    assert(glb_key not in daemon.table_data_cache)
+    # instance and confed peers are created again on next update
+    client.run_vtysh_block.side_effect = None
+    client.run_vtysh_block.return_value = []
+    frrcfgd.begin_cmd_transaction()
+    hdlr['BGP_GLOBALS']('BGP_GLOBALS', 'Vrf_red', {'local_asn': '200', 'confed_peers': ['10']})
+    assert(frrcfgd.commit_cmd_transaction())
+    _, block = client.run_vtysh_block.call_args[0]
+    cmds = [cmd for cmd, _ in block]
+    assert('router bgp 200 vrf Vrf_red' in cmds)
+    assert('bgp confederation peers 10' in cmds)
+    assert(daemon.bgp_asn['Vrf_red'] == '200')
+    assert(daemon.bgp_confed_peers['Vrf_red'] == {'10'})
+    frrcfgd.bgpd_client = None
+
+@patch.dict('sys.modules', **mockmapping)
+def test_cmd_transaction_dedup():
+    import frrcfgd.frrcfgd as frrcfgd
+    client = MagicMock()
+    client.get_vtysh_daemons = lambda table, cmd_list, daemons: ['bgpd']
+    frrcfgd.bgpd_client = client
+    transaction = frrcfgd.VtyshCmdTransaction()
+    def add(key, cmd):
+        transaction.set_key(key)
+        transaction.add('BGP_NEIGHBOR', "vtysh -c 'configure terminal' -c 'router bgp 100' -c '%s'" % cmd, None)
+    add('k1', 'neighbor 10.0.0.1 timers 1 3')
+    add('k2', 'neighbor 10.0.0.2 timers 1 3')
+    # repeated command is dropped, its table key is tracked by the first one
+    add('k3', 'neighbor 10.0.0.1 timers 1 3')
+    assert([cmd for _, _, cmd, _, _ in transaction.cmd_list] == ['neighbor 10.0.0.1 timers 1 3', 'neighbor 10.0.0.2 timers 1 3'])
+    assert(transaction.cmd_list[0][4] == {'k1', 'k3'})
+    # but not after a command which could remove it
+    add('k4', 'no neighbor 10.0.0.1')
+    add('k5', 'neighbor 10.0.0.1 timers 1 3')
+    add('k6', 'no neighbor 10.0.0.1')
+    assert([cmd for _, _, cmd, _, _ in transaction.cmd_list] == [
+        'neighbor 10.0.0.1 timers 1 3', 'neighbor 10.0.0.2 timers 1 3', 'no neighbor 10.0.0.1',
+        'neighbor 10.0.0.1 timers 1 3', 'no neighbor 10.0.0.1'])
+    frrcfgd.bgpd_client = None
+
+@patch.dict('sys.modules', **mockmapping)
+def test_run_vtysh_block():
+    import threading
+    from frrcfgd.frrcfgd import BgpdClientMgr
+    class FakeSock:
+        def __init__(self, replies):
+            self.sent = []
+            self.replies = replies
+        def sendall(self, data):
+            self.sent.append(data)
+        def recv(self, size):
+            # replies are split at arbitrary positions
+            data, self.replies = self.replies[:5], self.replies[5:]
+            return data
+    client = BgpdClientMgr.__new__(BgpdClientMgr)
+    client.lock = threading.Lock()
+    bgpd = FakeSock(b'\0\0\0\0' + b'% Unknown command\0\0\0\x02' + b'\0\0\0\x01' + b'\0\0\0\0')
+    zebra = FakeSock(b'\0\0\0\0' + b'\0\0\0\x01' + b'\0\0\0\x01')
+    client.client_socks = {'bgpd': bgpd, 'zebra': zebra}
+    block = [('configure terminal', False), ('bad command', False), ('bad ignored', True), ('end', False)]
+    # all commands are sent in one go, a command succeeds if it succeeds on any daemon
+    assert(client.run_vtysh_block(['bgpd', 'zebra'], block) == [1])
+    assert(bgpd.sent == [b'configure terminal\0bad command\0bad ignored\0end\0'])
+    assert(zebra.sent == bgpd.sent)
+
+@patch.dict('sys.modules', **mockmapping)
+@patch('frrcfgd.frrcfgd.g_run_command')
+def test_key_map_replay_5k_neighbors(run_cmd):
+    from frrcfgd.frrcfgd import BGPConfigDaemon
+    run_cmd.return_value = True
+    nbr_count = 5000
+    daemon = BGPConfigDaemon()
+    hdlr = dict(daemon.table_handler_list)
+    hdlr['BGP_GLOBALS']('BGP_GLOBALS', 'default', {'local_asn': '100'})
+    key_map_cnt = len(daemon.key_map_cache)
+    nbr_data = {'asn': '200', 'admin_status': 'up', 'keepalive': '30', 'holdtime': '90',
+                'name': 'peer', 'ebgp_multihop': 'true', 'ebgp_multihop_ttl': '2'}
+    run_cmd.reset_mock()
+    for idx in range(nbr_count):
+        hdlr['BGP_NEIGHBOR']('BGP_NEIGHBOR', 'default|10.%d.%d.1' % (idx // 256, idx % 256), dict(nbr_data))
+    # key maps are compiled at startup and not rebuilt for any neighbor
+    assert(len(daemon.key_map_cache) == key_map_cnt)
+    assert(run_cmd.call_count == nbr_count * 4)
+    run_cmd.assert_any_call('BGP_NEIGHBOR', "vtysh -c 'configure terminal' -c 'router bgp 100 vrf default' "
+                            "-c 'neighbor 10.19.135.1 timers 30 90'", True, None, False)
+
 class CmdMapTestInfo:
     data_buf = {}
     def __init__(self, table, key, data, exp_cmd, no_del = False, neg_cmd = None,
@@ -3,8 +3,9 @@ import json
 import os
 import re
 import subprocess
+import threading
+import time
 
-import yaml
 from natsort import natsorted
 from sonic_py_common.general import getstatusoutput_noshell_pipe
 from swsscommon.swsscommon import ConfigDBConnector, SonicV2Connector
@@ -48,21 +49,151 @@ CHASSIS_INFO_REV_FIELD = 'revision'
 # DPU constants
 DPU_NAME_PREFIX = "dpu"
 
+# System MAC sources
+SYS_CLASS_NET_PATH = "/sys/class/net"
+# Lives on tmpfs, so the syseeprom is decoded at most once per boot
+SYSEEPROM_MAC_CACHE_PATH = "/run/sonic/syseeprom_base_mac"
+
+# Default seconds DEVICE_METADATA|localhost stays cached, see enable_localhost_info_cache()
+LOCALHOST_INFO_TTL = 5
+
 # Cacheable Objects
 sonic_ver_info = {}
+sonic_ver_stamp = None
 hw_info_dict = {}
+# path -> (file stamp, parsed contents) of the files parsed by _get_cached_file()
+file_cache = {}
+# path of the ASIC configuration file found by get_asic_conf_file_path()
+asic_conf_file_path_cache = None
+# ConfigDB connection and DEVICE_METADATA|localhost used when get_localhost_info() is called without config_db.
+# The entry is only cached when a ttl is set by enable_localhost_info_cache()
+localhost_info_cache = {'config_db': None, 'metadata': None, 'timestamp': 0, 'ttl': None}
+# Serializes the requests on the shared ConfigDB connection, callers may run in several threads
+localhost_info_lock = threading.Lock()
+
+
+def refresh():
+    """
+    Drop all cached device facts, so that the next queries read them again
+    from the files and ConfigDB
+    """
+    global sonic_ver_info, sonic_ver_stamp, hw_info_dict, asic_conf_file_path_cache
+
+    sonic_ver_info = {}
+    sonic_ver_stamp = None
+    hw_info_dict = {}
+    file_cache.clear()
+    asic_conf_file_path_cache = None
+    with localhost_info_lock:
+        localhost_info_cache['metadata'] = None
+        localhost_info_cache['timestamp'] = 0
+
+
+def enable_localhost_info_cache(ttl=LOCALHOST_INFO_TTL):
+    """
+    Cache DEVICE_METADATA|localhost read by get_localhost_info() without
+    config_db for ttl seconds. Meant for daemons which query it in loops and
+    can live with a value up to ttl seconds old; CLI flows should not enable it
+    """
+    with localhost_info_lock:
+        localhost_info_cache['ttl'] = ttl
+        localhost_info_cache['metadata'] = None
+
+
+def disable_localhost_info_cache():
+    """
+    Read DEVICE_METADATA|localhost from ConfigDB on every get_localhost_info() call
+    """
+    with localhost_info_lock:
+        localhost_info_cache['ttl'] = None
+        localhost_info_cache['metadata'] = None
+
+
+def _get_file_stamp(path):
+    """
+    Returns a tuple identifying the current version of the file, None if it can't be stat'ed
+    """
+    try:
+        st = os.stat(path)
+    except OSError:
+        return None
+    return (st.st_dev, st.st_ino, st.st_mtime_ns, st.st_size)
+
+
+def _get_cached_file(path, parser):
+    """
+    Returns parser(path), reusing the previous result while the file keeps the same
+    inode, modification time and size
+
+    Args:
+        path: path to the file
+        parser: a function which reads the file and returns its parsed contents
+    """
+    stamp = _get_file_stamp(path)
+    if stamp is not None:
+        entry = file_cache.get(path)
+        if entry is not None and entry[0] == stamp:
+            return entry[1]
+
+    value = parser(path)
+    if stamp is not None:
+        file_cache[path] = (stamp, value)
+    return value
+
+
+def _parse_conf_file(path):
+    """
+    Parses a file of 'key=value' lines into a dictionary
+    """
+    conf_vars = {}
+    with open(path) as conf_file:
+        for line in conf_file:
+            tokens = line.split('=')
+            if len(tokens) < 2:
+                continue
+            conf_vars[tokens[0]] = tokens[1].strip()
+
+    return conf_vars
+
+
+def _get_localhost_metadata():
+    """
+    Returns DEVICE_METADATA|localhost read through a shared ConfigDB connection, one request at a time.
+    With the cache enabled, the entry is reread once its ttl passed
+    """
+    with localhost_info_lock:
+        now = time.time()
+        ttl = localhost_info_cache['ttl']
+        if ttl is not None and localhost_info_cache['metadata'] is not None and now - localhost_info_cache['timestamp'] < ttl:
+            return localhost_info_cache['metadata']
+
+        try:
+            if localhost_info_cache['config_db'] is None:
+                config_db = ConfigDBConnector()
+                config_db.connect()
+                localhost_info_cache['config_db'] = config_db
+            metadata = localhost_info_cache['config_db'].get_entry('DEVICE_METADATA', 'localhost')
+        except Exception:
+            # Reconnect on the next query
+            localhost_info_cache['config_db'] = None
+            raise
+
+        if ttl is not None:
+            localhost_info_cache['metadata'] = metadata
+            localhost_info_cache['timestamp'] = now
+        return metadata
+
 
 def get_localhost_info(field, config_db=None):
     try:
         # TODO: enforce caller to provide config_db explicitly and remove its default value
         if not config_db:
-            config_db = ConfigDBConnector()
-            config_db.connect()
-
-        metadata = config_db.get_table('DEVICE_METADATA')
+            localhost = _get_localhost_metadata()
+        else:
+            localhost = config_db.get_table('DEVICE_METADATA').get('localhost', {})
 
-        if 'localhost' in metadata and field in metadata['localhost']:
-            return metadata['localhost'][field]
+        if field in localhost:
+            return localhost[field]
     except Exception:
         pass
 
@@ -84,15 +215,7 @@ def get_machine_info():
     if not os.path.isfile(MACHINE_CONF_PATH):
         return None
 
-    machine_vars = {}
-    with open(MACHINE_CONF_PATH) as machine_conf_file:
-        for line in machine_conf_file:
-            tokens = line.split('=')
-            if len(tokens) < 2:
-                continue
-            machine_vars[tokens[0]] = tokens[1].strip()
-
-    return machine_vars
+    return dict(_get_cached_file(MACHINE_CONF_PATH, _parse_conf_file))
 
 def get_platform(**kwargs):
     """
@@ -182,8 +305,14 @@ def get_asic_conf_file_path():
         if platform:
             yield os.path.join(HOST_DEVICE_PATH, platform, ASIC_CONF_FILENAME)
 
+    global asic_conf_file_path_cache
+
+    if asic_conf_file_path_cache and os.path.isfile(asic_conf_file_path_cache):
+        return asic_conf_file_path_cache
+
     for asic_conf_file_path in asic_conf_path_candidates():
         if os.path.isfile(asic_conf_file_path):
+            asic_conf_file_path_cache = asic_conf_file_path
             return asic_conf_file_path
 
     return None
@@ -453,15 +582,19 @@ def get_sonic_version_info():
     if not os.path.isfile(SONIC_VERSION_YAML_PATH):
         return None
 
-    global sonic_ver_info
-    if sonic_ver_info:
+    global sonic_ver_info, sonic_ver_stamp
+    stamp = _get_file_stamp(SONIC_VERSION_YAML_PATH)
+    if sonic_ver_info and stamp == sonic_ver_stamp:
         return sonic_ver_info
 
+    # yaml is only needed here, don't make every user of device_info import it
+    import yaml
     with open(SONIC_VERSION_YAML_PATH) as stream:
         if yaml.__version__ >= "5.1":
             sonic_ver_info = yaml.full_load(stream)
         else:
             sonic_ver_info = yaml.safe_load(stream)
+    sonic_ver_stamp = stamp
 
     return sonic_ver_info
 
@@ -540,18 +673,23 @@ def is_yang_config_validation_enabled(config_db):
 # Multi-NPU functionality
 #
 
-def get_num_npus():
-    asic_conf_file_path = get_asic_conf_file_path()
-    if asic_conf_file_path is None:
-        return 1
-    with open(asic_conf_file_path) as asic_conf_file:
+def _parse_asic_conf_file(path):
+    num_asics = None
+    with open(path) as asic_conf_file:
         for line in asic_conf_file:
             tokens = line.split('=')
             if len(tokens) < 2:
                continue
             if tokens[0].lower() == 'num_asic':
-                num_npus = tokens[1].strip()
-        return int(num_npus)
+                num_asics = tokens[1].strip()
+    return int(num_asics)
+
+
+def get_num_npus():
+    asic_conf_file_path = get_asic_conf_file_path()
+    if asic_conf_file_path is None:
+        return 1
+    return _get_cached_file(asic_conf_file_path, _parse_asic_conf_file)
 
 
 def is_multi_npu():
@@ -688,83 +826,136 @@ def run_command_pipe(cmd0, cmd1, cmd2):
     return (out, err)
 
 
+def _read_interface_mac(ifname, namespace=None):
+    """
+    Reads the MAC address of the interface from sysfs
+
+    Returns:
+        A tuple (mac, err), err is None on success
+    """
+    if namespace is not None:
+        # sysfs of the current process shows only its own network namespace
+        return run_command(['sudo', 'ip', 'netns', 'exec', str(namespace), 'cat', SYS_CLASS_NET_PATH + '/' + ifname + '/address'])
+
+    try:
+        with open(SYS_CLASS_NET_PATH + '/' + ifname + '/address') as address_file:
+            return (address_file.read(), None)
+    except (IOError, OSError) as e:
+        return ('', str(e))
+
+
+def _read_profile_mac(profile_file, key):
+    """
+    Reads the values of the lines of profile.ini containing the key,
+    equivalent to "cat <profile_file> | grep <key> | cut -f2 -d="
+
+    Returns:
+        A tuple (mac, err), err is None if at least one line matched
+    """
+    try:
+        with open(profile_file) as profile:
+            values = [line.rstrip('\n').split('=')[1] if '=' in line else line.rstrip('\n')
+                      for line in profile if key in line]
+    except (IOError, OSError) as e:
+        return ('', str(e))
+
+    if not values:
+        return ('', "'{}' not found in {}".format(key, profile_file))
+    return ('\n'.join(values) + '\n', None)
+
+
+def _get_syseeprom_mac():
+    """
+    Retrieves the base MAC address from the system EEPROM.
+
+    decode-syseeprom is run once per boot, its result is saved to the cache
+    file for the following calls. STATE_DB EEPROM_INFO is not used, syseepromd
+    fills it from the platform API which may report a different base MAC.
+
+    Returns:
+        A tuple (mac, err), err is None on success
+    """
+    try:
+        with open(SYSEEPROM_MAC_CACHE_PATH) as cache_file:
+            mac = cache_file.read().strip()
+            if _valid_mac_address(mac):
+                return (mac, None)
+    except (IOError, OSError):
+        pass
+
+    (mac, err) = run_command(["sudo", "decode-syseeprom", "-m"])
+
+    if not err and _valid_mac_address(mac.strip()):
+        try:
+            cache_dir = os.path.dirname(SYSEEPROM_MAC_CACHE_PATH)
+            if not os.path.isdir(cache_dir):
+                os.makedirs(cache_dir)
+            tmp_path = SYSEEPROM_MAC_CACHE_PATH + '.tmp'
+            with open(tmp_path, 'w') as cache_file:
+                cache_file.write(mac.strip() + '\n')
+            os.rename(tmp_path, SYSEEPROM_MAC_CACHE_PATH)
+        except (IOError, OSError):
+            pass
+
+    return (mac, err)
+
+
 def get_system_mac(namespace=None):
-    hw_mac_entry_outputs = []
-    syseeprom_cmd = ["sudo", "decode-syseeprom", "-m"]
-    iplink_cmd0 = ["ip", 'link', 'show', 'eth0']
-    iplink_cmd1 = ['grep', 'ether']
-    iplink_cmd2 = ['awk', '{print $2}']
+    """
+    Retrieves the system MAC address, the source depends on the ASIC type.
+
+    Args:
+        namespace: a string, namespace of the ASIC on multi-ASIC devices
+
+    Returns:
+        A string containing the MAC address on success, None on failure
+    """
     version_info = get_sonic_version_info()
 
-    if (version_info['asic_type'] == 'mellanox'):
-        # With Mellanox ONIE release(2019.05-5.2.0012) and above
-        # "onie_base_mac" was added to /host/machine.conf:
-        # onie_base_mac=e4:1d:2d:44:5e:80
-        # So we have another way to get the mac address besides decode syseeprom
-        # By this can mitigate the dependency on the hw-management service
-        base_mac_key = "onie_base_mac"
-        machine_vars = get_machine_info()
-        if machine_vars is not None and base_mac_key in machine_vars:
-            mac = machine_vars[base_mac_key]
-            mac = mac.strip()
-            if _valid_mac_address(mac):
-                return mac
-
-        (mac, err) = run_command(syseeprom_cmd)
-        hw_mac_entry_outputs.append((mac, err))
-    elif (version_info['asic_type'] == 'marvell'):
-        # Try valid mac in eeprom, else fetch it from eth0
-        platform = get_platform()
-        machine_key = "onie_machine"
-        machine_vars = get_machine_info()
-        (mac, err) = run_command(syseeprom_cmd)
-        hw_mac_entry_outputs.append((mac, err))
-        if machine_vars is not None and machine_key in machine_vars:
-            hwsku = machine_vars[machine_key]
-            profile_file = HOST_DEVICE_PATH + '/' + platform + '/' + hwsku + '/profile.ini'
-            if os.path.exists(profile_file):
-                profile_cmd0 = ['cat', profile_file]
-                profile_cmd1 = ['grep', 'switchMacAddress']
-                profile_cmd2 = ['cut', '-f2', '-d', '=']
-                (mac, err) = run_command_pipe(profile_cmd0, profile_cmd1, profile_cmd2)
-                hw_mac_entry_outputs.append((mac, err))
-        else:
-            profile_cmd = ["false"]
-            (mac, err) = run_command(profile_cmd)
-            hw_mac_entry_outputs.append((mac, err))
-        (mac, err) = run_command_pipe(iplink_cmd0, iplink_cmd1, iplink_cmd2)
-        hw_mac_entry_outputs.append((mac, err))
-    elif (version_info['asic_type'] == 'cisco-8000'):
-        # Try to get valid MAC from profile.ini first, else fetch it from syseeprom or eth0
-        platform = get_platform()
-        if namespace is not None:
-            profile_cmd0 = ['cat', HOST_DEVICE_PATH + '/' + platform + '/profile.ini']
-            profile_cmd1 = ['grep', str(namespace)+'switchMacAddress']
-            profile_cmd2 = ['cut', '-f2', '-d', '=']
-            (mac, err) = run_command_pipe(profile_cmd0, profile_cmd1, profile_cmd2)
+    def hw_mac_entry_outputs():
+        if (version_info['asic_type'] == 'mellanox'):
+            # With Mellanox ONIE release(2019.05-5.2.0012) and above
+            # "onie_base_mac" was added to /host/machine.conf:
+            # onie_base_mac=e4:1d:2d:44:5e:80
+            # So we have another way to get the mac address besides decode syseeprom
+            # By this can mitigate the dependency on the hw-management service
+            base_mac_key = "onie_base_mac"
+            machine_vars = get_machine_info()
+            if machine_vars is not None and base_mac_key in machine_vars:
+                yield (machine_vars[base_mac_key], None)
+
+            yield _get_syseeprom_mac()
+        elif (version_info['asic_type'] == 'marvell'):
+            # Try valid mac in eeprom, else fetch it from eth0
+            platform = get_platform()
+            machine_key = "onie_machine"
+            machine_vars = get_machine_info()
+            yield _get_syseeprom_mac()
+            if machine_vars is not None and machine_key in machine_vars:
+                hwsku = machine_vars[machine_key]
+                profile_file = HOST_DEVICE_PATH + '/' + platform + '/' + hwsku + '/profile.ini'
+                if os.path.exists(profile_file):
+                    yield _read_profile_mac(profile_file, 'switchMacAddress')
+            yield _read_interface_mac('eth0')
+        elif (version_info['asic_type'] == 'cisco-8000'):
+            # Try to get valid MAC from profile.ini first, else fetch it from syseeprom or eth0
+            platform = get_platform()
+            if namespace is not None:
+                yield _read_profile_mac(HOST_DEVICE_PATH + '/' + platform + '/profile.ini', str(namespace) + 'switchMacAddress')
+            yield _get_syseeprom_mac()
+            yield _read_interface_mac('eth0')
         else:
-            profile_cmd = ["false"]
-            (mac, err) = run_command(profile_cmd)
-        hw_mac_entry_outputs.append((mac, err))
-        (mac, err) = run_command(syseeprom_cmd)
-        hw_mac_entry_outputs.append((mac, err))
-        (mac, err) = run_command_pipe(iplink_cmd0, iplink_cmd1, iplink_cmd2)
-        hw_mac_entry_outputs.append((mac, err))
-    else:
-        mac_address_cmd = ["cat", "/sys/class/net/eth0/address"]
-        if namespace is not None:
-            mac_address_cmd = ['sudo', 'ip', 'netns', 'exec', str(namespace)] + mac_address_cmd
-        (mac, err) = run_command(mac_address_cmd)
-        hw_mac_entry_outputs.append((mac, err))
+            yield _read_interface_mac('eth0', namespace)
 
-    for (mac, err) in hw_mac_entry_outputs:
+    mac = None
+    for (mac, err) in hw_mac_entry_outputs():
         if err:
             continue
         mac = mac.strip()
         if _valid_mac_address(mac):
             break
 
-    if not _valid_mac_address(mac):
+    if mac is None or not _valid_mac_address(mac):
         return None
 
     # Align last byte of MAC if necessary
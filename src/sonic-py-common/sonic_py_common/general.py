@@ -1,3 +1,4 @@
+import os
 import sys
 from subprocess import Popen, STDOUT, PIPE, CalledProcessError, check_output
 
@@ -91,3 +92,48 @@ def check_output_pipe(cmd0, *args):
 
     return output
 
+
+SONIC_CACHE_PATH = '/var/cache/sonic'
+SONIC_CACHE_PATH_ENV = 'SONIC_CACHE_PATH'
+SONIC_VERSION_YAML_PATH = '/etc/sonic/sonic_version.yml'
+
+
+def get_cache_dir(name, cache_path=None):
+    """
+    Retrieve a writable directory for on-disk caches of SONiC tools.
+    The base directory is taken from cache_path, else from the SONIC_CACHE_PATH environment
+    variable, else it is /var/cache/sonic on a SONiC device only. An empty base directory
+    disables the cache, so tests and build-time runs don't write to the build host.
+    Returns None if the cache is disabled or the directory can't be written
+    """
+    if cache_path is None:
+        cache_path = os.environ.get(SONIC_CACHE_PATH_ENV)
+    if cache_path is None and os.path.isfile(SONIC_VERSION_YAML_PATH):
+        cache_path = SONIC_CACHE_PATH
+    if not cache_path:
+        return None
+
+    cache_dir = os.path.join(cache_path, name)
+    try:
+        if not os.path.isdir(cache_dir):
+            os.makedirs(cache_dir)
+    except OSError:
+        return None
+    if not os.access(cache_dir, os.W_OK):
+        return None
+    return cache_dir
+
+
+def get_jinja2_bytecode_cache(name, cache_path=None):
+    """
+    Retrieve on-disk cache of compiled Jinja2 templates, stored per Jinja2 version.
+    Jinja2 discards cached bytecode once the template source changes, but not when the
+    environment options change, so every user with its own options passes its own name.
+    Returns None if the cache is disabled, see get_cache_dir()
+    """
+    import jinja2
+
+    cache_dir = get_cache_dir(os.path.join('jinja2', jinja2.__version__, name), cache_path)
+    if cache_dir is None:
+        return None
+    return jinja2.FileSystemBytecodeCache(cache_dir)
@@ -1,11 +1,14 @@
+import copy
 import glob
 import os
 import subprocess
+import threading
+import time
 
 from natsort import natsorted
 from swsscommon import swsscommon
 
-from .device_info import get_asic_conf_file_path
+from .device_info import get_asic_conf_file_path, get_num_npus
 from .device_info import is_supervisor, is_chassis
 
 ASIC_NAME_PREFIX = 'asic'
@@ -32,6 +35,21 @@ CHASSIS_FABRIC_ASIC_INFO_TABLE='CHASSIS_FABRIC_ASIC_TABLE'
 # to prevent duplicate connections from being opened
 config_db_handle = {}
 
+# config_db connection handles per thread and namespace, see get_config_db_for_ns()
+config_db_pool = threading.local()
+
+# Tables which could be served from the snapshot cache, see enable_table_cache()
+CACHED_TABLES = (
+    PORT_CFG_DB_TABLE,
+    PORT_CHANNEL_MEMBER_CFG_DB_TABLE,
+    BGP_NEIGH_CFG_DB_TABLE,
+    BGP_INTERNAL_NEIGH_CFG_DB_TABLE,
+    'BGP_VOQ_CHASSIS_NEIGHBOR',
+)
+DEFAULT_TABLE_CACHE_TTL = 10
+table_cache = None
+
+
 def connect_config_db_for_ns(namespace=DEFAULT_NAMESPACE):
     """
     The function connects to the config DB for a given namespace and
@@ -79,6 +97,169 @@ def connect_to_all_dbs_for_ns(namespace=DEFAULT_NAMESPACE):
         db.connect(db_id)
     return db
 
+
+class ConfigTableCache(object):
+    """
+    Snapshots of config_db tables per namespace. A snapshot is dropped when
+    a keyspace notification for the table is received or when it is older
+    than ttl seconds. When the notifications can't be read, e.g. the
+    subscription was disconnected by redis, all the snapshots of the
+    namespace are dropped and the namespace is subscribed again.
+    """
+    def __init__(self, ttl, tables):
+        self.ttl = ttl
+        self.tables = set(tables)
+        self.lock = threading.Lock()
+        self.snapshots = {}
+        self.watchers = {}
+
+    def get_table(self, namespace, table):
+        with self.lock:
+            self._drain_notifications(namespace)
+            snapshot = self.snapshots.get((namespace, table))
+            if snapshot is not None and time.time() - snapshot[0] < self.ttl:
+                return snapshot[1]
+            try:
+                config_db = get_config_db_for_ns(namespace)
+                # Subscribe before reading so that no change can slip in between
+                self._watch(namespace, config_db)
+                data = config_db.get_table(table)
+            except Exception:
+                # The connection is broken, e.g. redis was restarted
+                self._unwatch(namespace)
+                drop_config_db_for_ns(namespace)
+                config_db = get_config_db_for_ns(namespace)
+                self._watch(namespace, config_db)
+                data = config_db.get_table(table)
+            self.snapshots[(namespace, table)] = (time.time(), data)
+            return data
+
+    def invalidate(self, namespace=None, table=None):
+        with self.lock:
+            for key in list(self.snapshots.keys()):
+                if namespace in (None, key[0]) and table in (None, key[1]):
+                    del self.snapshots[key]
+
+    def _watch(self, namespace, config_db):
+        if namespace in self.watchers:
+            return
+        try:
+            pubsub = config_db.get_redis_client(config_db.db_name).pubsub()
+            pubsub.psubscribe("__keyspace@{}__:*".format(config_db.get_dbid(config_db.db_name)))
+        except Exception:
+            # The snapshots of the namespace expire by ttl only
+            pubsub = None
+        self.watchers[namespace] = pubsub
+
+    def _unwatch(self, namespace):
+        pubsub = self.watchers.pop(namespace, None)
+        for key in list(self.snapshots.keys()):
+            if key[0] == namespace:
+                del self.snapshots[key]
+        if pubsub is not None:
+            try:
+                pubsub.close()
+            except Exception:
+                pass
+
+    def _drain_notifications(self, namespace):
+        pubsub = self.watchers.get(namespace)
+        if pubsub is None:
+            return
+        while True:
+            try:
+                msg = pubsub.get_message()
+            except Exception:
+                # Changes could have been missed, read the tables again
+                self._unwatch(namespace)
+                break
+            if not msg:
+                break
+            if msg['type'] != 'pmessage':
+                continue
+            # __keyspace@4__:PORT|Ethernet0
+            table = msg['channel'].split(':', 1)[-1].split('|', 1)[0]
+            self.snapshots.pop((namespace, table), None)
+
+
+def enable_table_cache(ttl=DEFAULT_TABLE_CACHE_TTL, tables=CACHED_TABLES):
+    """
+    Serve the given config_db tables from snapshots for the helpers in this
+    module, so that loops over many ports or neighbors read every table once.
+    A snapshot is refreshed when the table is changed or after ttl seconds.
+    """
+    global table_cache
+    table_cache = ConfigTableCache(ttl, tables)
+
+
+def disable_table_cache():
+    """
+    Drop all the snapshots and read the tables from config_db on every call
+    """
+    global table_cache
+    table_cache = None
+
+
+def get_config_db_for_ns(namespace=DEFAULT_NAMESPACE):
+    """
+    The function returns a handle to the config DB for a given namespace.
+    The handle is connected on the first call and reused by the following
+    calls from the same thread.
+
+    Returns:
+      handle to the config_db for a namespace
+    """
+    handles = getattr(config_db_pool, 'handles', None)
+    if handles is None:
+        handles = config_db_pool.handles = {}
+    if namespace not in handles:
+        handles[namespace] = connect_config_db_for_ns(namespace)
+    return handles[namespace]
+
+
+def drop_config_db_for_ns(namespace=DEFAULT_NAMESPACE):
+    """
+    Forget the handle of the namespace returned by get_config_db_for_ns()
+    to the current thread, the next call connects again.
+    """
+    handles = getattr(config_db_pool, 'handles', None)
+    if handles is not None:
+        handles.pop(namespace, None)
+
+
+def read_config_db_for_ns(read, namespace=DEFAULT_NAMESPACE):
+    """
+    Call read(config_db) with the handle from get_config_db_for_ns(). If the
+    handle lost its connection, e.g. redis was restarted, it is replaced and
+    the read is retried once.
+    """
+    try:
+        return read(get_config_db_for_ns(namespace))
+    except Exception:
+        drop_config_db_for_ns(namespace)
+        return read(get_config_db_for_ns(namespace))
+
+
+def get_config_table_for_ns(table, namespace=DEFAULT_NAMESPACE):
+    """
+    Read a config_db table of a namespace, from the snapshot cache if it is
+    enabled for the table. The result must not be modified.
+    """
+    if table_cache is not None and table in table_cache.tables:
+        return table_cache.get_table(namespace, table)
+    return read_config_db_for_ns(lambda config_db: config_db.get_table(table), namespace)
+
+
+def get_config_entry_for_ns(table, key, namespace=DEFAULT_NAMESPACE):
+    """
+    Read a config_db entry of a namespace, from the snapshot cache if it is
+    enabled for the table.
+    """
+    if table_cache is not None and table in table_cache.tables:
+        return copy.deepcopy(table_cache.get_table(namespace, table).get(key, {}))
+    return read_config_db_for_ns(lambda config_db: config_db.get_entry(table, key), namespace)
+
+
 def get_num_asics():
     """
     Retrieves the num of asics present in the multi ASIC platform
@@ -86,19 +267,8 @@ def get_num_asics():
     Returns:
         Num of asics
     """
-    asic_conf_file_path = get_asic_conf_file_path()
-
-    if asic_conf_file_path is None:
-        return 1
-
-    with open(asic_conf_file_path) as asic_conf_file:
-        for line in asic_conf_file:
-            tokens = line.split('=')
-            if len(tokens) < 2:
-                continue
-            if tokens[0].lower() == 'num_asic':
-                num_asics = tokens[1].strip()
-        return int(num_asics)
+    # asic.conf is parsed once and reread only when the file changes
+    return get_num_npus()
 
 
 def is_multi_asic():
@@ -282,15 +452,15 @@ def get_port_table(namespace=None):
 
 def get_port_entry_for_asic(port, namespace):
 
-    config_db = connect_config_db_for_ns(namespace)
-    ports = config_db.get_entry(PORT_CFG_DB_TABLE, port)
+    ports = get_config_entry_for_ns(PORT_CFG_DB_TABLE, port, namespace)
     return ports
 
 
 def get_port_table_for_asic(namespace):
 
-    config_db = connect_config_db_for_ns(namespace)
-    ports = config_db.get_table(PORT_CFG_DB_TABLE)
+    ports = get_config_table_for_ns(PORT_CFG_DB_TABLE, namespace)
+    if table_cache is not None and PORT_CFG_DB_TABLE in table_cache.tables:
+        ports = copy.deepcopy(ports)
     return ports
 
 
@@ -300,7 +470,7 @@ def get_namespace_for_port(port_name):
     port_namespace = None
 
     for ns in ns_list:
-        ports = get_port_table_for_asic(ns)
+        ports = get_config_table_for_ns(PORT_CFG_DB_TABLE, ns)
         if port_name in ports:
             port_namespace = ns
             break
@@ -324,6 +494,31 @@ def get_port_role(port_name, namespace=None):
     return role
 
 
+def get_port_roles(port_names, namespace=None):
+    """
+    Bulk variant of get_port_role(). The port table of every namespace is
+    read only once.
+
+    Returns:
+        a dict of port name to its role
+    """
+    roles = {}
+    pending = set(port_names)
+    for ns in get_namespace_list(namespace):
+        if not pending:
+            break
+        ports_config = get_config_table_for_ns(PORT_CFG_DB_TABLE, ns)
+        for port in list(pending):
+            if port in ports_config:
+                roles[port] = ports_config[port].get(PORT_ROLE, EXTERNAL_PORT)
+                pending.remove(port)
+
+    if pending:
+        raise ValueError('Unknown port name {}'.format(', '.join(sorted(pending))))
+
+    return roles
+
+
 def is_port_internal(port_name, namespace=None):
 
     role = get_port_role(port_name, namespace)
@@ -353,8 +548,7 @@ def is_port_channel_internal(port_channel, namespace=None):
     ns_list = get_namespace_list(namespace)
 
     for ns in ns_list:
-        config_db = connect_config_db_for_ns(ns)
-        port_channel_members = config_db.get_keys(PORT_CHANNEL_MEMBER_CFG_DB_TABLE)
+        port_channel_members = get_config_table_for_ns(PORT_CHANNEL_MEMBER_CFG_DB_TABLE, ns)
 
         for port_channel_member in port_channel_members:
             if port_channel_member[0] != port_channel:
@@ -370,16 +564,16 @@ def get_back_end_interface_set(namespace=None):
     if not is_multi_asic():
         return None
 
-    port_table = get_port_table(namespace)
-    for port, info in port_table.items():
-        if PORT_ROLE in info and info[PORT_ROLE] == INTERNAL_PORT:
-            bk_end_intf_list.append(port)
+    ns_list = get_namespace_list(namespace)
+    for ns in ns_list:
+        port_table = get_config_table_for_ns(PORT_CFG_DB_TABLE, ns)
+        for port, info in port_table.items():
+            if PORT_ROLE in info and info[PORT_ROLE] == INTERNAL_PORT:
+                bk_end_intf_list.append(port)
 
     if len(bk_end_intf_list):
-        ns_list = get_namespace_list(namespace)
         for ns in ns_list:
-            config_db = connect_config_db_for_ns(ns)
-            port_channel_members = config_db.get_keys(PORT_CHANNEL_MEMBER_CFG_DB_TABLE)
+            port_channel_members = get_config_table_for_ns(PORT_CHANNEL_MEMBER_CFG_DB_TABLE, ns)
             # a back-end LAG must be configured with all of its member from back-end interfaces.
             # mixing back-end and front-end interfaces is miss configuration and not allowed.
             # To determine if a LAG is back-end LAG, just need to check its first member is back-end or not
@@ -400,15 +594,14 @@ def is_bgp_session_internal(bgp_neigh_ip, namespace=None):
 
     for ns in ns_list:
 
-        config_db = connect_config_db_for_ns(ns)
-        bgp_sessions = config_db.get_entry(
-            BGP_INTERNAL_NEIGH_CFG_DB_TABLE, bgp_neigh_ip
+        bgp_sessions = get_config_entry_for_ns(
+            BGP_INTERNAL_NEIGH_CFG_DB_TABLE, bgp_neigh_ip, ns
         )
         if bgp_sessions:
             return True
 
-        bgp_sessions = config_db.get_entry(
-            'BGP_VOQ_CHASSIS_NEIGHBOR', bgp_neigh_ip
+        bgp_sessions = get_config_entry_for_ns(
+            'BGP_VOQ_CHASSIS_NEIGHBOR', bgp_neigh_ip, ns
         )
         if bgp_sessions:
             return True
@@ -2,7 +2,9 @@
 Bridge/Port mapping utility library.
 """
 from swsscommon import swsscommon
+import os
 import re
+import redis
 
 
 SONIC_ETHERNET_RE_PATTERN = "^Ethernet(\d+)$"
@@ -93,76 +95,196 @@ def get_interface_oid_map(db, blocking=True):
 
     return if_name_map, if_id_map
 
+# Number of keys requested by one SCAN and number of HGET commands sent in one pipeline
+SCAN_COUNT = 1000
+
+BRIDGE_PORT_OBJECT_TYPE = "SAI_OBJECT_TYPE_BRIDGE_PORT"
+BRIDGE_PORT_PORT_ID_ATTR = "SAI_BRIDGE_PORT_ATTR_PORT_ID"
+ROUTER_INTERFACE_OBJECT_TYPE = "SAI_OBJECT_TYPE_ROUTER_INTERFACE"
+ROUTER_INTERFACE_PORT_ID_ATTR = "SAI_ROUTER_INTERFACE_ATTR_PORT_ID"
+
+
+def scan_keys(client, pattern):
+    """
+        Get the keys matching the pattern with SCAN, so redis is not blocked by a KEYS over the whole db
+    """
+    return list(client.scan_iter(match=pattern, count=SCAN_COUNT))
+
+
+def hget_keys(client, keys, field):
+    """
+        Get one field of every key with pipelined HGET commands
+    """
+    values = []
+    for i in range(0, len(keys), SCAN_COUNT):
+        pipe = client.pipeline(transaction=False)
+        for key in keys[i:i + SCAN_COUNT]:
+            pipe.hget(key, field)
+        values.extend(pipe.execute())
+    return values
+
+
+def get_bulk_client(db, db_name):
+    """
+        Get a client of the database which supports SCAN and pipelines returning the replies.
+        The swsscommon DBConnector has no such pipeline, a redis-py client of the same database is created for it
+    """
+    client = db.get_redis_client(db_name)
+    if hasattr(client, 'pipeline'):
+        return client
+    namespace = db.namespace or ''
+    socket_path = swsscommon.SonicDBConfig.getDbSock(db_name, namespace)
+    if socket_path and os.path.exists(socket_path):
+        return redis.Redis(unix_socket_path=socket_path, db=db.get_dbid(db_name), decode_responses=True)
+    return redis.Redis(host=swsscommon.SonicDBConfig.getDbHostname(db_name, namespace),
+                       port=swsscommon.SonicDBConfig.getDbPort(db_name, namespace),
+                       db=db.get_dbid(db_name), decode_responses=True)
+
+
+def strip_bridge_port_id(port_id):
+    return port_id[len("oid:0x"):]
+
+
+def strip_rif_port_id(port_id):
+    return port_id.lstrip(b"oid:0x" if isinstance(port_id, bytes) else "oid:0x")
+
+
+def get_entry_attr(db, entry, attr):
+    """
+        Get an attribute from the result of db.get_all()
+    """
+    # TODO: remove the first branch after all SonicV2Connector are migrated to decode_responses
+    if isinstance(db, swsscommon.SonicV2Connector) == False and db.dbintf.redis_kwargs.get('decode_responses', False) == False:
+        return entry.get(attr.encode())
+    return entry.get(attr)
+
+
+def get_asic_oid_attr_map_blocking(db, object_type, attr, value_func, keys=None):
+    """
+        Get the map of object oid to one attribute with a blocking read of every object,
+        which waits for the object and recovers from a lost connection
+    """
+    prefix_len = len("ASIC_STATE:{}:oid:0x".format(object_type))
+    if keys is None:
+        keys = db.keys('ASIC_DB', "ASIC_STATE:{}:*".format(object_type)) or []
+    oid_map = {}
+    for key in keys:
+        value = get_entry_attr(db, db.get_all('ASIC_DB', key, blocking=True), attr)
+        if value is not None:
+            oid_map[key[prefix_len:]] = value_func(value)
+    return oid_map
+
+
+def get_asic_oid_attr_map(db, object_type, attr, value_func):
+    """
+        Get the map of object oid to one attribute for all objects of the type in ASIC DB.
+        The keys are read with SCAN and the attribute with pipelined HGET commands, so redis is
+        never blocked by a single command over all the objects.
+    """
+    prefix_len = len("ASIC_STATE:{}:oid:0x".format(object_type))
+    try:
+        client = get_bulk_client(db, 'ASIC_DB')
+        keys = scan_keys(client, "ASIC_STATE:{}:*".format(object_type))
+        values = hget_keys(client, keys, attr)
+    except redis.RedisError:
+        # e.g. the connection was lost
+        return get_asic_oid_attr_map_blocking(db, object_type, attr, value_func)
+
+    oid_map = {}
+    missing = []
+    for key, value in zip(keys, values):
+        if value is not None:
+            oid_map[key[prefix_len:]] = value_func(value)
+        else:
+            missing.append(key)
+    # The object doesn't have the attribute or is being changed, read it like a single object
+    oid_map.update(get_asic_oid_attr_map_blocking(db, object_type, attr, value_func, missing))
+    return oid_map
+
+
+class IncrementalOidAttrMap(object):
+    """
+        Map of object oid to one attribute for all objects of the type in ASIC DB.
+        The map is read once and then updated from the ASIC DB keyspace notifications,
+        so a refresh costs one HGET per changed object only.
+    """
+    def __init__(self, db, object_type, attr, value_func):
+        db.connect('ASIC_DB')
+        self.client = db.get_redis_client('ASIC_DB')
+        self.bulk_client = get_bulk_client(db, 'ASIC_DB')
+        self.object_type = object_type
+        self.attr = attr
+        self.value_func = value_func
+        self.prefix_len = len("ASIC_STATE:{}:oid:0x".format(object_type))
+        keyspace = "__keyspace@{}__:".format(db.get_dbid('ASIC_DB'))
+        self.keyspace_len = len(keyspace)
+        # Subscribe before reading so that no change can slip in between
+        self.pubsub = self.client.pubsub()
+        self.pubsub.psubscribe("{}ASIC_STATE:{}:*".format(keyspace, object_type))
+        self.oid_map = get_asic_oid_attr_map(db, object_type, attr, value_func)
+
+    def get(self):
+        """
+            Apply the pending notifications and return the map
+        """
+        events = {}
+        while True:
+            msg = self.pubsub.get_message()
+            if not msg:
+                break
+            if msg['type'] not in ('pmessage', b'pmessage'):
+                continue
+            event = msg['data']
+            events[msg['channel'][self.keyspace_len:]] = event.decode() if isinstance(event, bytes) else event
+
+        updated = []
+        for key, event in events.items():
+            if event == 'del':
+                self.oid_map.pop(key[self.prefix_len:], None)
+            else:
+                updated.append(key)
+        for key, value in zip(updated, hget_keys(self.bulk_client, updated, self.attr)):
+            if value is None:
+                self.oid_map.pop(key[self.prefix_len:], None)
+            else:
+                self.oid_map[key[self.prefix_len:]] = self.value_func(value)
+        return dict(self.oid_map)
+
+
 def get_bridge_port_map(db):
     """
         Get the Bridge port mapping from ASIC DB
     """
     db.connect('ASIC_DB')
-    br_port_str = db.keys('ASIC_DB', "ASIC_STATE:SAI_OBJECT_TYPE_BRIDGE_PORT:*")
-    if not br_port_str:
-        return {}
+    # Example key: ASIC_STATE:SAI_OBJECT_TYPE_BRIDGE_PORT:oid:0x3a000000000616
+    return get_asic_oid_attr_map(db, BRIDGE_PORT_OBJECT_TYPE, BRIDGE_PORT_PORT_ID_ATTR, strip_bridge_port_id)
 
-    if_br_oid_map = {}
-    offset = len("ASIC_STATE:SAI_OBJECT_TYPE_BRIDGE_PORT:")
-    oid_pfx = len("oid:0x")
-    for br_s in br_port_str:
-        # Example output: ASIC_STATE:SAI_OBJECT_TYPE_BRIDGE_PORT:oid:0x3a000000000616
-        br_port_id = br_s[(offset + oid_pfx):]
-        ent = db.get_all('ASIC_DB', br_s, blocking=True)
-        # TODO: remove the first branch after all SonicV2Connector are migrated to decode_responses
-        if isinstance(db, swsscommon.SonicV2Connector) == False and db.dbintf.redis_kwargs.get('decode_responses', False) == False:
-            if b"SAI_BRIDGE_PORT_ATTR_PORT_ID" in ent:
-                port_id = ent[b"SAI_BRIDGE_PORT_ATTR_PORT_ID"][oid_pfx:]
-                if_br_oid_map[br_port_id] = port_id
-        else:
-            if "SAI_BRIDGE_PORT_ATTR_PORT_ID" in ent:
-                port_id = ent["SAI_BRIDGE_PORT_ATTR_PORT_ID"][oid_pfx:]
-                if_br_oid_map[br_port_id] = port_id
-
-    return if_br_oid_map
+def get_bridge_port_map_updater(db):
+    """
+        Get the Bridge port mapping from ASIC DB which is kept up to date by calling its get()
+    """
+    return IncrementalOidAttrMap(db, BRIDGE_PORT_OBJECT_TYPE, BRIDGE_PORT_PORT_ID_ATTR, strip_bridge_port_id)
 
 def get_vlan_id_from_bvid(db, bvid):
     """
         Get the Vlan Id from Bridge Vlan Object
     """
     db.connect('ASIC_DB')
-    vlan_obj = db.keys('ASIC_DB', str("ASIC_STATE:SAI_OBJECT_TYPE_VLAN:" + bvid))
-    vlan_entry = db.get_all('ASIC_DB', vlan_obj[0], blocking=True)
-    vlan_id = None
-    # TODO: remove the first branch after all SonicV2Connector are migrated to decode_responses
-    if isinstance(db, swsscommon.SonicV2Connector) == False and db.dbintf.redis_kwargs.get('decode_responses', False) == False:
-        if b"SAI_VLAN_ATTR_VLAN_ID" in vlan_entry:
-            vlan_id = vlan_entry[b"SAI_VLAN_ATTR_VLAN_ID"]
-    else:
-        if "SAI_VLAN_ATTR_VLAN_ID" in vlan_entry:
-            vlan_id = vlan_entry["SAI_VLAN_ATTR_VLAN_ID"]
-
-    return vlan_id
+    vlan_entry = db.get_all('ASIC_DB', "ASIC_STATE:SAI_OBJECT_TYPE_VLAN:" + bvid, blocking=True)
+    return get_entry_attr(db, vlan_entry, "SAI_VLAN_ATTR_VLAN_ID")
 
 def get_rif_port_map(db):
     """
         Get the RIF port mapping from ASIC DB
     """
     db.connect('ASIC_DB')
-    rif_keys_str = db.keys('ASIC_DB', "ASIC_STATE:SAI_OBJECT_TYPE_ROUTER_INTERFACE:*")
-    if not rif_keys_str:
-        return {}
+    return get_asic_oid_attr_map(db, ROUTER_INTERFACE_OBJECT_TYPE, ROUTER_INTERFACE_PORT_ID_ATTR, strip_rif_port_id)
 
-    rif_port_oid_map = {}
-    for rif_s in rif_keys_str:
-        rif_id = rif_s[len("ASIC_STATE:SAI_OBJECT_TYPE_ROUTER_INTERFACE:oid:0x"):]
-        ent = db.get_all('ASIC_DB', rif_s, blocking=True)
-        # TODO: remove the first branch after all SonicV2Connector are migrated to decode_responses
-        if isinstance(db, swsscommon.SonicV2Connector) == False and db.dbintf.redis_kwargs.get('decode_responses', False) == False:
-            if b"SAI_ROUTER_INTERFACE_ATTR_PORT_ID" in ent:
-                port_id = ent[b"SAI_ROUTER_INTERFACE_ATTR_PORT_ID"].lstrip(b"oid:0x")
-                rif_port_oid_map[rif_id] = port_id
-        else:
-            if "SAI_ROUTER_INTERFACE_ATTR_PORT_ID" in ent:
-                port_id = ent["SAI_ROUTER_INTERFACE_ATTR_PORT_ID"].lstrip("oid:0x")
-                rif_port_oid_map[rif_id] = port_id
-
-    return rif_port_oid_map
+def get_rif_port_map_updater(db):
+    """
+        Get the RIF port mapping from ASIC DB which is kept up to date by calling its get()
+    """
+    return IncrementalOidAttrMap(db, ROUTER_INTERFACE_OBJECT_TYPE, ROUTER_INTERFACE_PORT_ID_ATTR, strip_rif_port_id)
 
 def get_vlan_interface_oid_map(db, blocking=True):
     """
@@ -162,6 +162,150 @@ class TestDeviceInfo(object):
         assert mock_hwsku.called_once()
         mock_cfg_inst.get_table.assert_called_once_with("DEVICE_METADATA")
 
+    def test_get_machine_info_cached(self, tmp_path):
+        machine_conf = tmp_path / "machine.conf"
+        machine_conf.write_text(MACHINE_CONF_CONTENTS)
+        device_info.refresh()
+        with mock.patch("sonic_py_common.device_info.MACHINE_CONF_PATH", str(machine_conf)), \
+                mock.patch("sonic_py_common.device_info._parse_conf_file", wraps=device_info._parse_conf_file) as parse_mocked:
+            for _ in range(0, 5):
+                assert device_info.get_machine_info() == EXPECTED_GET_MACHINE_INFO_RESULT
+            assert parse_mocked.call_count == 1
+
+            # A modified file is read again
+            machine_conf.write_text(MACHINE_CONF_CONTENTS.replace("x86_64-mlnx_msn2700-r0", "x86_64-mlnx_msn2700-r1"))
+            os.utime(str(machine_conf), ns=(0, 0))
+            assert device_info.get_platform(config_db=None) == "x86_64-mlnx_msn2700-r1"
+            assert parse_mocked.call_count == 2
+
+            device_info.refresh()
+            device_info.get_machine_info()
+            assert parse_mocked.call_count == 3
+        device_info.refresh()
+
+    def test_get_num_npus_cached(self, tmp_path):
+        asic_conf = tmp_path / "asic.conf"
+        asic_conf.write_text("NUM_ASIC=3\nDEV_ID_ASIC_0=03:00.0\n")
+        device_info.refresh()
+        with mock.patch("sonic_py_common.device_info.get_asic_conf_file_path", return_value=str(asic_conf)), \
+                mock.patch("{}.open".format(BUILTINS), wraps=open) as open_mocked:
+            for _ in range(0, 5):
+                assert device_info.get_num_npus() == 3
+            assert open_mocked.call_count == 1
+
+            asic_conf.write_text("NUM_ASIC=6\n")
+            os.utime(str(asic_conf), ns=(0, 0))
+            assert device_info.get_num_npus() == 6
+            assert open_mocked.call_count == 2
+        device_info.refresh()
+
+    @mock.patch("sonic_py_common.device_info.ConfigDBConnector")
+    def test_get_localhost_info_not_cached(self, mock_cfg_db):
+        mock_cfg_inst = mock_cfg_db.return_value
+        mock_cfg_inst.get_entry.return_value = {"hwsku": "Mellanox-SN2700", "hostname": "switch"}
+        with mock.patch("sonic_py_common.device_info.localhost_info_cache",
+                        {'config_db': None, 'metadata': None, 'timestamp': 0, 'ttl': None}):
+            assert device_info.get_hostname() == "switch"
+            # A CLI flow which changed the hostname reads the new one right away
+            mock_cfg_inst.get_entry.return_value = {"hwsku": "Mellanox-SN2700", "hostname": "switch2"}
+            assert device_info.get_hostname() == "switch2"
+            # The connection is shared, one request at a time
+            mock_cfg_db.assert_called_once_with()
+            assert mock_cfg_inst.get_entry.call_count == 2
+            mock_cfg_inst.get_entry.side_effect = lambda table, key: {"hostname": "locked"} \
+                if device_info.localhost_info_lock.locked() else {}
+            assert device_info.get_hostname() == "locked"
+            assert not device_info.localhost_info_lock.locked()
+
+    @mock.patch("sonic_py_common.device_info.ConfigDBConnector")
+    def test_get_localhost_info_cached(self, mock_cfg_db):
+        mock_cfg_inst = mock_cfg_db.return_value
+        mock_cfg_inst.get_entry.return_value = {"hwsku": "Mellanox-SN2700", "hostname": "switch"}
+        device_info.refresh()
+        with mock.patch("sonic_py_common.device_info.localhost_info_cache",
+                        {'config_db': None, 'metadata': None, 'timestamp': 0, 'ttl': None}):
+            device_info.enable_localhost_info_cache()
+            for _ in range(0, 5):
+                assert device_info.get_hwsku() == "Mellanox-SN2700"
+                assert device_info.get_hostname() == "switch"
+            # A single connection is made and the entry is read once until the TTL expires
+            mock_cfg_db.assert_called_once_with()
+            mock_cfg_inst.get_entry.assert_called_once_with("DEVICE_METADATA", "localhost")
+
+            mock_cfg_inst.get_entry.return_value = {"hwsku": "Mellanox-SN2700", "hostname": "switch2"}
+            device_info.refresh()
+            assert device_info.get_hostname() == "switch2"
+            assert mock_cfg_inst.get_entry.call_count == 2
+            mock_cfg_db.assert_called_once_with()
+
+            # An explicitly given connection is always used
+            config_db = mock.MagicMock()
+            config_db.get_table.return_value = {"localhost": {"hostname": "switch3"}}
+            assert device_info.get_localhost_info("hostname", config_db) == "switch3"
+
+            device_info.disable_localhost_info_cache()
+            device_info.get_hostname()
+            device_info.get_hostname()
+            assert mock_cfg_inst.get_entry.call_count == 4
+
+    @pytest.fixture
+    def system_mac_env(self, tmp_path):
+        sys_class_net = tmp_path / "net"
+        (sys_class_net / "eth0").mkdir(parents=True)
+        (sys_class_net / "eth0" / "address").write_text("52:54:00:12:34:56\n")
+        device_dir = tmp_path / "device"
+        (device_dir / "x86_64-test-r0" / "test_hwsku").mkdir(parents=True)
+        with mock.patch("sonic_py_common.device_info.SYS_CLASS_NET_PATH", str(sys_class_net)), \
+                mock.patch("sonic_py_common.device_info.HOST_DEVICE_PATH", str(device_dir)), \
+                mock.patch("sonic_py_common.device_info.SYSEEPROM_MAC_CACHE_PATH", str(tmp_path / "run" / "syseeprom_base_mac")), \
+                mock.patch("sonic_py_common.device_info.get_platform", return_value="x86_64-test-r0"), \
+                mock.patch("sonic_py_common.device_info.get_machine_info", return_value={"onie_machine": "test_hwsku"}), \
+                mock.patch("sonic_py_common.device_info.get_sonic_version_info") as mock_sonic_ver, \
+                mock.patch("sonic_py_common.device_info.run_command") as mock_run_command:
+            mock_run_command.return_value = ("00:11:22:33:44:55\n", "")
+            yield {
+                'device_dir': device_dir / "x86_64-test-r0",
+                'sonic_ver': mock_sonic_ver,
+                'run_command': mock_run_command,
+            }
+
+    def test_get_system_mac_eth0(self, system_mac_env):
+        system_mac_env['sonic_ver'].return_value = {'asic_type': 'broadcom'}
+        assert device_info.get_system_mac() == "52:54:00:12:34:56"
+        assert not system_mac_env['run_command'].called
+
+        system_mac_env['sonic_ver'].return_value = {'asic_type': 'centec'}
+        assert device_info.get_system_mac() == "52:54:00:12:34:57"
+
+    def test_get_system_mac_syseeprom_cached(self, system_mac_env):
+        system_mac_env['sonic_ver'].return_value = {'asic_type': 'mellanox'}
+        # decode-syseeprom is run once, then its result is cached
+        for _ in range(0, 5):
+            assert device_info.get_system_mac() == "00:11:22:33:44:55"
+        system_mac_env['run_command'].assert_called_once_with(["sudo", "decode-syseeprom", "-m"])
+
+    def test_get_system_mac_syseeprom_cache_file(self, system_mac_env, tmp_path):
+        system_mac_env['sonic_ver'].return_value = {'asic_type': 'mellanox'}
+        (tmp_path / "run").mkdir()
+        (tmp_path / "run" / "syseeprom_base_mac").write_text("00:aa:bb:cc:dd:ee\n")
+        assert device_info.get_system_mac() == "00:aa:bb:cc:dd:ee"
+        assert not system_mac_env['run_command'].called
+
+    def test_get_system_mac_profile(self, system_mac_env):
+        (system_mac_env['device_dir'] / "test_hwsku" / "profile.ini").write_text("switchMacAddress=00:de:ad:be:ef:01\n")
+        (system_mac_env['device_dir'] / "profile.ini").write_text(
+            "asic0switchMacAddress=00:de:ad:be:ef:02\nasic1switchMacAddress=00:de:ad:be:ef:03\n")
+        system_mac_env['run_command'].return_value = ("", "decode-syseeprom failed")
+
+        system_mac_env['sonic_ver'].return_value = {'asic_type': 'marvell'}
+        assert device_info.get_system_mac() == "00:de:ad:be:ef:01"
+
+        system_mac_env['sonic_ver'].return_value = {'asic_type': 'cisco-8000'}
+        assert device_info.get_system_mac(namespace="asic1") == "00:de:ad:be:ef:03"
+        # No namespace specific entry, fall back to eth0
+        assert device_info.get_system_mac(namespace="asic2") == "52:54:00:12:34:56"
+        assert device_info.get_system_mac() == "52:54:00:12:34:56"
+
     @classmethod
     def teardown_class(cls):
         print("TEARDOWN")
@@ -0,0 +1,184 @@
+import sys
+
+# TODO: Remove this if/else block once we no longer support Python 2
+if sys.version_info.major == 3:
+    from unittest import mock
+else:
+    # Expect the 'mock' package for python 2
+    # https://pypi.python.org/pypi/mock
+    import mock
+
+import pytest
+
+from sonic_py_common import multi_asic
+
+CONFIG_DB = {
+    'asic0': {
+        'PORT': {
+            'Ethernet0': {'admin_status': 'up'},
+            'Ethernet-BP0': {'role': 'Int'},
+        },
+        'PORTCHANNEL_MEMBER': {
+            ('PortChannel4001', 'Ethernet-BP0'): {},
+        },
+        'BGP_INTERNAL_NEIGHBOR': {
+            '10.1.0.1': {'name': 'ASIC1'},
+        },
+    },
+    'asic1': {
+        'PORT': {
+            'Ethernet4': {'role': 'Ext'},
+            'Ethernet-BP256': {'role': 'Int'},
+        },
+        'PORTCHANNEL_MEMBER': {
+            ('PortChannel4009', 'Ethernet-BP256'): {},
+        },
+    },
+}
+
+
+class MockConfigDBConnector(object):
+    instances = []
+
+    def __init__(self, namespace):
+        self.namespace = namespace
+        self.db_name = 'CONFIG_DB'
+        self.get_table_calls = 0
+        self.broken = False
+        self.pubsub = mock.MagicMock()
+        self.pubsub.get_message.return_value = None
+        MockConfigDBConnector.instances.append(self)
+
+    def connect(self):
+        pass
+
+    def get_table(self, table):
+        self.get_table_calls += 1
+        if self.broken:
+            raise RuntimeError('Unable to connect to redis')
+        return CONFIG_DB[self.namespace].get(table, {})
+
+    def get_entry(self, table, key):
+        if self.broken:
+            raise RuntimeError('Unable to connect to redis')
+        return CONFIG_DB[self.namespace].get(table, {}).get(key, {})
+
+    def get_redis_client(self, db_name):
+        return mock.MagicMock(pubsub=mock.MagicMock(return_value=self.pubsub))
+
+    def get_dbid(self, db_name):
+        return 4
+
+
+@pytest.fixture
+def multi_asic_db():
+    MockConfigDBConnector.instances = []
+    multi_asic.config_db_pool.handles = {}
+    with mock.patch('sonic_py_common.multi_asic.swsscommon.ConfigDBConnector', MockConfigDBConnector), \
+            mock.patch('sonic_py_common.multi_asic.is_multi_asic', return_value=True), \
+            mock.patch('sonic_py_common.multi_asic.get_namespaces_from_linux', return_value=['asic0', 'asic1']):
+        yield
+    multi_asic.disable_table_cache()
+    multi_asic.config_db_pool.handles = {}
+
+
+class TestMultiAsic(object):
+    def test_connector_pool(self, multi_asic_db):
+        for port in ['Ethernet0', 'Ethernet4', 'Ethernet-BP0', 'Ethernet-BP256'] * 10:
+            multi_asic.get_port_role(port)
+        # one connection per namespace instead of one per call
+        assert sorted(db.namespace for db in MockConfigDBConnector.instances) == ['asic0', 'asic1']
+
+    def test_get_port_roles(self, multi_asic_db):
+        roles = multi_asic.get_port_roles(['Ethernet0', 'Ethernet4', 'Ethernet-BP256'])
+        assert roles == {'Ethernet0': 'Ext', 'Ethernet4': 'Ext', 'Ethernet-BP256': 'Int'}
+        assert roles == dict((port, multi_asic.get_port_role(port)) for port in roles)
+        assert multi_asic.get_port_roles(['Ethernet0'], 'asic0') == {'Ethernet0': 'Ext'}
+        with pytest.raises(ValueError):
+            multi_asic.get_port_roles(['Ethernet0', 'Ethernet8'])
+        with pytest.raises(ValueError):
+            multi_asic.get_port_roles(['Ethernet4'], 'asic0')
+
+    def test_helpers(self, multi_asic_db):
+        assert multi_asic.is_port_internal('Ethernet-BP0')
+        assert not multi_asic.is_port_internal('Ethernet4')
+        assert multi_asic.is_port_channel_internal('PortChannel4009')
+        assert not multi_asic.is_port_channel_internal('PortChannel0001')
+        assert multi_asic.get_back_end_interface_set() == set(['Ethernet-BP0', 'Ethernet-BP256', 'PortChannel4001', 'PortChannel4009'])
+        assert multi_asic.get_back_end_interface_set('asic1') == set(['Ethernet-BP256', 'PortChannel4009'])
+        assert multi_asic.is_bgp_session_internal('10.1.0.1')
+        assert not multi_asic.is_bgp_session_internal('10.0.0.1')
+        assert multi_asic.get_namespace_for_port('Ethernet4') == 'asic1'
+
+    def test_table_cache(self, multi_asic_db):
+        multi_asic.enable_table_cache()
+        for _ in range(10):
+            assert multi_asic.get_port_roles(['Ethernet0', 'Ethernet4']) == {'Ethernet0': 'Ext', 'Ethernet4': 'Ext'}
+            assert multi_asic.is_port_channel_internal('PortChannel4009')
+        assert [db.get_table_calls for db in MockConfigDBConnector.instances] == [2, 2]
+
+        # the port table entries returned to the caller are copies
+        multi_asic.get_port_table()['Ethernet0']['role'] = 'Int'
+        assert multi_asic.get_port_role('Ethernet0') == 'Ext'
+
+    def test_table_cache_invalidate(self, multi_asic_db):
+        multi_asic.enable_table_cache()
+        multi_asic.get_port_roles(['Ethernet0'], 'asic0')
+        asic0 = MockConfigDBConnector.instances[0]
+        assert asic0.get_table_calls == 1
+        asic0.pubsub.psubscribe.assert_called_once_with('__keyspace@4__:*')
+
+        # a change of another table keeps the snapshot
+        asic0.pubsub.get_message.side_effect = [
+            {'type': 'pmessage', 'channel': '__keyspace@4__:VLAN|Vlan1000', 'data': 'hset'}, None]
+        multi_asic.get_port_roles(['Ethernet0'], 'asic0')
+        assert asic0.get_table_calls == 1
+
+        asic0.pubsub.get_message.side_effect = [
+            {'type': 'pmessage', 'channel': '__keyspace@4__:PORT|Ethernet0', 'data': 'hset'}, None]
+        multi_asic.get_port_roles(['Ethernet0'], 'asic0')
+        assert asic0.get_table_calls == 2
+
+    def test_table_cache_ttl(self, multi_asic_db):
+        multi_asic.enable_table_cache(ttl=5)
+        with mock.patch('sonic_py_common.multi_asic.time.time', return_value=100):
+            multi_asic.get_port_roles(['Ethernet0'], 'asic0')
+        with mock.patch('sonic_py_common.multi_asic.time.time', return_value=104):
+            multi_asic.get_port_roles(['Ethernet0'], 'asic0')
+        assert MockConfigDBConnector.instances[0].get_table_calls == 1
+        with mock.patch('sonic_py_common.multi_asic.time.time', return_value=105):
+            multi_asic.get_port_roles(['Ethernet0'], 'asic0')
+        assert MockConfigDBConnector.instances[0].get_table_calls == 2
+
+    def test_reconnect(self, multi_asic_db):
+        assert multi_asic.get_port_role('Ethernet0', 'asic0') == 'Ext'
+        # redis was restarted, the pooled connection is replaced
+        MockConfigDBConnector.instances[0].broken = True
+        assert multi_asic.get_port_role('Ethernet0', 'asic0') == 'Ext'
+        assert multi_asic.is_bgp_session_internal('10.1.0.1', 'asic0')
+        assert len(MockConfigDBConnector.instances) == 2
+        assert multi_asic.get_config_db_for_ns('asic0') is MockConfigDBConnector.instances[1]
+
+    def test_table_cache_reconnect(self, multi_asic_db):
+        multi_asic.enable_table_cache()
+        multi_asic.get_port_roles(['Ethernet0'], 'asic0')
+        asic0 = MockConfigDBConnector.instances[0]
+        asic0.broken = True
+        # the snapshot is still valid, the broken connection isn't used
+        assert multi_asic.get_port_roles(['Ethernet0'], 'asic0') == {'Ethernet0': 'Ext'}
+        assert multi_asic.is_port_channel_internal('PortChannel4001', 'asic0')
+        assert len(MockConfigDBConnector.instances) == 2
+        asic0.pubsub.close.assert_called_once_with()
+        MockConfigDBConnector.instances[1].pubsub.psubscribe.assert_called_once_with('__keyspace@4__:*')
+
+    def test_table_cache_disconnected_notifications(self, multi_asic_db):
+        multi_asic.enable_table_cache()
+        multi_asic.get_port_roles(['Ethernet0'], 'asic0')
+        asic0 = MockConfigDBConnector.instances[0]
+        # redis closes a subscriber whose output buffer is over its limit
+        asic0.pubsub.get_message.side_effect = ConnectionError('Connection closed by server.')
+        assert multi_asic.get_port_roles(['Ethernet0'], 'asic0') == {'Ethernet0': 'Ext'}
+        # the snapshot is read again, over a new subscription
+        assert asic0.get_table_calls == 2
+        asic0.pubsub.close.assert_called_once_with()
+        assert asic0.pubsub.psubscribe.call_count == 2
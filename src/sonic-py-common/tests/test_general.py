@@ -29,3 +29,32 @@ def test_check_output_pipe():
     with pytest.raises(subprocess.CalledProcessError) as e:
         check_output_pipe([sys.executable, "-c", "import sys; sys.exit(0)"], [sys.executable, "-c", "import sys; sys.exit(6)"])
         assert e.returncode == [0, 6]
+
+def test_get_cache_dir(tmp_path, monkeypatch):
+    from sonic_py_common import general
+    monkeypatch.delenv(general.SONIC_CACHE_PATH_ENV, raising=False)
+    monkeypatch.setattr(general, 'SONIC_VERSION_YAML_PATH', str(tmp_path / 'sonic_version.yml'))
+
+    # disabled off the device unless a path is given
+    assert general.get_cache_dir('test') is None
+    assert general.get_cache_dir('test', str(tmp_path)) == str(tmp_path / 'test')
+    assert (tmp_path / 'test').is_dir()
+    assert general.get_cache_dir('test', '') is None
+
+    monkeypatch.setenv(general.SONIC_CACHE_PATH_ENV, str(tmp_path / 'env'))
+    assert general.get_cache_dir('test') == str(tmp_path / 'env' / 'test')
+    monkeypatch.setenv(general.SONIC_CACHE_PATH_ENV, '')
+    assert general.get_cache_dir('test') is None
+
+    monkeypatch.delenv(general.SONIC_CACHE_PATH_ENV)
+    (tmp_path / 'sonic_version.yml').write_text('build_version: test')
+    monkeypatch.setattr(general, 'SONIC_CACHE_PATH', str(tmp_path / 'device'))
+    assert general.get_cache_dir('test') == str(tmp_path / 'device' / 'test')
+
+def test_get_jinja2_bytecode_cache(tmp_path):
+    jinja2 = pytest.importorskip('jinja2')
+    from sonic_py_common.general import get_jinja2_bytecode_cache
+    assert get_jinja2_bytecode_cache('test', '') is None
+    cache = get_jinja2_bytecode_cache('test', str(tmp_path))
+    assert isinstance(cache, jinja2.FileSystemBytecodeCache)
+    assert cache.directory == str(tmp_path / 'jinja2' / jinja2.__version__ / 'test')
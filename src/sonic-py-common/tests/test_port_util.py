@@ -1,6 +1,9 @@
+import fnmatch
 import os
 import sys
 
+import redis
+
 if sys.version_info.major == 3:
     from unittest import mock
 else:
@@ -17,3 +20,226 @@ class TestPortUtil:
 
         from swsssdk.port_util import get_vlan_interface_oid_map
         assert not get_vlan_interface_oid_map(db, True)
+
+
+class FakeRedis(object):
+    """ In memory redis client, keeps count of round trips """
+    def __init__(self, data):
+        self.data = data
+        self.round_trips = 0
+        self.messages = []
+
+    def scan_iter(self, match, count):
+        self.round_trips += (len(self.data) + count - 1) // count
+        return [key for key in self.data if fnmatch.fnmatch(key, match)]
+
+    def hget(self, key, field):
+        self.round_trips += 1
+        return self.data.get(key, {}).get(field)
+
+    def hgetall(self, key):
+        self.round_trips += 1
+        return dict(self.data.get(key, {}))
+
+    def pipeline(self, transaction=True):
+        client = self
+        class Pipeline(object):
+            def __init__(self):
+                self.commands = []
+            def hget(self, key, field):
+                self.commands.append((key, field))
+            def execute(self):
+                client.round_trips += 1
+                return [client.data.get(key, {}).get(field) for key, field in self.commands]
+        return Pipeline()
+
+    def pubsub(self):
+        self.pubsub_obj = mock.MagicMock()
+        self.pubsub_obj.get_message.side_effect = lambda: self.messages.pop(0) if self.messages else None
+        return self.pubsub_obj
+
+    def notify(self, key, event):
+        self.messages.append({'type': 'pmessage', 'channel': '__keyspace@1__:' + key, 'data': event})
+
+
+class FakeSwssClient(object):
+    """ swsscommon DBConnector, without pipeline support """
+    def __init__(self, data):
+        self.data = data
+        self.round_trips = 0
+
+    def hget(self, key, field):
+        self.round_trips += 1
+        return self.data.get(key, {}).get(field)
+
+    def pubsub(self):
+        return mock.MagicMock()
+
+
+class FakeSonicV2Connector(object):
+    """ swsscommon.SonicV2Connector """
+    namespace = ''
+
+    def connect(self, db_name):
+        pass
+
+    def get_redis_client(self, db_name):
+        pass
+
+    def get_dbid(self, db_name):
+        pass
+
+    def keys(self, db_name, pattern):
+        pass
+
+    def get_all(self, db_name, key, blocking=False):
+        pass
+
+
+def fake_swsscommon():
+    swsscommon = mock.MagicMock(SonicV2Connector=FakeSonicV2Connector)
+    swsscommon.SonicDBConfig.getDbSock.return_value = ''
+    return swsscommon
+
+
+def fake_redis_py(client):
+    """ redis-py client created for a swsscommon connector, works on the data of the connector """
+    redis_py = FakeRedis(client.data)
+    return mock.patch('sonic_py_common.port_util.redis.Redis', return_value=redis_py), redis_py
+
+
+def make_db(client, data=None):
+    db = mock.MagicMock(spec=FakeSonicV2Connector)
+    db.get_redis_client = mock.MagicMock(return_value=client)
+    db.get_dbid = mock.MagicMock(return_value=1)
+    data = data if data is not None else client.data
+    db.keys = mock.MagicMock(side_effect=lambda db_name, pattern: [key for key in data if fnmatch.fnmatch(key, pattern)])
+    db.get_all = mock.MagicMock(side_effect=lambda db_name, key, blocking=False: dict(data.get(key, {})))
+    return db
+
+
+def asic_db(n_objects):
+    data = {}
+    for i in range(n_objects):
+        data["ASIC_STATE:SAI_OBJECT_TYPE_BRIDGE_PORT:oid:0x3a%014x" % i] = {
+            "SAI_BRIDGE_PORT_ATTR_TYPE": "SAI_BRIDGE_PORT_TYPE_PORT",
+            "SAI_BRIDGE_PORT_ATTR_PORT_ID": "oid:0x1%015x" % i,
+            "SAI_BRIDGE_PORT_ATTR_ADMIN_STATE": "true",
+        }
+        data["ASIC_STATE:SAI_OBJECT_TYPE_ROUTER_INTERFACE:oid:0x6%015x" % i] = {
+            "SAI_ROUTER_INTERFACE_ATTR_TYPE": "SAI_ROUTER_INTERFACE_TYPE_PORT",
+            "SAI_ROUTER_INTERFACE_ATTR_PORT_ID": "oid:0x1%015x" % i,
+        }
+    data["ASIC_STATE:SAI_OBJECT_TYPE_BRIDGE_PORT:oid:0x3a100000000000"] = {
+        "SAI_BRIDGE_PORT_ATTR_TYPE": "SAI_BRIDGE_PORT_TYPE_1Q_ROUTER",
+    }
+    return data
+
+
+@mock.patch('sonic_py_common.port_util.swsscommon', fake_swsscommon())
+class TestPortUtilBulk:
+    def test_get_bridge_port_map(self):
+        from sonic_py_common.port_util import get_bridge_port_map
+        db = make_db(FakeRedis(asic_db(10)))
+        port_map = get_bridge_port_map(db)
+        assert len(port_map) == 10
+        assert port_map["3a00000000000000"] == "1000000000000000"
+        assert port_map["3a00000000000009"] == "1000000000000009"
+        # only the router bridge port without a port id is read again
+        db.get_all.assert_called_once_with("ASIC_DB", "ASIC_STATE:SAI_OBJECT_TYPE_BRIDGE_PORT:oid:0x3a100000000000", blocking=True)
+        # a swsscommon client has no pipeline, the same SCAN and HGET pipeline is sent with redis-py
+        swss_db = make_db(FakeSwssClient(asic_db(10)))
+        patch_redis, redis_py = fake_redis_py(swss_db.get_redis_client.return_value)
+        with patch_redis as redis_cls:
+            assert get_bridge_port_map(swss_db) == port_map
+        redis_cls.assert_called_once_with(host=mock.ANY, port=mock.ANY, db=1, decode_responses=True)
+        assert swss_db.get_redis_client.return_value.round_trips == 0
+        assert redis_py.round_trips == 2
+        swss_db.get_all.assert_called_once_with("ASIC_DB", "ASIC_STATE:SAI_OBJECT_TYPE_BRIDGE_PORT:oid:0x3a100000000000", blocking=True)
+
+    def test_get_rif_port_map(self):
+        from sonic_py_common.port_util import get_rif_port_map
+        expected = {
+            "6000000000000000": "1000000000000000",
+            "6000000000000001": "1000000000000001",
+            "6000000000000002": "1000000000000002",
+        }
+        assert get_rif_port_map(make_db(FakeRedis(asic_db(3)))) == expected
+        swss_db = make_db(FakeSwssClient(asic_db(3)))
+        patch_redis, _ = fake_redis_py(swss_db.get_redis_client.return_value)
+        with patch_redis:
+            assert get_rif_port_map(swss_db) == expected
+
+    def test_blocking_read(self):
+        from sonic_py_common.port_util import get_bridge_port_map
+        data = asic_db(3)
+        # the object is being created when it is read, the blocking read gets all of it
+        client = FakeRedis(dict(data))
+        client.data["ASIC_STATE:SAI_OBJECT_TYPE_BRIDGE_PORT:oid:0x3a00000000000001"] = {}
+        port_map = get_bridge_port_map(make_db(client, data))
+        assert port_map["3a00000000000001"] == "1000000000000001"
+
+        # the connection is lost, the objects are read one by one with the blocking read
+        client = FakeSwssClient(data)
+        db = make_db(client)
+        patch_redis, redis_py = fake_redis_py(client)
+        with patch_redis, mock.patch.object(redis_py, 'scan_iter', side_effect=redis.ConnectionError('Connection refused')):
+            assert get_bridge_port_map(db) == get_bridge_port_map(make_db(FakeRedis(data)))
+        assert db.get_all.call_count == 4
+        assert all(kwargs == {'blocking': True} for _, kwargs in db.get_all.call_args_list)
+
+    def test_get_vlan_id_from_bvid(self):
+        from sonic_py_common.port_util import get_vlan_id_from_bvid
+        db = mock.MagicMock(spec=FakeSonicV2Connector)
+        db.get_all = mock.MagicMock(return_value={"SAI_VLAN_ATTR_VLAN_ID": "1000"})
+        assert get_vlan_id_from_bvid(db, "oid:0x26000000000616") == "1000"
+        db.get_all.assert_called_once_with("ASIC_DB", "ASIC_STATE:SAI_OBJECT_TYPE_VLAN:oid:0x26000000000616", blocking=True)
+
+    def test_bridge_port_map_updater(self):
+        from sonic_py_common.port_util import get_bridge_port_map_updater
+        client = FakeRedis(asic_db(1000))
+        updater = get_bridge_port_map_updater(make_db(client))
+        client.pubsub_obj.psubscribe.assert_called_once_with("__keyspace@1__:ASIC_STATE:SAI_OBJECT_TYPE_BRIDGE_PORT:*")
+        port_map = updater.get()
+        assert len(port_map) == 1000
+
+        new_key = "ASIC_STATE:SAI_OBJECT_TYPE_BRIDGE_PORT:oid:0x3a00000000ffff"
+        client.data[new_key] = {"SAI_BRIDGE_PORT_ATTR_PORT_ID": "oid:0x1000000000ffff"}
+        client.notify(new_key, "hset")
+        del_key = "ASIC_STATE:SAI_OBJECT_TYPE_BRIDGE_PORT:oid:0x3a00000000000000"
+        del client.data[del_key]
+        client.notify(del_key, "del")
+        client.round_trips = 0
+        port_map = updater.get()
+        assert client.round_trips == 1
+        assert len(port_map) == 1000
+        assert port_map["3a00000000ffff"] == "1000000000ffff"
+        assert "3a00000000000000" not in port_map
+
+        # changed objects of a swsscommon client are read with the redis-py pipeline
+        client = FakeSwssClient(asic_db(10))
+        patch_redis, redis_py = fake_redis_py(client)
+        with patch_redis:
+            updater = get_bridge_port_map_updater(make_db(client))
+        client.data[new_key] = {"SAI_BRIDGE_PORT_ATTR_PORT_ID": "oid:0x1000000000ffff"}
+        updater.pubsub.get_message.side_effect = [
+            {'type': 'pmessage', 'channel': '__keyspace@1__:' + new_key, 'data': 'hset'}, None]
+        redis_py.round_trips = 0
+        assert updater.get()["3a00000000ffff"] == "1000000000ffff"
+        assert redis_py.round_trips == 1
+        assert client.round_trips == 0
+
+    def test_round_trips(self):
+        from sonic_py_common.port_util import get_bridge_port_map
+        data = asic_db(10000)
+        # the previous implementation: KEYS and HGETALL per bridge port
+        old_round_trips = len([key for key in data if key.startswith("ASIC_STATE:SAI_OBJECT_TYPE_BRIDGE_PORT:")]) + 1
+        client = FakeRedis(data)
+        assert len(get_bridge_port_map(make_db(client))) == 10000
+        assert client.round_trips < old_round_trips // 100
+        client = FakeSwssClient(data)
+        patch_redis, redis_py = fake_redis_py(client)
+        with patch_redis:
+            assert len(get_bridge_port_map(make_db(client))) == 10000
+        assert client.round_trips == 0
+        assert redis_py.round_trips < old_round_trips // 100
@@ -31,7 +31,8 @@ setup(
         'xmltodict==0.12.0',
         'ijson==3.2.3',
         'jsondiff>=1.2.0',
-        'tabulate==0.9.0'
+        'tabulate==0.9.0',
+        'sonic-py-common'
     ],
     tests_require = [
         'pytest>3',
@@ -3,7 +3,8 @@ import syslog
 
 from json import dump
 from glob import glob
-from sonic_yang_ext import SonicYangExtMixin, SonicYangException
+from sonic_py_common.general import get_cache_dir
+from sonic_yang_ext import SonicYangExtMixin, SonicYangException, YANG_CACHE_NAME
 
 """
 Yang schema and data tree python APIs based on libyang python
@@ -12,8 +13,12 @@ i.e. it is mixin not parent class.
 """
 class SonicYang(SonicYangExtMixin):
 
-    def __init__(self, yang_dir, debug=False, print_log_enabled=True, sonic_yang_options=0):
+    def __init__(self, yang_dir, debug=False, print_log_enabled=True, sonic_yang_options=0, cache_dir=None):
         self.yang_dir = yang_dir
+        # directory of the yang cache file, by default the SONiC cache directory
+        # (see get_cache_dir(), off outside a SONiC device), empty to parse yang
+        # models on every load
+        self.cache_dir = get_cache_dir(YANG_CACHE_NAME) if cache_dir is None else cache_dir
         self.ctx = None
         self.module = None
         self.root = None
@@ -33,6 +38,19 @@ class SonicYang(SonicYangExtMixin):
         self.confDbYangMap = dict()
         # JSON format of yang model [similar to pyang conversion]
         self.yJson = list()
+        # JSON of yang modules, as saved in and decoded from the yang cache file
+        self.yangCacheModules = dict()
+        self.yangCacheDecoded = dict()
+        # descriptors of self.confDbYangMap entries, as saved in the yang cache file
+        self.yangCacheTables = dict()
+        # leafDict created by _createLeafDict() per (table, model)
+        self.leafDictCache = dict()
+        # reverse index of leafref data nodes, used by find_data_dependencies():
+        # {<schema xpath of leafref>: {<value>: set(<data xpath>)}}
+        # Index of a leafref schema node is built on first lookup.
+        self.dataDepIndex = dict()
+        # {<data xpath>: (<schema xpath of leafref>, <value>)} for indexed nodes
+        self.dataDepPaths = dict()
         # config DB json input, will be cropped as yang models
         self.jIn = dict()
         # YANG JSON, this is traslated from config DB json
@@ -144,6 +162,7 @@ class SonicYang(SonicYangExtMixin):
            self.fail(e)
        else:
            self.root = data_node
+           self._reset_data_dependencies()
 
     """
     get module name from xpath
@@ -388,9 +407,11 @@ class SonicYang(SonicYangExtMixin):
     """
     def _add_data_node(self, data_xpath, value):
         try:
-            self._new_data_node(data_xpath, value)
+            data_node = self._new_data_node(data_xpath, value)
             #check if the node added to the data tree
             self._find_data_node(data_xpath)
+            if data_node is not None:
+                self._index_data_dependencies(data_node)
         except Exception as e:
             self.sysLog(msg="add_node(): Failed to add data node for xpath: " + str(data_xpath), debug=syslog.LOG_ERR, doPrint=True)
             self.fail(e)
@@ -413,6 +434,7 @@ class SonicYang(SonicYangExtMixin):
 
             #merge
             self.root.merge(source_node, 0)
+            self._reset_data_dependencies()
         except Exception as e:
             self.fail(e)
 
@@ -426,6 +448,7 @@ class SonicYang(SonicYangExtMixin):
             node = self._find_data_node(xpath)
 
         if (node):
+            self._unindex_data_dependencies(node)
             node.unlink()
             dnode = self._find_data_node(xpath)
             if (dnode is None):
@@ -467,6 +490,10 @@ class SonicYang(SonicYangExtMixin):
     def _set_data_node_value(self, data_xpath, value):
         try:
             self.root.new_path(self.ctx, data_xpath, str(value), ly.LYD_ANYDATA_STRING, ly.LYD_PATH_OPT_UPDATE)
+            data_node = self._find_data_node(data_xpath)
+            if data_node is not None:
+                self._unindex_data_dependencies(data_node)
+                self._index_data_dependencies(data_node)
         except Exception as e:
             self.sysLog(msg="set data node value failed for xpath: " + str(data_xpath), debug=syslog.LOG_ERR, doPrint=True)
             self.fail(e)
@@ -515,6 +542,73 @@ class SonicYang(SonicYangExtMixin):
                 ref_list.append(link.path())
         return ref_list
 
+    """
+    reset_data_dependencies(): drop the reverse index of leafref data nodes,
+    it is built again on demand. Called when data tree is loaded or merged.
+    """
+    def _reset_data_dependencies(self):
+        self.dataDepIndex = dict()
+        self.dataDepPaths = dict()
+
+    """
+    index_data_dependency(): add a leafref data node to the reverse index
+    input:    data_node - data node, schema_xpath - xpath of its schema node
+    """
+    def _index_data_dependency(self, data_node, schema_xpath):
+        casted = data_node.subtype()
+        if casted is None:
+            return
+        value = casted.value_str()
+        path = data_node.path()
+        self.dataDepIndex[schema_xpath].setdefault(value, set()).add(path)
+        self.dataDepPaths[path] = (schema_xpath, value)
+
+    """
+    index_data_dependencies(): add the data node and its descendants to the
+    reverse index of leafref data nodes, if their schema node is indexed
+    input:    data_node - data node added to the data tree
+    """
+    def _index_data_dependencies(self, data_node):
+        if not self.dataDepIndex:
+            return
+        for node in data_node.tree_dfs():
+            schema_xpath = node.schema().path()
+            if schema_xpath in self.dataDepIndex:
+                self._index_data_dependency(node, schema_xpath)
+
+    """
+    unindex_data_dependencies(): remove the data node and its descendants
+    from the reverse index of leafref data nodes
+    input:    data_node - data node to be removed from the data tree
+    """
+    def _unindex_data_dependencies(self, data_node):
+        if not self.dataDepPaths:
+            return
+        for node in data_node.tree_dfs():
+            path = node.path()
+            if path in self.dataDepPaths:
+                schema_xpath, value = self.dataDepPaths.pop(path)
+                paths = self.dataDepIndex[schema_xpath][value]
+                paths.discard(path)
+                if not paths:
+                    del self.dataDepIndex[schema_xpath][value]
+
+    """
+    find_leafref_data_nodes(): find the data nodes of a leafref schema node,
+    grouped by value. The data tree is searched once per schema node, later
+    the result is kept up to date by _add_data_node() and deleteNode().
+    input:    schema_xpath - xpath of leafref schema node
+    returns:  {<value>: set(<data xpath>)}
+    """
+    def _find_leafref_data_nodes(self, schema_xpath):
+        if schema_xpath not in self.dataDepIndex:
+            self.dataDepIndex[schema_xpath] = dict()
+            node_set = self.root.find_path(schema_xpath)
+            if node_set is not None:
+                for data_set in node_set.data():
+                    self._index_data_dependency(data_set, schema_xpath)
+        return self.dataDepIndex[schema_xpath]
+
     """
     find_data_dependencies():   find the data dependencies from data xpath
     input:    data_xpath - xpath of data node. (Public)
@@ -523,11 +617,10 @@ class SonicYang(SonicYangExtMixin):
     """
     def find_data_dependencies(self, data_xpath):
         ref_list = []
-        node = self.root
         try:
             data_node = self._find_data_node(data_xpath)
         except Exception as e:
-            self.sysLog(msg="find_data_dependencies(): Failed to find data node from xpath: {}".format(data_xapth), debug=syslog.LOG_ERR, doPrint=True)
+            self.sysLog(msg="find_data_dependencies(): Failed to find data node from xpath: {}".format(data_xpath), debug=syslog.LOG_ERR, doPrint=True)
             return ref_list
 
         try:
@@ -537,12 +630,7 @@ class SonicYang(SonicYangExtMixin):
             backlinks = schema_node.backlinks()
             if backlinks is not None and backlinks.number() > 0:
                 for link in backlinks.schema():
-                     node_set = node.find_path(link.path())
-                     for data_set in node_set.data():
-                          data_set.schema()
-                          casted = data_set.subtype()
-                          if value == casted.value_str():
-                              ref_list.append(data_set.path())
+                     ref_list.extend(sorted(self._find_leafref_data_nodes(link.path()).get(value, ())))
         except Exception as e:
             self.sysLog(msg='Failed to find node or dependencies for {}'.format(data_xpath), debug=syslog.LOG_ERR, doPrint=True)
             raise SonicYangException("Failed to find node or dependencies for \
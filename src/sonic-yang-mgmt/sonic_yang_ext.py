@@ -3,11 +3,22 @@
 
 from __future__ import print_function
 import yang as ly
+import hashlib
+import os
 import syslog
+import tempfile
 from json import dump, dumps, loads
 from xmltodict import parse
 from glob import glob
 
+# Name of the SONiC cache directory to keep the JSON of yang models derived by
+# loadYangModel(), so that it is built once per set of yang models instead of every load.
+YANG_CACHE_NAME = 'yang'
+# Bump on any change of the cache file format or of the derived objects.
+YANG_CACHE_VERSION = 1
+# Number of yang cache files kept, older files are left by replaced yang models.
+YANG_CACHE_FILES = 4
+
 Type_1_list_maps_model = [
     'DSCP_TO_TC_MAP_LIST',
     'DOT1P_TO_TC_MAP_LIST',
@@ -40,9 +51,57 @@ This is the Exception thrown out of all public function of this class.
 class SonicYangException(Exception):
     pass
 
+"""
+Map from config DB table to yang container, loaded from the yang cache file.
+Values are kept as table descriptors from the cache and are replaced with
+the container of the yang module JSON on first access, so only the modules
+of the tables in use are decoded.
+"""
+class YangCacheTableMap(dict):
+
+    def __init__(self, tables, resolve):
+        super(YangCacheTableMap, self).__init__(tables)
+        self._resolve = resolve
+        self._resolved = set()
+
+    def __getitem__(self, table):
+        value = dict.__getitem__(self, table)
+        if table not in self._resolved:
+            value = self._resolve(value)
+            dict.__setitem__(self, table, value)
+            self._resolved.add(table)
+        return value
+
+    def __setitem__(self, table, value):
+        dict.__setitem__(self, table, value)
+        self._resolved.add(table)
+
+    def get(self, table, default=None):
+        return self[table] if table in self else default
+
+    def values(self):
+        return [self[table] for table in self]
+
+    def items(self):
+        return [(table, self[table]) for table in self]
+
 # class sonic_yang methods, use mixin to extend sonic_yang
 class SonicYangExtMixin:
 
+    """
+    JSON format of yang models. When yang models are loaded from the yang cache
+    file, it is decoded on first access.
+    """
+    @property
+    def yJson(self):
+        if self._yJson is None:
+            self._yJson = [self._getCachedYangModule(name) for name in self.yangCacheModules]
+        return self._yJson
+
+    @yJson.setter
+    def yJson(self, value):
+        self._yJson = value
+
     """
     load all YANG models, create JSON of yang models. (Public function)
     """
@@ -59,16 +118,21 @@ class SonicYangExtMixin:
                 else:
                     raise(Exception("Could not load module {}".format(file)))
 
+            cacheFile = self._getYangCacheFile(self.yangFiles)
+
             # keep only modules name in self.yangFiles
             self.yangFiles = [f.split('/')[-1] for f in self.yangFiles]
             self.yangFiles = [f.split('.')[0] for f in self.yangFiles]
             self.sysLog(syslog.LOG_DEBUG,'Loaded below Yang Models')
             self.sysLog(syslog.LOG_DEBUG,str(self.yangFiles))
 
-            # load json for each yang model
-            self._loadJsonYangModel()
-            # create a map from config DB table to yang container
-            self._createDBTableToModuleMap()
+            self.leafDictCache = dict()
+            if not self._loadYangCache(cacheFile):
+                # load json for each yang model
+                self._loadJsonYangModel()
+                # create a map from config DB table to yang container
+                self._createDBTableToModuleMap()
+                self._saveYangCache(cacheFile)
         except Exception as e:
             self.sysLog(msg="Yang Models Load failed:{}".format(str(e)), \
                 debug=syslog.LOG_ERR, doPrint=True)
@@ -95,6 +159,147 @@ class SonicYangExtMixin:
 
         return
 
+    def _getYangCacheFile(self, yangFiles):
+        '''
+            Get the path of the yang cache file for given yang model files.
+            The file name has the hash of the yang models content, so any
+            change of the yang models makes a new cache file.
+
+            Parameters:
+                yangFiles (list): paths of yang model files.
+
+            Returns:
+                (str): path of yang cache file or None if cache is disabled.
+        '''
+        if not self.cache_dir:
+            return None
+
+        digest = hashlib.sha256()
+        digest.update(str(YANG_CACHE_VERSION).encode())
+        for file in sorted(yangFiles):
+            digest.update(os.path.basename(file).encode() + b'\0')
+            with open(file, 'rb') as f:
+                digest.update(f.read() + b'\0')
+
+        return os.path.join(self.cache_dir, "sonic_yang_{}.json".format(digest.hexdigest()))
+
+    def _loadYangCache(self, cacheFile):
+        '''
+            Load the map from config DB table to yang container and
+            preProcessed yang objects from the yang cache file. JSON of yang
+            modules is decoded later, only for the tables which are accessed.
+
+            Parameters:
+                cacheFile (str): path of yang cache file.
+
+            Returns:
+                (bool): True if the cache file is loaded.
+        '''
+        if cacheFile is None or not os.path.isfile(cacheFile):
+            return False
+
+        try:
+            with open(cacheFile) as f:
+                cache = loads(f.read())
+            if cache['version'] != YANG_CACHE_VERSION:
+                return False
+            self.yangCacheModules = cache['modules']
+            self.yangCacheDecoded = dict()
+            self.preProcessedYang = cache['preProcessedYang']
+            self.confDbYangMap = YangCacheTableMap(cache['tables'], self._resolveCachedTable)
+            self.yJson = None
+        except Exception as e:
+            self.sysLog(msg="Failed to load yang cache {}:{}".format(cacheFile, str(e)), \
+                debug=syslog.LOG_WARNING)
+            return False
+
+        self.sysLog(msg="Yang models are loaded from cache {}".format(cacheFile))
+        return True
+
+    def _saveYangCache(self, cacheFile):
+        '''
+            Save JSON of yang modules, the map from config DB table to yang
+            container and preProcessed yang objects to the yang cache file.
+            Every module is stored as a separate JSON string to decode it on
+            demand. Only the YANG_CACHE_FILES most recent cache files are kept.
+            Failure to save is not an error, yang models are parsed again on
+            next load.
+
+            Parameters:
+                cacheFile (str): path of yang cache file.
+
+            Returns:
+                void
+        '''
+        if cacheFile is None:
+            return
+
+        cache = {
+            'version': YANG_CACHE_VERSION,
+            'modules': dict((j['module']['@name'], dumps(j)) for j in self.yJson),
+            'tables': self.yangCacheTables,
+            'preProcessedYang': self.preProcessedYang
+        }
+        try:
+            if not os.path.isdir(self.cache_dir):
+                os.makedirs(self.cache_dir)
+            fd, tmpFile = tempfile.mkstemp(dir=self.cache_dir)
+            with os.fdopen(fd, 'w') as f:
+                dump(cache, f)
+            os.chmod(tmpFile, 0o644)
+            os.rename(tmpFile, cacheFile)
+            # Keep only the most recent cache files
+            files = glob(os.path.join(self.cache_dir, "sonic_yang_*.json"))
+            files.sort(key=os.path.getmtime, reverse=True)
+            for oldFile in files[YANG_CACHE_FILES:]:
+                if oldFile != cacheFile:
+                    os.remove(oldFile)
+        except Exception as e:
+            self.sysLog(msg="Failed to save yang cache {}:{}".format(cacheFile, str(e)), \
+                debug=syslog.LOG_WARNING)
+
+        return
+
+    def _getCachedYangModule(self, moduleName):
+        '''
+            Decode JSON of yang module from the yang cache, once per module.
+
+            Parameters:
+                moduleName (str): name of yang module.
+
+            Returns:
+                (dict): json format of yang module, as an item of self.yJson.
+        '''
+        if moduleName not in self.yangCacheDecoded:
+            self.yangCacheDecoded[moduleName] = loads(self.yangCacheModules[moduleName])
+        return self.yangCacheDecoded[moduleName]
+
+    def _resolveCachedTable(self, table):
+        '''
+            Create a self.confDbYangMap entry from its descriptor in the
+            yang cache.
+
+            Parameters:
+                table (dict): descriptor of table saved in self.yangCacheTables.
+
+            Returns:
+                (dict): self.confDbYangMap entry.
+        '''
+        module = self._getCachedYangModule(table['module'])['module']
+        # common yang module, which may have definitions
+        if table.get('topLevelContainer') is None:
+            return module
+
+        container = module['container']['container']
+        if table['index'] is not None:
+            container = container[table['index']]
+        return {
+            "module" : table['module'],
+            "topLevelContainer": table['topLevelContainer'],
+            "container": container,
+            "yangModule": module
+            }
+
     def _preProcessYangGrouping(self, moduleName, module):
         '''
             PreProcess Grouping Section of YANG models, and store it in
@@ -167,6 +372,8 @@ class SonicYangExtMixin:
     """
     def _createDBTableToModuleMap(self):
 
+        # descriptors of self.confDbYangMap entries to save in the yang cache
+        self.yangCacheTables = dict()
         for j in self.yJson:
             # get module name
             moduleName = j['module']['@name']
@@ -178,6 +385,7 @@ class SonicYangExtMixin:
             # have definitions. Store module.
             if topLevelContainer is None:
                 self.confDbYangMap[moduleName] = j['module']
+                self.yangCacheTables[moduleName] = {"module": moduleName}
                 continue
 
             # top level container must exist for rest of the yang files and it should
@@ -190,13 +398,18 @@ class SonicYangExtMixin:
             container = topLevelContainer['container']
             # container is a list
             if isinstance(container, list):
-                for c in container:
+                for index, c in enumerate(container):
                     self.confDbYangMap[c['@name']] = {
                         "module" : moduleName,
                         "topLevelContainer": topLevelContainer['@name'],
                         "container": c,
                         "yangModule": j['module']
                         }
+                    self.yangCacheTables[c['@name']] = {
+                        "module" : moduleName,
+                        "topLevelContainer": topLevelContainer['@name'],
+                        "index": index
+                        }
             # container is a dict
             else:
                 self.confDbYangMap[container['@name']] = {
@@ -205,6 +418,11 @@ class SonicYangExtMixin:
                     "container": container,
                     "yangModule": j['module']
                     }
+                self.yangCacheTables[container['@name']] = {
+                    "module" : moduleName,
+                    "topLevelContainer": topLevelContainer['@name'],
+                    "index": None
+                    }
         return
 
     """
@@ -371,6 +589,12 @@ class SonicYangExtMixin:
                  leafDict (dict): dict with leaf(s) information for List\Container
                     corresponding to config DB table.
         '''
+        # model is a node of yang module JSON, which is alive as long as the
+        # yang models are loaded, so leafDict is built once per model.
+        cacheKey = (table, id(model))
+        if cacheKey in self.leafDictCache:
+            return self.leafDictCache[cacheKey]
+
         leafDict = dict()
         #Iterate over leaf, choices and leaf-list.
         self._fillLeafDict(model.get('leaf'), leafDict)
@@ -390,6 +614,7 @@ class SonicYangExtMixin:
         if model.get('uses') is not None:
             self._fillLeafDictUses(model.get('uses'), table, leafDict)
 
+        self.leafDictCache[cacheKey] = leafDict
         return leafDict
 
     """
@@ -1115,6 +1340,7 @@ class SonicYangExtMixin:
           self.sysLog(msg="Try to load Data in the tree")
           self.root = self.ctx.parse_data_mem(dumps(self.xlateJson), \
                         ly.LYD_JSON, ly.LYD_OPT_CONFIG|ly.LYD_OPT_STRICT)
+          self._reset_data_dependencies()
 
        except Exception as e:
            self.root = None
@@ -1124,6 +1350,146 @@ class SonicYangExtMixin:
 
        return True
 
+    def _applyTableDiff(self, old, tableDiff):
+        '''
+            Create the new content of config DB table after applying diff.
+
+            Parameters:
+                old (dict): current content of the table.
+                tableDiff (dict): changes of the table, None to delete table.
+
+            Returns:
+                (dict, list): new content of table and list of changed keys.
+        '''
+        if tableDiff is None:
+            return dict(), list(old.keys())
+
+        new = dict(old)
+        for key, entryDiff in tableDiff.items():
+            if entryDiff is None:
+                new.pop(key, None)
+                continue
+            entry = dict(old.get(key, dict()))
+            for field, value in entryDiff.items():
+                if value is None:
+                    entry.pop(field, None)
+                else:
+                    entry[field] = value
+            new[key] = entry
+
+        return new, list(tableDiff.keys())
+
+    def _isEntryLevelTable(self, table):
+        '''
+            Check if changes of the table can be applied per entry. That is
+            true for a table with single yang list and nothing else, where
+            a config DB key maps to exactly one list entry.
+
+            Parameters:
+                table (str): config DB table.
+
+            Returns:
+                (bool)
+        '''
+        container = self.confDbYangMap[table]['container']
+        clist = container.get('list')
+        return isinstance(clist, dict) and clist['@name'] == table + "_LIST" and \
+            clist['@name'] not in Type_1_list_maps_model and \
+            container.get('container') is None and container.get('leaf') is None and \
+            container.get('choice') is None and container.get('uses') is None
+
+    def applyConfigDiff(self, configdbDiff):
+        '''
+            Apply changes of config DB to the data tree loaded by loadData()
+            and validate the result. (Public)
+
+            Only the changed entries are translated and replaced in the data
+            tree. For tables which do not map entries one to one to a yang
+            list, the whole changed table is translated and replaced. On
+            validation failure the data tree is restored.
+
+            Parameters:
+                configdbDiff (dict): changes in config DB format,
+                    {table: {key: {field: value}}}. Fields are merged into the
+                    existing entry, None as field value deletes the field,
+                    None as entry deletes the entry and None as table deletes
+                    the table.
+
+            Returns:
+                True - success, SonicYangException on failure.
+        '''
+        if self.root is None:
+            raise SonicYangException("Data tree is not loaded")
+
+        newTables = dict()
+        newTablesWithOutYang = dict()
+        # (parent, node) unlinked from data tree, to restore on failure
+        unlinked = list()
+        # xpaths of nodes merged to data tree, to remove on failure
+        merged = list()
+        try:
+            yangJ = dict()
+            for table, tableDiff in configdbDiff.items():
+                if table not in self.confDbYangMap:
+                    newTablesWithOutYang[table], _ = self._applyTableDiff( \
+                        self.tablesWithOutYang.get(table, dict()), tableDiff)
+                    continue
+
+                newTable, changedKeys = self._applyTableDiff(self.jIn.get(table, dict()), tableDiff)
+                newTables[table] = newTable
+                module, topc, container = self._getModuleTLCcontainer(table)
+                tableXpath = "/" + module + ":" + topc + "/" + table
+                if self._isEntryLevelTable(table):
+                    clist = container['list']
+                    xpaths = [self._findXpathList(tableXpath, clist, \
+                        [k.strip() for k in key.split('|')]) for key in changedKeys]
+                    config = dict((key, newTable[key]) for key in changedKeys if key in newTable)
+                else:
+                    xpaths = [tableXpath]
+                    config = newTable
+
+                for xpath in xpaths:
+                    node = self._find_data_node(xpath)
+                    if node is not None:
+                        unlinked.append((node.parent(), node))
+                        self._unindex_data_dependencies(node)
+                        node.unlink()
+                if config:
+                    merged.extend(xpaths)
+                    self._xlateConfigDBtoYang({table: config}, yangJ)
+
+            if yangJ:
+                node = self.ctx.parse_data_mem(dumps(yangJ), ly.LYD_JSON, \
+                    ly.LYD_OPT_CONFIG|ly.LYD_OPT_STRICT|ly.LYD_OPT_TRUSTED)
+                self.root.merge(node, 0)
+                for xpath in merged:
+                    node = self._find_data_node(xpath)
+                    if node is not None:
+                        self._index_data_dependencies(node)
+            self._validate_data(self.root, self.ctx)
+        except Exception as e:
+            self.elementPath = []
+            self._reset_data_dependencies()
+            for xpath in merged:
+                node = self._find_data_node(xpath)
+                if node is not None:
+                    node.unlink()
+            for parent, node in reversed(unlinked):
+                parent.insert(node)
+            self.sysLog(msg="Apply Config Diff Failed:{}".format(str(e)), \
+                debug=syslog.LOG_ERR, doPrint=True)
+            raise SonicYangException("Apply Config Diff Failed\n{}".format(str(e)))
+
+        for tables, changedTables in ((self.jIn, newTables), \
+                (self.tablesWithOutYang, newTablesWithOutYang)):
+            for table, newTable in changedTables.items():
+                if newTable:
+                    tables[table] = newTable
+                else:
+                    tables.pop(table, None)
+
+        return True
+
     """
     Get data from Data tree, data tree will be assigned in self.xlateJson. (Public)
     """
@@ -2,9 +2,11 @@ import sys
 import os
 import pytest
 import sonic_yang as sy
+from sonic_yang_ext import YANG_CACHE_FILES
 import json
 import glob
 import logging
+from unittest import mock
 from ijson import items as ijson_itmes
 
 test_path = os.path.dirname(os.path.abspath(__file__))
@@ -206,6 +208,20 @@ class Test_SonicYang(object):
             depend = yang_s.find_data_dependencies(xpath)
             assert set(depend) == set(list)
 
+    #test data dependencies index is updated on add and delete of nodes
+    def test_find_data_dependencies_index(self, yang_s, data):
+        port_xpath = "/test-port:port/PORT/PORT_LIST[port_name='Ethernet8']/port_name"
+        intf_xpath = "/test-interface:interface/INTERFACE/INTERFACE_LIST[interface='Ethernet8'][ip-prefix='10.1.2.0/24']"
+        depend = yang_s.find_data_dependencies(port_xpath)
+        assert intf_xpath + "/interface" not in depend
+        assert yang_s.dataDepIndex
+
+        yang_s._add_data_node(intf_xpath + "/interface", "Ethernet8")
+        assert set(yang_s.find_data_dependencies(port_xpath)) == set(depend + [intf_xpath + "/interface"])
+
+        yang_s.deleteNode(intf_xpath)
+        assert set(yang_s.find_data_dependencies(port_xpath)) == set(depend)
+
     #test data dependencies
     def test_find_schema_dependencies(self, yang_s, data):
         for node in data['schema_dependencies']:
@@ -381,5 +397,145 @@ class Test_SonicYang(object):
 
         return
 
+    def test_yang_cache_dir(self, sonic_yang_data, tmp_path):
+        yang_dir = sonic_yang_data['yang_dir']
+        with mock.patch.dict(os.environ, {"SONIC_CACHE_PATH": ""}):
+            assert sy.SonicYang(yang_dir).cache_dir is None
+        with mock.patch.dict(os.environ, {"SONIC_CACHE_PATH": str(tmp_path)}):
+            assert sy.SonicYang(yang_dir).cache_dir == str(tmp_path / "yang")
+
+    def test_yang_cache(self, sonic_yang_data, tmp_path):
+        # in this test, yang models loaded from the yang cache file must give
+        # the same translation as yang models parsed from scratch
+        test_file = sonic_yang_data['test_file']
+        yang_dir = sonic_yang_data['yang_dir']
+        cache_dir = str(tmp_path / "yang-cache")
+
+        syc_nocache = sy.SonicYang(yang_dir, cache_dir="")
+        syc_nocache.loadYangModel()
+        assert not os.path.exists(cache_dir)
+
+        syc_parsed = sy.SonicYang(yang_dir, cache_dir=cache_dir)
+        syc_parsed.loadYangModel()
+        assert len(glob.glob(cache_dir + "/sonic_yang_*.json")) == 1
+
+        syc_cached = sy.SonicYang(yang_dir, cache_dir=cache_dir)
+        syc_cached.loadYangModel()
+        # modules are decoded only on access
+        assert len(syc_cached.yangCacheDecoded) == 0
+        assert syc_cached.confDbYangMap['PORT']['container'] == syc_nocache.confDbYangMap['PORT']['container']
+        assert set(syc_cached.yangCacheDecoded) == {syc_nocache.confDbYangMap['PORT']['module']}
+        assert sorted(syc_cached.confDbYangMap) == sorted(syc_nocache.confDbYangMap)
+        assert syc_cached.yJson == syc_nocache.yJson
+
+        jIn = json.loads(self.readIjsonInput(test_file, 'SAMPLE_CONFIG_DB_JSON'))
+        syc_cached.loadData(jIn)
+        syc_cached.validate_data_tree()
+        syc_cached.getData()
+        assert syc_cached.jIn == syc_cached.revXlateJson
+
+        return
+
+    def test_yang_cache_prune(self, sonic_yang_data, tmp_path):
+        # cache files of replaced yang models are removed, the newest ones are kept
+        yang_dir = sonic_yang_data['yang_dir']
+        cache_dir = tmp_path / "yang-cache"
+        cache_dir.mkdir()
+        stale = []
+        for i in range(YANG_CACHE_FILES + 2):
+            path = cache_dir / "sonic_yang_old{}.json".format(i)
+            path.write_text("{}")
+            os.utime(str(path), (1000 + i, 1000 + i))
+            stale.append(path)
+        other = cache_dir / "other.json"
+        other.write_text("{}")
+
+        syc = sy.SonicYang(yang_dir, cache_dir=str(cache_dir))
+        syc.loadYangModel()
+
+        cacheFile = syc._getYangCacheFile(syc.yangFiles)
+        files = glob.glob(str(cache_dir / "sonic_yang_*.json"))
+        assert len(files) == YANG_CACHE_FILES
+        assert cacheFile in files
+        # newest stale files are kept
+        kept = stale[-(YANG_CACHE_FILES - 1):]
+        assert sorted(files) == sorted([cacheFile] + [str(p) for p in kept])
+        assert other.exists()
+
+        return
+
+    def test_apply_config_diff(self, sonic_yang_data):
+        test_file = sonic_yang_data['test_file']
+        syc = sonic_yang_data['syc']
+
+        jIn = json.loads(self.readIjsonInput(test_file, 'SAMPLE_CONFIG_DB_JSON'))
+        syc.loadData(jIn)
+        port = sorted(syc.jIn['PORT'])[0]
+
+        # change a field, add an entry and delete a field
+        syc.applyConfigDiff({
+            'PORT': {port: {'mtu': '1500', 'description': None}},
+            'VLAN': {'Vlan1234': {'vlanid': '1234'}}
+        })
+        assert syc.jIn['PORT'][port]['mtu'] == '1500'
+        assert 'description' not in syc.jIn['PORT'][port]
+        config = syc.getData()
+        assert config['PORT'][port] == syc.jIn['PORT'][port]
+        assert config['VLAN']['Vlan1234'] == {'vlanid': '1234'}
+
+        # delete an entry
+        syc.applyConfigDiff({'VLAN': {'Vlan1234': None}})
+        assert 'Vlan1234' not in syc.getData()['VLAN']
+
+        # invalid value is rejected and the data tree is restored
+        with pytest.raises(sy.SonicYangException):
+            syc.applyConfigDiff({'PORT': {port: {'mtu': 'invalid'}}})
+        assert syc.jIn['PORT'][port]['mtu'] == '1500'
+        assert syc.getData()['PORT'][port]['mtu'] == '1500'
+        syc.validate_data_tree()
+
+        # delete of a port which is referenced by other tables is rejected
+        with pytest.raises(sy.SonicYangException):
+            syc.applyConfigDiff({'PORT': {'Ethernet0': None}})
+        assert 'Ethernet0' in syc.getData()['PORT']
+
+        return
+
+    def test_apply_config_diff_scale(self, sonic_yang_data):
+        # on a config with many entries, a one field change must only
+        # translate and replace the changed entry and must give the same
+        # data tree as a full reload of the changed config
+        test_file = sonic_yang_data['test_file']
+        syc = sonic_yang_data['syc']
+
+        jIn = json.loads(self.readIjsonInput(test_file, 'SAMPLE_CONFIG_DB_JSON'))
+        for i in range(1000):
+            jIn['PORT']['Ethernet{}'.format(100000 + i)] = {
+                'lanes': str(100000 + i),
+                'speed': '100000',
+                'mtu': '9100',
+                'admin_status': 'up'
+            }
+        syc.loadData(json.loads(json.dumps(jIn)))
+
+        with mock.patch.object(syc, '_xlateConfigDBtoYang', wraps=syc._xlateConfigDBtoYang) as xlate, \
+                mock.patch.object(syc, '_find_data_node', wraps=syc._find_data_node) as find_node, \
+                mock.patch.object(syc, 'loadData') as load_data:
+            syc.applyConfigDiff({'PORT': {'Ethernet100000': {'mtu': '9000'}}})
+        load_data.assert_not_called()
+        assert [c[0][0] for c in xlate.call_args_list] == \
+            [{'PORT': {'Ethernet100000': dict(jIn['PORT']['Ethernet100000'], mtu='9000')}}]
+        touched = set(c[0][0] for c in find_node.call_args_list)
+        assert len(touched) == 1
+        assert "Ethernet100000" in touched.pop()
+        diffConfig = syc.getData()
+
+        jIn['PORT']['Ethernet100000']['mtu'] = '9000'
+        syc.loadData(json.loads(json.dumps(jIn)))
+        syc.validate_data_tree()
+        assert diffConfig == syc.getData()
+
+        return
+
     def teardown_class(self):
         pass
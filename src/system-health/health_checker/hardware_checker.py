@@ -1,31 +1,160 @@
+import time
+
 from natsort import natsorted
+from sonic_py_common.logger import Logger
+from swsscommon import swsscommon
 from swsscommon.swsscommon import SonicV2Connector
 
 from .health_checker import HealthChecker
 
+SYSLOG_IDENTIFIER = 'hardware_checker'
+logger = Logger(log_identifier=SYSLOG_IDENTIFIER)
+
 
 class HardwareChecker(HealthChecker):
     """
     Check system hardware status. For now, it checks ASIC, PSU and fan status.
+
+    The checker keeps an in-memory view of the hardware tables in STATE_DB. The view is updated by
+    SubscriberStateTable events and fully reloaded every RESYNC_INTERVAL seconds, and only the
+    tables which changed since the previous check are evaluated again. The subscriber file descriptors
+    are returned by get_event_fds(), healthd wakes up on a table change and runs the next check right away.
     """
 
     ASIC_TEMPERATURE_KEY = 'TEMPERATURE_INFO|ASIC'
+    TEMPERATURE_TABLE_NAME = 'TEMPERATURE_INFO'
     FAN_TABLE_NAME = 'FAN_INFO'
     PSU_TABLE_NAME = 'PSU_INFO'
 
+    # Table name -> key pattern of the table entries the checker cares about
+    TABLE_KEY_PATTERNS = {
+        TEMPERATURE_TABLE_NAME: ASIC_TEMPERATURE_KEY,
+        FAN_TABLE_NAME: FAN_TABLE_NAME,
+        PSU_TABLE_NAME: PSU_TABLE_NAME
+    }
+
+    # Interval in seconds to reload the hardware tables from STATE_DB
+    RESYNC_INTERVAL = 600
+
     def __init__(self):
         HealthChecker.__init__(self)
         self._db = SonicV2Connector(use_unix_socket_path=True)
         self._db.connect(self._db.STATE_DB)
+        self._selector = None
+        self._subscribers = {}
+        self._last_resync = None
+        # Table name -> {key: field value dict}
+        self._tables = {table: {} for table in HardwareChecker.TABLE_KEY_PATTERNS}
+        # Tables which changed since the previous check
+        self._dirty_tables = set(HardwareChecker.TABLE_KEY_PATTERNS)
+        # Table name -> check result of the table in the previous check
+        self._table_info = {}
+        self._ignore_devices = None
 
     def get_category(self):
         return 'Hardware'
 
     def check(self, config):
         self.reset()
-        self._check_asic_status(config)
-        self._check_fan_status(config)
-        self._check_psu_status(config)
+        self._update_tables()
+
+        ignore_devices = set(config.ignore_devices) if config.ignore_devices else None
+        if ignore_devices != self._ignore_devices:
+            self._ignore_devices = ignore_devices
+            self._dirty_tables.update(HardwareChecker.TABLE_KEY_PATTERNS)
+
+        for table, check_func in ((HardwareChecker.TEMPERATURE_TABLE_NAME, self._check_asic_status),
+                                  (HardwareChecker.FAN_TABLE_NAME, self._check_fan_status),
+                                  (HardwareChecker.PSU_TABLE_NAME, self._check_psu_status)):
+            if table in self._dirty_tables or table not in self._table_info:
+                self._info = {}
+                check_func(config)
+                self._table_info[table] = self._info
+                self._dirty_tables.discard(table)
+
+        # The result of the tables which are not evaluated again is kept in self._info as well,
+        # HealthCheckerManager derives the summary from it
+        self.reset()
+        for table_info in self._table_info.values():
+            self._info.update(table_info)
+
+    def get_event_fds(self):
+        return list(self._subscribers)
+
+    def _update_tables(self):
+        """
+        Update the in-memory view of the hardware tables. Reload all tables from STATE_DB if the subscription
+        is not available or the resync interval is reached, otherwise apply the pending table change events.
+        :return:
+        """
+        now = time.time()
+        resync_due = self._last_resync is None or now - self._last_resync >= HardwareChecker.RESYNC_INTERVAL
+        if resync_due:
+            if self._selector is None:
+                self._subscribe()
+            self._last_resync = now
+
+        if resync_due or self._selector is None:
+            self._resync()
+        else:
+            self._process_events()
+
+    def _subscribe(self):
+        """
+        Subscribe the hardware tables in STATE_DB. If subscription fails, the tables are reloaded on each check.
+        :return:
+        """
+        try:
+            state_db = swsscommon.DBConnector("STATE_DB", 0, True)
+            selector = swsscommon.Select()
+            subscribers = {}
+            for table in HardwareChecker.TABLE_KEY_PATTERNS:
+                subscriber = swsscommon.SubscriberStateTable(state_db, table)
+                selector.addSelectable(subscriber)
+                subscribers[subscriber.getFd()] = (table, subscriber)
+        except Exception as e:
+            logger.log_warning('Failed to subscribe hardware tables, fall back to polling - {}'.format(repr(e)))
+            return
+
+        self._selector = selector
+        self._subscribers = subscribers
+
+    def _resync(self):
+        """
+        Reload all hardware tables from STATE_DB.
+        :return:
+        """
+        for table, pattern in HardwareChecker.TABLE_KEY_PATTERNS.items():
+            entries = {}
+            for key in self._db.keys(self._db.STATE_DB, pattern + '*') or []:
+                entries[key] = self._db.get_all(self._db.STATE_DB, key)
+            self._tables[table] = entries
+        self._dirty_tables.update(HardwareChecker.TABLE_KEY_PATTERNS)
+
+    def _process_events(self):
+        """
+        Apply all pending table change events to the in-memory view of the hardware tables without blocking.
+        :return:
+        """
+        while True:
+            state, selectable = self._selector.select(0)
+            if state != swsscommon.Select.OBJECT:
+                break
+
+            table, subscriber = self._subscribers[selectable.getFd()]
+            key, op, fvs = subscriber.pop()
+            if not key:
+                continue
+
+            key = '{}|{}'.format(table, key)
+            if not key.startswith(HardwareChecker.TABLE_KEY_PATTERNS[table]):
+                continue
+
+            if op == swsscommon.SET_COMMAND:
+                self._tables[table][key] = dict(fvs)
+            elif op == swsscommon.DEL_COMMAND:
+                self._tables[table].pop(key, None)
+            self._dirty_tables.add(table)
 
     def _check_asic_status(self, config):
         """
@@ -36,13 +165,10 @@ class HardwareChecker(HealthChecker):
         if config.ignore_devices and 'asic' in config.ignore_devices:
             return
 
-        ASIC_TEMPERATURE_KEY_LIST = self._db.keys(self._db.STATE_DB,
-                                                  HardwareChecker.ASIC_TEMPERATURE_KEY + '*')
-        for asic_key in ASIC_TEMPERATURE_KEY_LIST:
-            temperature = self._db.get(self._db.STATE_DB, asic_key,
-                                                          'temperature')
-            temperature_threshold = self._db.get(self._db.STATE_DB, asic_key,
-                                                          'high_threshold')
+        asic_table = self._tables[HardwareChecker.TEMPERATURE_TABLE_NAME]
+        for asic_key, data_dict in asic_table.items():
+            temperature = data_dict.get('temperature')
+            temperature_threshold = data_dict.get('high_threshold')
             asic_name = asic_key.split('|')[1]
             if not temperature:
                 self.set_object_not_ok('ASIC', asic_name,
@@ -78,7 +204,8 @@ class HardwareChecker(HealthChecker):
         if config.ignore_devices and 'fan' in config.ignore_devices:
             return
 
-        keys = self._db.keys(self._db.STATE_DB, HardwareChecker.FAN_TABLE_NAME + '*')
+        fan_table = self._tables[HardwareChecker.FAN_TABLE_NAME]
+        keys = list(fan_table)
         if not keys:
             self.set_object_not_ok('Fan', 'Fan', 'Failed to get fan information')
             return
@@ -93,7 +220,7 @@ class HardwareChecker(HealthChecker):
             name = key_list[1]
             if config.ignore_devices and name in config.ignore_devices:
                 continue
-            data_dict = self._db.get_all(self._db.STATE_DB, key)
+            data_dict = fan_table[key]
             presence = data_dict.get('presence', 'false')
             if presence.lower() != 'true':
                 self.set_object_not_ok('Fan', name, '{} is missing'.format(name))
@@ -169,7 +296,8 @@ class HardwareChecker(HealthChecker):
         if config.ignore_devices and 'psu' in config.ignore_devices:
             return
 
-        keys = self._db.keys(self._db.STATE_DB, HardwareChecker.PSU_TABLE_NAME + '*')
+        psu_table = self._tables[HardwareChecker.PSU_TABLE_NAME]
+        keys = list(psu_table)
         if not keys:
             self.set_object_not_ok('PSU', 'PSU', 'Failed to get PSU information')
             return
@@ -184,7 +312,7 @@ class HardwareChecker(HealthChecker):
             if config.ignore_devices and name in config.ignore_devices:
                 continue
 
-            data_dict = self._db.get_all(self._db.STATE_DB, key)
+            data_dict = psu_table[key]
             presence = data_dict.get('presence', 'false')
             if presence.lower() != 'true':
                 self.set_object_not_ok('PSU', name, '{} is missing or not available'.format(name))
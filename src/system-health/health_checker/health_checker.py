@@ -10,6 +10,7 @@ class HealthChecker(object):
     STATUS_OK = 'OK'
     STATUS_NOT_OK = 'Not OK'
 
+    # Summary of the last system health check, set by HealthCheckerManager from the results of all checkers
     summary = STATUS_OK
 
     def __init__(self):
@@ -45,6 +46,14 @@ class HealthChecker(object):
         """
         pass
 
+    def get_event_fds(self):
+        """
+        Get file descriptors which become readable when the checked objects change, so that healthd runs the
+        next check without waiting for the full interval.
+        :return: List of file descriptors, empty if the checker only polls.
+        """
+        return []
+
     def __str__(self):
         return self.__class__.__name__
 
@@ -72,7 +81,6 @@ class HealthChecker(object):
         self.add_info(object_name, self.INFO_FIELD_OBJECT_TYPE, object_type)
         self.add_info(object_name, self.INFO_FIELD_OBJECT_MSG, message)
         self.add_info(object_name, self.INFO_FIELD_OBJECT_STATUS, self.STATUS_NOT_OK)
-        HealthChecker.summary = HealthChecker.STATUS_NOT_OK
 
     def set_object_ok(self, object_type, object_name):
         """
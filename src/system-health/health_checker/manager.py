@@ -1,3 +1,6 @@
+import concurrent.futures
+import time
+
 from .config import Config
 from .health_checker import HealthChecker
 from .service_checker import ServiceChecker
@@ -10,9 +13,23 @@ class HealthCheckerManager(object):
     """
     Manage all system health checkers and system health configuration.
     """
+
+    # Max number of checkers running at the same time
+    MAX_WORKERS = 4
+
+    # Result of a checker run in the checker statistic
+    RESULT_OK = 'OK'
+    RESULT_ERROR = 'Error'
+    RESULT_TIMEOUT = 'Timeout'
+
     def __init__(self):
         self._checkers = []
         self.config = Config()
+        self._executor = concurrent.futures.ThreadPoolExecutor(max_workers=HealthCheckerManager.MAX_WORKERS)
+        # Checker name -> (checker, future) of the last checker run, to not start a checker while its previous run is not finished
+        self._running = {}
+        # Checker name -> result and duration of the last checker run
+        self.checker_stats = {}
         self.initialize()
 
     def initialize(self):
@@ -29,48 +46,130 @@ class HealthCheckerManager(object):
         :param chassis: A chassis object.
         :return: A dictionary that contains the status for all objects that was checked.
         """
-        HealthChecker.summary = HealthChecker.STATUS_OK
         stats = {}
         self.config.load_config()
 
-        for checker in self._checkers:
-            self._do_check(checker, stats)
-
+        checkers = list(self._checkers)
         if self.config.user_defined_checkers:
             for udc in self.config.user_defined_checkers:
-                checker = UserDefinedChecker(udc)
-                self._do_check(checker, stats)
+                checkers.append(UserDefinedChecker(udc))
+
+        # Run all checkers concurrently, a checker which is still running since the previous check is not started again
+        futures = []
+        for checker in checkers:
+            running = self._running.get(str(checker))
+            if running is None or running[1].done():
+                running = (checker, self._executor.submit(self._timed_check, checker))
+                self._running[str(checker)] = running
+            futures.append(running)
+
+        deadline = time.time() + self.config.checker_timeout
+        for checker, future in futures:
+            self._do_check(checker, future, max(0, deadline - time.time()), stats)
 
+        # Checkers which did not finish in time may still be running, so the summary is only derived
+        # from the collected statistic here instead of being updated by the checkers
+        HealthChecker.summary = self._get_summary(stats)
         self._set_system_led(chassis)
         return stats
 
-    def _do_check(self, checker, stats):
+    def get_event_fds(self):
+        """
+        Get file descriptors of all checkers which become readable when the checked objects change.
+        :return: List of file descriptors.
+        """
+        fds = []
+        for checker in self._checkers:
+            fds.extend(checker.get_event_fds())
+        return fds
+
+    def _timed_check(self, checker):
+        """
+        Run the check of a checker in a worker thread and measure how long it took.
+        :param checker: A checker object.
+        :return: A tuple of the duration in milliseconds and the exception raised by the check, None if
+                 the check succeeded.
+        """
+        begin = time.time()
+        error = None
+        try:
+            checker.check(self.config)
+        except Exception as e:
+            error = e
+        return int((time.time() - begin) * 1000), error
+
+    def _do_check(self, checker, future, timeout, stats):
         """
-        Do check for a particular checker and collect the check statistic.
+        Wait for a particular checker and collect the check statistic.
         :param checker: A checker object.
+        :param future: Future of the checker run.
+        :param timeout: Seconds to wait for the checker.
         :param stats: Check statistic.
         :return:
         """
         try:
-            checker.check(self.config)
+            duration, error = future.result(timeout=timeout)
+        except concurrent.futures.TimeoutError:
+            self._set_checker_result(checker, HealthCheckerManager.RESULT_TIMEOUT, self.config.checker_timeout * 1000)
+            self._set_internal_error(checker, stats, 'Health check for {} did not finish in {} seconds'.format(
+                checker, self.config.checker_timeout))
+            return
+
+        try:
+            if error is not None:
+                raise error
             category = checker.get_category()
             info = checker.get_info()
             if category not in stats:
                 stats[category] = info
             else:
                 stats[category].update(info)
+            self._set_checker_result(checker, HealthCheckerManager.RESULT_OK, duration)
         except Exception as e:
-            HealthChecker.summary = HealthChecker.STATUS_NOT_OK
-            error_msg = 'Failed to perform health check for {} due to exception - {}'.format(checker, repr(e))
-            entry = {str(checker): {
-                HealthChecker.INFO_FIELD_OBJECT_STATUS: HealthChecker.STATUS_NOT_OK,
-                HealthChecker.INFO_FIELD_OBJECT_MSG: error_msg,
-                HealthChecker.INFO_FIELD_OBJECT_TYPE: "Internal"
-            }}
-            if 'Internal' not in stats:
-                stats['Internal'] = entry
-            else:
-                stats['Internal'].update(entry)
+            self._set_checker_result(checker, HealthCheckerManager.RESULT_ERROR, duration)
+            self._set_internal_error(checker, stats, 'Failed to perform health check for {} due to exception - {}'.format(
+                checker, repr(e)))
+
+    def _set_checker_result(self, checker, result, duration):
+        """
+        Record the result and duration of the last run of a checker in the checker statistic.
+        :param checker: A checker object.
+        :param result: One of RESULT_OK, RESULT_ERROR and RESULT_TIMEOUT.
+        :param duration: Duration in milliseconds of the checker run.
+        :return:
+        """
+        self.checker_stats[str(checker)] = {'result': result, 'duration_ms': duration}
+
+    def _set_internal_error(self, checker, stats, error_msg):
+        """
+        Add an internal error entry for a checker which failed or did not finish in time.
+        :param checker: A checker object.
+        :param stats: Check statistic.
+        :param error_msg: Error message.
+        :return:
+        """
+        entry = {str(checker): {
+            HealthChecker.INFO_FIELD_OBJECT_STATUS: HealthChecker.STATUS_NOT_OK,
+            HealthChecker.INFO_FIELD_OBJECT_MSG: error_msg,
+            HealthChecker.INFO_FIELD_OBJECT_TYPE: "Internal"
+        }}
+        if 'Internal' not in stats:
+            stats['Internal'] = entry
+        else:
+            stats['Internal'].update(entry)
+
+    @staticmethod
+    def _get_summary(stats):
+        """
+        Get the summary of the system health from the check statistic.
+        :param stats: Check statistic.
+        :return: STATUS_NOT_OK if any object is not OK, else STATUS_OK.
+        """
+        for info in stats.values():
+            for object_info in info.values():
+                if object_info.get(HealthChecker.INFO_FIELD_OBJECT_STATUS) == HealthChecker.STATUS_NOT_OK:
+                    return HealthChecker.STATUS_NOT_OK
+        return HealthChecker.STATUS_OK
 
     def _set_system_led(self, chassis):
         try:
@@ -1,7 +1,10 @@
 import docker
+import http.client
 import os
 import pickle
 import re
+import socket
+import xmlrpc.client
 
 from swsscommon import swsscommon
 from sonic_py_common import multi_asic
@@ -28,6 +31,15 @@ class ServiceChecker(HealthChecker):
     # Command to get merged directory of a container
     GET_CONTAINER_FOLDER_CMD = 'docker inspect {} --format "{{{{.GraphDriver.Data.MergedDir}}}}"'
 
+    # Path of supervisord XML-RPC unix socket in the container, /var/run is a symlink to /run in the containers
+    SUPERVISOR_SOCKET_PATH = '/var/run/supervisor.sock'
+
+    # Max number of symlinks followed to resolve a path in a container
+    MAX_CONTAINER_SYMLINKS = 40
+
+    # Timeout in seconds of a supervisord XML-RPC request
+    SUPERVISOR_RPC_TIMEOUT = 5
+
     # Command to query the status of monit service.
     CHECK_MONIT_SERVICE_CMD = 'systemctl is-active monit.service'
 
@@ -55,6 +67,11 @@ class ServiceChecker(HealthChecker):
 
         self.config_db = None
 
+        self.docker_client = None
+
+        # Container name -> merged directory, refreshed each time running containers are listed
+        self.container_folders = {}
+
         self.load_critical_process_cache()
 
         self.events_handle = swsscommon.events_init_publisher(EVENTS_PUBLISHER_SOURCE)
@@ -109,21 +126,38 @@ class ServiceChecker(HealthChecker):
         Returns:
             running_containers: A set of running container names
         """
-        DOCKER_CLIENT = docker.DockerClient(base_url='unix://var/run/docker.sock')
         running_containers = set()
-        ctrs = DOCKER_CLIENT.containers
+        ctrs = self._get_docker_client().containers
+        container_folders = {}
         try:
             lst = ctrs.list(filters={"status": "running"})
 
             for ctr in lst:
                 running_containers.add(ctr.name)
+                container_folder = self._get_merged_dir(ctr)
+                if container_folder:
+                    container_folders[ctr.name] = container_folder
                 if ctr.name not in self.container_critical_processes:
                     self.fill_critical_process_by_container(ctr.name)
         except docker.errors.APIError as err:
             logger.log_error("Failed to retrieve the running container list. Error: '{}'".format(err))
+        self.container_folders = container_folders
 
         return running_containers
 
+    def _get_docker_client(self):
+        if self.docker_client is None:
+            self.docker_client = docker.DockerClient(base_url='unix://var/run/docker.sock')
+        return self.docker_client
+
+    @staticmethod
+    def _get_merged_dir(ctr):
+        try:
+            container_folder = ctr.attrs['GraphDriver']['Data']['MergedDir']
+        except (KeyError, TypeError):
+            return None
+        return container_folder if isinstance(container_folder, str) else None
+
     def get_critical_process_list_from_file(self, container, critical_processes_file):
         """Read critical process name list from critical processes file
 
@@ -186,6 +220,18 @@ class ServiceChecker(HealthChecker):
         self.need_save_cache = True
 
     def _get_container_folder(self, container):
+        container_folder = self.container_folders.get(container)
+        if container_folder:
+            return container_folder
+
+        try:
+            container_folder = self._get_merged_dir(self._get_docker_client().containers.get(container))
+        except docker.errors.DockerException:
+            container_folder = None
+        if container_folder:
+            self.container_folders[container] = container_folder
+            return container_folder
+
         container_folder = utils.run_command(ServiceChecker.GET_CONTAINER_FOLDER_CMD.format(container))
         if container_folder is None:
             return container_folder
@@ -326,6 +372,93 @@ class ServiceChecker(HealthChecker):
             data[items[0].strip()] = items[1].strip()
         return data
 
+    def _get_supervisor_process_status(self, container_name):
+        """Get status of processes in a container from supervisord XML-RPC interface, which avoids
+           forking "docker exec" for each container.
+
+        Args:
+            container_name (str): Container name
+
+        Returns:
+            A dict of process name to process state name, None if supervisord could not be reached
+        """
+        container_folder = self.container_folders.get(container_name)
+        if not container_folder:
+            return None
+
+        socket_path = self._get_container_path(container_folder, ServiceChecker.SUPERVISOR_SOCKET_PATH)
+        if not socket_path or not os.path.exists(socket_path):
+            return None
+
+        try:
+            proxy = xmlrpc.client.ServerProxy('http://localhost',
+                                              transport=UnixStreamTransport(socket_path, ServiceChecker.SUPERVISOR_RPC_TIMEOUT))
+            process_info_list = proxy.supervisor.getAllProcessInfo()
+        except (OSError, xmlrpc.client.Error, http.client.HTTPException) as e:
+            logger.log_debug('Failed to get process status of container {} from supervisord - {}'.format(container_name, repr(e)))
+            return None
+
+        return self._parse_supervisor_process_info(process_info_list)
+
+    @staticmethod
+    def _get_container_path(container_folder, path):
+        """Get the host path of a file in a container. Symlinks are resolved inside the container merged
+           directory, an absolute symlink in the container points to the container root, not the host root.
+
+        Args:
+            container_folder (str): Container merged directory
+            path (str): Absolute path of the file in the container
+
+        Returns:
+            Host path of the file, None if there are too many symlinks in the path
+        """
+        resolved = container_folder
+        parts = path.split('/')
+        links = 0
+        while parts:
+            part = parts.pop(0)
+            if not part or part == '.':
+                continue
+            if part == '..':
+                if resolved != container_folder:
+                    resolved = os.path.dirname(resolved)
+                continue
+
+            candidate = os.path.join(resolved, part)
+            if not os.path.islink(candidate):
+                resolved = candidate
+                continue
+
+            links += 1
+            if links > ServiceChecker.MAX_CONTAINER_SYMLINKS:
+                return None
+            target = os.readlink(candidate)
+            if target.startswith('/'):
+                resolved = container_folder
+            parts = target.split('/') + parts
+        return resolved
+
+    def _parse_supervisor_process_info(self, process_info_list):
+        """Expected input:
+            [{'name': 'orchagent', 'group': 'orchagent', 'statename': 'RUNNING', ...},
+             {'name': 'bgpd', 'group': 'bgp', 'statename': 'RUNNING', ...}]
+
+        Args:
+            process_info_list (list): Process info returned by supervisor.getAllProcessInfo
+
+        Returns:
+            A dict of process name to process state name, the process name has the same format
+            as "supervisorctl status" output
+        """
+        data = {}
+        for process_info in process_info_list:
+            name = process_info['name']
+            group = process_info.get('group', name)
+            if group != name:
+                name = '{}:{}'.format(group, name)
+            data[name] = process_info['statename']
+        return data
+
     def publish_events(self, container_name, critical_process_list):
         params = swsscommon.FieldValueMap()
         params["ctr_name"] = container_name
@@ -352,15 +485,17 @@ class ServiceChecker(HealthChecker):
                 # We are using supervisorctl status to check the critical process status. We cannot leverage psutil here because
                 # it not always possible to get process cmdline in supervisor.conf. E.g, cmdline of orchagent is "/usr/bin/orchagent",
                 # however, in supervisor.conf it is "/usr/bin/orchagent.sh"
-                cmd = 'docker exec {} bash -c "supervisorctl status"'.format(container_name)
-                process_status = utils.run_command(cmd)
+                process_status = self._get_supervisor_process_status(container_name)
                 if process_status is None:
-                    for process_name in critical_process_list:
-                        self.set_object_not_ok('Process', '{}:{}'.format(container_name, process_name), "Process '{}' in container '{}' is not running".format(process_name, container_name))
-                    self.publish_events(container_name, critical_process_list)
-                    return
+                    cmd = 'docker exec {} bash -c "supervisorctl status"'.format(container_name)
+                    process_status = utils.run_command(cmd)
+                    if process_status is None:
+                        for process_name in critical_process_list:
+                            self.set_object_not_ok('Process', '{}:{}'.format(container_name, process_name), "Process '{}' in container '{}' is not running".format(process_name, container_name))
+                        self.publish_events(container_name, critical_process_list)
+                        return
 
-                process_status = self._parse_supervisorctl_status(process_status.strip().splitlines())
+                    process_status = self._parse_supervisorctl_status(process_status.strip().splitlines())
                 for process_name in critical_process_list:
                     if config and config.ignore_services and process_name in config.ignore_services:
                         continue
@@ -372,3 +507,30 @@ class ServiceChecker(HealthChecker):
                             self.set_object_not_ok('Process', '{}:{}'.format(container_name, process_name), "Process '{}' in container '{}' is not running".format(process_name, container_name))
                         else:
                             self.set_object_ok('Process', '{}:{}'.format(container_name, process_name))
+
+
+class UnixStreamHTTPConnection(http.client.HTTPConnection):
+    """
+    HTTP connection over a unix domain socket.
+    """
+    def __init__(self, socket_path, timeout):
+        http.client.HTTPConnection.__init__(self, 'localhost', timeout=timeout)
+        self.socket_path = socket_path
+
+    def connect(self):
+        self.sock = socket.socket(socket.AF_UNIX, socket.SOCK_STREAM)
+        self.sock.settimeout(self.timeout)
+        self.sock.connect(self.socket_path)
+
+
+class UnixStreamTransport(xmlrpc.client.Transport):
+    """
+    XML-RPC transport over a unix domain socket, used to talk to supervisord in containers.
+    """
+    def __init__(self, socket_path, timeout):
+        xmlrpc.client.Transport.__init__(self)
+        self.socket_path = socket_path
+        self.timeout = timeout
+
+    def make_connection(self, host):
+        return UnixStreamHTTPConnection(self.socket_path, self.timeout)
@@ -21,6 +21,16 @@ SELECT_TIMEOUT_MSECS = 1000
 QUEUE_TIMEOUT = 15
 TASK_STOP_TIMEOUT = 10
 logger = Logger(log_identifier=SYSLOG_IDENTIFIER)
+#Unit properties used to decide the service status
+UNIT_PROPERTIES = ['Id', 'LoadState', 'UnitFileState', 'Type', 'ActiveState', 'SubState', 'Result']
+#Unit type -> D-Bus interface which has the unit type specific properties
+UNIT_TYPE_INTERFACES = {
+    'service': 'org.freedesktop.systemd1.Service',
+    'timer': 'org.freedesktop.systemd1.Timer',
+    'socket': 'org.freedesktop.systemd1.Socket',
+    'mount': 'org.freedesktop.systemd1.Mount',
+    'swap': 'org.freedesktop.systemd1.Swap',
+}
 
 
 #Subprocess which subscribes to STATE_DB FEATURE table for any update
@@ -120,6 +130,11 @@ class Sysmonitor(ProcessTaskBase):
         self.config = Config()
         self.mpmgr = multiprocessing.Manager()
         self.myQ = self.mpmgr.Queue()
+        self.sysbus = None
+        self.systemd_manager = None
+        # Unit status waiting to be written to state db in one pipeline, None if not in a batch
+        self.unit_status_batch = None
+        self.unit_status_table = None
 
     #Sets system ready status to state db
     def post_system_status(self, state):
@@ -248,6 +263,39 @@ class Sysmonitor(ProcessTaskBase):
 
         return prop_dict
 
+    #Gets the service properties from systemd via D-Bus, reusing one system bus connection
+    def get_unit_properties_by_dbus(self, service):
+        import dbus
+
+        if not self.systemd_manager:
+            self.sysbus = dbus.SystemBus()
+            systemd = self.sysbus.get_object('org.freedesktop.systemd1', '/org/freedesktop/systemd1')
+            self.systemd_manager = dbus.Interface(systemd, 'org.freedesktop.systemd1.Manager')
+
+        unit = self.sysbus.get_object('org.freedesktop.systemd1', self.systemd_manager.LoadUnit(service))
+        unit_props = dbus.Interface(unit, 'org.freedesktop.DBus.Properties')
+        props = unit_props.GetAll('org.freedesktop.systemd1.Unit')
+        prop_dict = {name: str(props[name]) for name in UNIT_PROPERTIES if name in props}
+
+        #Type and Result are properties of the unit type specific interface, e.g. org.freedesktop.systemd1.Service
+        unit_type = service.rsplit('.', 1)[-1]
+        if prop_dict.get('LoadState') == 'loaded' and unit_type in UNIT_TYPE_INTERFACES:
+            props = unit_props.GetAll(UNIT_TYPE_INTERFACES[unit_type])
+            prop_dict.update({name: str(props[name]) for name in UNIT_PROPERTIES if name in props})
+
+        return prop_dict
+
+    #Gets the service properties, falls back to systemctl if systemd is not reachable via D-Bus
+    def get_unit_properties(self, service):
+        try:
+            return self.get_unit_properties_by_dbus(service)
+        except Exception as e:
+            logger.log_debug("Failed to get unit properties of {} via D-Bus: {}".format(service, str(e)))
+            self.sysbus = None
+            self.systemd_manager = None
+
+        return self.run_systemctl_show(service)
+
     #Sets the service status to state db
     def post_unit_status(self, srv_name, srv_status, app_status, fail_reason, update_time):
         if not self.state_db:
@@ -260,8 +308,31 @@ class Sysmonitor(ProcessTaskBase):
         statusvalue['app_ready_status'] = app_status
         statusvalue['fail_reason'] = fail_reason
         statusvalue['update_time'] = update_time
+        if self.unit_status_batch is not None:
+            self.unit_status_batch[srv_name] = statusvalue
+            return
         self.state_db.hmset(self.state_db.STATE_DB, key, statusvalue)
 
+    #Writes the service status collected in a batch to state db in one pipeline
+    def flush_unit_status(self):
+        batch = self.unit_status_batch
+        self.unit_status_batch = None
+        if not batch:
+            return
+
+        try:
+            if not self.unit_status_table:
+                db = swsscommon.DBConnector("STATE_DB", REDIS_TIMEOUT_MS, True)
+                self.unit_status_table = swsscommon.Table(swsscommon.RedisPipeline(db), 'ALL_SERVICE_STATUS', True)
+            for srv_name, statusvalue in batch.items():
+                self.unit_status_table.set(srv_name, swsscommon.FieldValuePairs(list(statusvalue.items())))
+            self.unit_status_table.flush()
+        except Exception as e:
+            logger.log_warning("Failed to write service status in pipeline: {}".format(str(e)))
+            self.unit_status_table = None
+            for srv_name, statusvalue in batch.items():
+                self.state_db.hmset(self.state_db.STATE_DB, 'ALL_SERVICE_STATUS|{}'.format(srv_name), statusvalue)
+
     #Reads the current status of the service and posts it to state db
     def get_unit_status(self, event):
         """ Get a unit status"""
@@ -274,7 +345,7 @@ class Sysmonitor(ProcessTaskBase):
             service_up_status = "Down"
             service_name,last_name = event.split('.')
 
-            sysctl_show = self.run_systemctl_show(event)
+            sysctl_show = self.get_unit_properties(event)
 
             load_state = sysctl_show.get('LoadState')
             if load_state == "loaded":
@@ -339,11 +410,15 @@ class Sysmonitor(ProcessTaskBase):
         scan_srv_list = []
 
         scan_srv_list = self.get_all_service_list()
-        for service in scan_srv_list:
-            ustate = self.get_unit_status(service)
-            if ustate == "NOT OK":
-                if service not in self.dnsrvs_name:
-                    self.dnsrvs_name.add(service)
+        self.unit_status_batch = {}
+        try:
+            for service in scan_srv_list:
+                ustate = self.get_unit_status(service)
+                if ustate == "NOT OK":
+                    if service not in self.dnsrvs_name:
+                        self.dnsrvs_name.add(service)
+        finally:
+            self.flush_unit_status()
 
         if len(self.dnsrvs_name) == 0:
             return "UP"
@@ -11,8 +11,12 @@
 """
 import copy
 import os
+import socketserver
 import sys
+import tempfile
+import threading
 from imp import load_source
+from xmlrpc.server import SimpleXMLRPCDispatcher, SimpleXMLRPCRequestHandler
 from swsscommon import swsscommon
 
 from mock import Mock, MagicMock, patch
@@ -468,6 +472,126 @@ def test_hardware_checker():
     assert checker._info['PSU 7'][HealthChecker.INFO_FIELD_OBJECT_MSG] == 'System power exceeds threshold but power_critical_threshold is invalid'
 
 
+@patch('health_checker.hardware_checker.swsscommon')
+def test_hardware_checker_subscription(mock_swsscommon):
+    MockConnector.data.clear()
+    MockConnector.data.update({
+        'TEMPERATURE_INFO|ASIC': {
+            'temperature': '20',
+            'high_threshold': '21'
+        },
+        'TEMPERATURE_INFO|PSU 1': {
+            'temperature': '20',
+            'high_threshold': '21'
+        },
+        'FAN_INFO|fan1': {
+            'presence': 'True',
+            'status': 'True',
+            'speed': '60',
+            'speed_target': '60',
+            'is_under_speed': 'False',
+            'is_over_speed': 'False',
+        },
+        'PSU_INFO|PSU 1': {
+            'presence': 'True',
+            'status': 'True',
+            'temp': '55',
+            'temp_threshold': '100',
+            'voltage': '10',
+            'voltage_min_threshold': '8',
+            'voltage_max_threshold': '15',
+        },
+    })
+
+    events = []
+    subscribers = {}
+    def create_subscriber(db, table):
+        subscriber = MagicMock()
+        subscriber.getFd.return_value = len(subscribers)
+        subscriber.pop.side_effect = lambda: events.pop(0)[1:]
+        subscribers[table] = subscriber
+        return subscriber
+
+    def select(timeout):
+        if not events:
+            return mock_swsscommon.Select.TIMEOUT, None
+        return mock_swsscommon.Select.OBJECT, subscribers[events[0][0]]
+
+    mock_swsscommon.SET_COMMAND = 'SET'
+    mock_swsscommon.DEL_COMMAND = 'DEL'
+    mock_swsscommon.SubscriberStateTable.side_effect = create_subscriber
+    mock_swsscommon.Select.return_value.select.side_effect = select
+
+    checker = HardwareChecker()
+    assert checker.get_event_fds() == []
+    config = Config()
+    checker.check(config)
+    assert sorted(checker.get_event_fds()) == [0, 1, 2]
+    assert checker._info['ASIC'][HealthChecker.INFO_FIELD_OBJECT_STATUS] == HealthChecker.STATUS_OK
+    assert 'PSU 1' in checker._info
+    assert checker._info['fan1'][HealthChecker.INFO_FIELD_OBJECT_STATUS] == HealthChecker.STATUS_OK
+
+    # Changes are applied from subscription, only the changed tables are checked again
+    checker._db = MagicMock()
+    checker._check_psu_status = MagicMock()
+    events.extend([
+        ('FAN_INFO', 'fan1', 'SET', (('presence', 'False'),)),
+        ('TEMPERATURE_INFO', 'PSU 1', 'SET', (('temperature', '30'), ('high_threshold', '21'))),
+        ('TEMPERATURE_INFO', 'ASIC', 'SET', (('temperature', '30'), ('high_threshold', '21'))),
+    ])
+    checker.check(config)
+    assert not checker._db.keys.called
+    assert not checker._check_psu_status.called
+    assert checker._info['fan1'][HealthChecker.INFO_FIELD_OBJECT_STATUS] == HealthChecker.STATUS_NOT_OK
+    assert checker._info['ASIC'][HealthChecker.INFO_FIELD_OBJECT_STATUS] == HealthChecker.STATUS_NOT_OK
+    assert checker._info['PSU 1'][HealthChecker.INFO_FIELD_OBJECT_STATUS] == HealthChecker.STATUS_OK
+
+    events.append(('FAN_INFO', 'fan1', 'DEL', ()))
+    checker.check(config)
+    assert checker._info['Fan'][HealthChecker.INFO_FIELD_OBJECT_STATUS] == HealthChecker.STATUS_NOT_OK
+
+    # Tables are reloaded from STATE_DB when the resync interval is reached
+    checker._db.keys.return_value = []
+    checker._last_resync -= HardwareChecker.RESYNC_INTERVAL
+    checker.check(config)
+    assert checker._db.keys.call_count == 3
+    assert checker._check_psu_status.called
+
+
+@patch('swsscommon.swsscommon.ConfigDBConnector', MagicMock())
+@patch('health_checker.service_checker.ServiceChecker.get_info', MagicMock(return_value={}))
+@patch('health_checker.service_checker.ServiceChecker.check', MagicMock())
+@patch('health_checker.hardware_checker.swsscommon')
+def test_hardware_checker_summary(mock_swsscommon):
+    MockConnector.data.clear()
+    MockConnector.data.update({
+        'FAN_INFO|fan1': {
+            'presence': 'False',
+            'status': 'True',
+            'speed': '60',
+            'speed_target': '60',
+            'is_under_speed': 'False',
+            'is_over_speed': 'False',
+        },
+    })
+    mock_swsscommon.Select.return_value.select.return_value = (mock_swsscommon.Select.TIMEOUT, None)
+
+    manager = HealthCheckerManager()
+    manager.config.ignore_devices = []
+    chassis = MagicMock()
+    stat = manager.check(chassis)
+    assert stat['Hardware']['fan1'][HealthChecker.INFO_FIELD_OBJECT_STATUS] == HealthChecker.STATUS_NOT_OK
+    assert HealthChecker.summary == HealthChecker.STATUS_NOT_OK
+
+    # No table changed, the fan is not checked again but the summary must stay Not OK
+    checker = manager._checkers[1]
+    checker._check_fan_status = MagicMock()
+    stat = manager.check(chassis)
+    assert not checker._check_fan_status.called
+    assert stat['Hardware']['fan1'][HealthChecker.INFO_FIELD_OBJECT_STATUS] == HealthChecker.STATUS_NOT_OK
+    assert HealthChecker.summary == HealthChecker.STATUS_NOT_OK
+
+
 def test_config():
     config = Config()
     config._config_file = os.path.join(test_path, Config.CONFIG_FILE)
@@ -554,6 +678,12 @@ def test_manager(mock_hw_info, mock_service_info, mock_udc_info):
 
     assert 'UserDefine' in stat
     assert stat['UserDefine']['udc']['status'] == 'OK'
+    assert HealthChecker.summary == HealthChecker.STATUS_OK
+
+    mock_hw_info.return_value['fan1']['status'] = 'Not OK'
+    stat = manager.check(chassis)
+    assert HealthChecker.summary == HealthChecker.STATUS_NOT_OK
+    mock_hw_info.return_value['fan1']['status'] = 'OK'
 
     mock_hw_info.side_effect = RuntimeError()
     mock_service_info.side_effect = RuntimeError()
@@ -570,6 +700,114 @@ def test_manager(mock_hw_info, mock_service_info, mock_udc_info):
     chassis.set_status_led.side_effect = RuntimeError()
     manager._set_system_led(chassis)
 
+@patch('swsscommon.swsscommon.ConfigDBConnector', MagicMock())
+@patch('health_checker.service_checker.ServiceChecker.get_info', MagicMock(return_value={}))
+@patch('health_checker.hardware_checker.HardwareChecker.get_info', MagicMock(return_value={}))
+@patch('health_checker.service_checker.ServiceChecker.check')
+@patch('health_checker.hardware_checker.HardwareChecker.check', MagicMock())
+def test_manager_checker_timeout(mock_service_check):
+    release = threading.Event()
+    mock_service_check.side_effect = lambda config: release.wait(5)
+    chassis = MagicMock()
+
+    manager = HealthCheckerManager()
+    manager.config.checker_timeout = 0.1
+    stat = manager.check(chassis)
+    assert stat['Internal']['ServiceChecker']['status'] == 'Not OK'
+    assert 'did not finish' in stat['Internal']['ServiceChecker']['message']
+    assert 'HardwareChecker' not in stat['Internal']
+    assert HealthChecker.summary == HealthChecker.STATUS_NOT_OK
+    assert manager.checker_stats['ServiceChecker']['result'] == HealthCheckerManager.RESULT_TIMEOUT
+    assert manager.checker_stats['ServiceChecker']['duration_ms'] == 100
+    assert manager.checker_stats['HardwareChecker']['result'] == HealthCheckerManager.RESULT_OK
+
+    # A checker which is still running is not started again
+    stat = manager.check(chassis)
+    assert mock_service_check.call_count == 1
+    assert HealthChecker.summary == HealthChecker.STATUS_NOT_OK
+    assert manager.checker_stats['ServiceChecker']['result'] == HealthCheckerManager.RESULT_TIMEOUT
+
+    release.set()
+    manager._running['ServiceChecker'][1].result()
+    stat = manager.check(chassis)
+    assert 'Internal' not in stat
+    assert HealthChecker.summary == HealthChecker.STATUS_OK
+    assert mock_service_check.call_count == 2
+    assert manager.checker_stats['ServiceChecker']['result'] == HealthCheckerManager.RESULT_OK
+
+    daemon = HealthDaemon()
+    daemon._process_checker_stats(manager.checker_stats)
+    assert MockConnector.data['SYSTEM_HEALTH_CHECKER_STATS|ServiceChecker']['result'] == 'OK'
+    assert 'duration_ms' in MockConnector.data['SYSTEM_HEALTH_CHECKER_STATS|HardwareChecker']
+
+
+class UnixXMLRPCRequestHandler(SimpleXMLRPCRequestHandler):
+    disable_nagle_algorithm = False
+
+    def address_string(self):
+        return 'localhost'
+
+
+class UnixXMLRPCServer(socketserver.UnixStreamServer, SimpleXMLRPCDispatcher):
+    def __init__(self, path):
+        self.logRequests = False
+        SimpleXMLRPCDispatcher.__init__(self, allow_none=True)
+        socketserver.UnixStreamServer.__init__(self, path, UnixXMLRPCRequestHandler)
+
+
+SUPERVISOR_PROCESS_INFO = [
+    {'name': 'snmpd', 'group': 'snmpd', 'statename': 'RUNNING'},
+    {'name': 'snmp-subagent', 'group': 'snmp-subagent', 'statename': 'EXITED'},
+    {'name': 'bgpd', 'group': 'bgp', 'statename': 'RUNNING'},
+]
+
+
+def check_supervisor_rpc(container_folder, socket_path):
+    server = UnixXMLRPCServer(socket_path)
+    server.register_function(lambda: SUPERVISOR_PROCESS_INFO, 'supervisor.getAllProcessInfo')
+    thread = threading.Thread(target=server.serve_forever)
+    thread.start()
+    try:
+        checker = ServiceChecker()
+        checker.container_folders['snmp'] = container_folder
+        assert checker._get_supervisor_process_status('snmp') == {
+            'snmpd': 'RUNNING',
+            'snmp-subagent': 'EXITED',
+            'bgp:bgpd': 'RUNNING',
+        }
+        assert checker._get_supervisor_process_status('swss') is None
+    finally:
+        server.shutdown()
+        server.server_close()
+        thread.join()
+
+    # supervisord is not reachable
+    assert checker._get_supervisor_process_status('snmp') is None
+
+
+@patch('swsscommon.swsscommon.ConfigDBConnector', MagicMock())
+def test_service_checker_supervisor_rpc():
+    with tempfile.TemporaryDirectory() as container_folder:
+        os.makedirs(os.path.join(container_folder, 'var/run'))
+        check_supervisor_rpc(container_folder, os.path.join(container_folder, 'var/run/supervisor.sock'))
+
+
+@patch('swsscommon.swsscommon.ConfigDBConnector', MagicMock())
+def test_service_checker_supervisor_rpc_symlink():
+    # /var/run is an absolute symlink to /run in the containers, it must not be resolved on the host
+    with tempfile.TemporaryDirectory() as container_folder:
+        os.makedirs(os.path.join(container_folder, 'run'))
+        os.makedirs(os.path.join(container_folder, 'var'))
+        os.symlink('/run', os.path.join(container_folder, 'var/run'))
+        check_supervisor_rpc(container_folder, os.path.join(container_folder, 'run/supervisor.sock'))
+
+        os.symlink('../run', os.path.join(container_folder, 'var/run2'))
+        assert ServiceChecker._get_container_path(container_folder, '/var/run2/supervisor.sock') == \
+            os.path.join(container_folder, 'run/supervisor.sock')
+        os.symlink('/var/loop', os.path.join(container_folder, 'var/loop'))
+        assert ServiceChecker._get_container_path(container_folder, '/var/loop/supervisor.sock') is None
+
+
 def test_utils():
     output = utils.run_command('some invalid command')
     assert not output
@@ -762,6 +1000,84 @@ def test_get_all_system_status_not_ok():
     print("result:{}".format(result))
     assert result == 'DOWN'
 
+class FakeSystemdBus(object):
+    """Fake system bus which serves systemd unit properties"""
+    def __init__(self, units):
+        self.units = units
+        self.calls = 0
+
+    def get_object(self, bus_name, object_path):
+        return object_path
+
+    def LoadUnit(self, name):
+        self.calls += 1
+        return name
+
+    def GetAll(self, unit, interface):
+        self.calls += 1
+        props = self.units[unit]
+        if interface == 'org.freedesktop.systemd1.Unit':
+            return {name: value for name, value in props.items() if name not in ('Type', 'Result')}
+        return {name: value for name, value in props.items() if name in ('Type', 'Result')}
+
+
+def fake_dbus_module(bus):
+    dbus = MagicMock()
+    dbus.SystemBus = MagicMock(return_value=bus)
+
+    def interface(obj, interface_name):
+        if interface_name == 'org.freedesktop.systemd1.Manager':
+            return bus
+        iface = MagicMock()
+        iface.GetAll = lambda name: bus.GetAll(obj, name)
+        return iface
+    dbus.Interface = interface
+    return dbus
+
+
+@patch('health_checker.utils.run_command', MagicMock(side_effect=AssertionError('systemctl should not be called')))
+def test_get_unit_properties_by_dbus():
+    bus = FakeSystemdBus(mock_srv_props)
+    with patch.dict(sys.modules, dbus=fake_dbus_module(bus)):
+        sysmon = Sysmonitor()
+        assert sysmon.get_unit_properties('mock_radv.service') == mock_srv_props['mock_radv.service']
+        assert sysmon.get_unit_properties('mock_bgp.service') == mock_srv_props['mock_bgp.service']
+        sys.modules['dbus'].SystemBus.assert_called_once()
+
+    # Fall back to systemctl if D-Bus is not available
+    with patch.dict(sys.modules, dbus=None):
+        with patch('health_checker.sysmonitor.Sysmonitor.run_systemctl_show', MagicMock(return_value={})) as mock_show:
+            assert sysmon.get_unit_properties('mock_radv.service') == {}
+            mock_show.assert_called_once_with('mock_radv.service')
+
+
+@patch('health_checker.utils.run_command', MagicMock(side_effect=AssertionError('systemctl should not be called')))
+@patch('health_checker.sysmonitor.Sysmonitor.get_app_ready_status', MagicMock(return_value=('Up','-','-')))
+@patch('health_checker.sysmonitor.swsscommon')
+def test_get_all_system_status_by_dbus_scale(mock_swsscommon):
+    unit_count = 200
+    units = {}
+    for index in range(unit_count):
+        props = dict(mock_srv_props['mock_radv.service'])
+        props['Id'] = 'mock{}.service'.format(index)
+        units[props['Id']] = props
+    bus = FakeSystemdBus(units)
+    dbus = fake_dbus_module(bus)
+
+    with patch.dict(sys.modules, dbus=dbus):
+        sysmon = Sysmonitor()
+        sysmon.get_all_service_list = MagicMock(return_value=sorted(units))
+        assert sysmon.get_all_system_status() == 'UP'
+
+    # LoadUnit and GetAll of the Unit and Service interfaces for each unit over a single connection
+    assert bus.calls == unit_count * 3
+    dbus.SystemBus.assert_called_once()
+    table = mock_swsscommon.Table.return_value
+    assert table.set.call_count == unit_count
+    table.flush.assert_called_once()
+    assert not sysmon.state_db.hmset.called
+
+
 def test_post_unit_status():
     sysmon = Sysmonitor()
     sysmon.post_unit_status("mock_bgp", 'OK', 'Down', 'mock reason', '-')
@@ -867,6 +1183,7 @@ def test_healthd_check_interval(mock_time):
     manager = MagicMock()
     manager.check = MagicMock()
     manager.config = MagicMock()
+    manager.get_event_fds.return_value = []
     chassis = MagicMock()
     daemon._process_stat = MagicMock()
     daemon.stop_event = MagicMock()
@@ -882,3 +1199,36 @@ def test_healthd_check_interval(mock_time):
 
     daemon.stop_event.wait.return_value = True
     assert not daemon._run_checker(manager, chassis)
+
+
+@patch('healthd.select.select')
+def test_healthd_wait_for_event(mock_select):
+    daemon = HealthDaemon()
+    manager = MagicMock()
+    daemon.stop_event = MagicMock()
+    daemon.stop_event.wait.return_value = False
+    daemon.stop_event.is_set.return_value = False
+
+    # The wait ends on a table change event, no sooner than MIN_EVENT_INTERVAL
+    manager.get_event_fds.return_value = [10, 11]
+    mock_select.return_value = ([10], [], [])
+    assert not daemon._wait(manager, 60)
+    daemon.stop_event.wait.assert_called_once_with(HealthDaemon.MIN_EVENT_INTERVAL)
+    mock_select.assert_called_once_with([10, 11, daemon._stop_read_fd], [], [], 60 - HealthDaemon.MIN_EVENT_INTERVAL)
+
+    # Stop wakes up the wait
+    daemon.stop_event.is_set.return_value = True
+    assert daemon._wait(manager, 60)
+
+    # Fall back to the interval if the event file descriptors can't be waited for
+    daemon.stop_event.wait.reset_mock()
+    mock_select.side_effect = ValueError('closed')
+    daemon.stop_event.wait.return_value = False
+    assert not daemon._wait(manager, 60)
+    daemon.stop_event.wait.assert_called_with(60 - HealthDaemon.MIN_EVENT_INTERVAL)
+
+    # The stop pipe is readable after stop
+    daemon.stop_event = threading.Event()
+    daemon.stop()
+    assert daemon.stop_event.is_set()
+    assert os.read(daemon._stop_read_fd, 1) == b'\0'